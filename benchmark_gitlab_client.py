@@ -0,0 +1,142 @@
+"""로컬 GitLab 대역 서버로 GitLabClient 연결 재사용(keep-alive) 효과를 측정하는 스크립트.
+
+리팩토링 제안 플로우처럼 raw 파일을 연속으로 가져오는 호출을
+- 호출마다 새 연결을 여는 ``requests.request`` (기존 방식)
+- 연결 풀을 공유하는 ``GitLabClient``
+로 각각 실행해 지연 시간과 서버가 받은 TCP 연결 수를 비교합니다.
+
+대역 서버는 평문 HTTP라 TLS handshake 비용이 없습니다. ``--connect-delay-ms`` 로
+새 연결마다 지연(실제 GitLab까지의 왕복 + TLS handshake 근사)을 줄 수 있습니다.
+
+    python benchmark_gitlab_client.py --requests 200 --threads 4 --connect-delay-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+import requests
+
+from src.infra.clients.gitlab import GitLabClient, GitLabClientConfig
+
+
+_FILE_BODY = ("def handler(event):\n    return event\n" * 40).encode()
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, connect_delay_seconds: float) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.connect_delay_seconds = connect_delay_seconds
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def count_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without TCP_NODELAY a kept-alive
+    # connection stalls on delayed ACKs, which a real GitLab (nginx) does not.
+    disable_nagle_algorithm = True
+    server: _StandInServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.count_connection()
+        if self.server.connect_delay_seconds:
+            time.sleep(self.server.connect_delay_seconds)
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(_FILE_BODY)))
+        self.end_headers()
+        self.wfile.write(_FILE_BODY)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+def _run(label: str, server: _StandInServer, call: Callable[[int], None], *, requests_total: int, threads: int) -> None:
+    connections_before = server.connections
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def timed(index: int) -> None:
+        started_at = time.perf_counter()
+        call(index)
+        elapsed = time.perf_counter() - started_at
+        with lock:
+            latencies.append(elapsed)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(timed, range(requests_total)))
+    wall = time.perf_counter() - started_at
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{label:<12} wall={wall:7.3f}s  mean={statistics.mean(latencies) * 1000:7.2f}ms  "
+        f"p50={statistics.median(latencies) * 1000:7.2f}ms  p95={p95 * 1000:7.2f}ms  "
+        f"connections={server.connections - connections_before}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="number of raw-file calls per run")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent callers (queue workers)")
+    parser.add_argument("--connect-delay-ms", type=float, default=0.0, help="extra delay per new connection")
+    args = parser.parse_args()
+
+    server = _StandInServer(args.connect_delay_ms / 1000.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_base_url = f"http://127.0.0.1:{server.server_address[1]}/api/v4"
+    file_url = f"{api_base_url}/projects/1/repository/files/src%2Fapp.py/raw"
+
+    def unpooled(_: int) -> None:
+        response = requests.request(
+            "GET",
+            file_url,
+            headers={"Private-Token": "benchmark"},
+            params={"ref": "main"},
+            timeout=10.0,
+        )
+        response.raise_for_status()
+
+    client = GitLabClient(
+        GitLabClientConfig(
+            api_base_url=api_base_url,
+            access_token="benchmark",
+            timeout_seconds=10.0,
+            pool_size=max(1, args.threads),
+        )
+    )
+
+    def pooled(_: int) -> None:
+        client.get_repository_file_raw(project_id=1, file_path="src/app.py", ref="main")
+
+    print(
+        f"requests={args.requests}, threads={args.threads}, connect_delay_ms={args.connect_delay_ms}"
+    )
+    try:
+        _run("per-request", server, unpooled, requests_total=args.requests, threads=args.threads)
+        _run("pooled", server, pooled, requests_total=args.requests, threads=args.threads)
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
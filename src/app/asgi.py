@@ -0,0 +1,171 @@
+"""ASGI entry point: `uvicorn src.app.asgi:app` (any ASGI server works).
+
+Connections are accepted and request bodies read on the server's event loop,
+so idle and slow webhook connections do not each hold an OS thread. Everything
+past that is blocking: the webhook handler and orchestrator (SQLite event
+dedup and queue, progress comments) run on a small dedicated thread pool, and
+reviews run on the fixed-size queue worker pools because the GitLab and LLM
+clients are blocking. Moving those onto the loop needs async clients first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict
+
+from werkzeug.datastructures import Headers
+
+from src.app.bootstrap import AppComponents, build_components, setup_logging
+from src.app.config import AppSettings
+from src.app.webhook import WebhookRequestHandler
+from src.shared.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
+
+
+logger = logging.getLogger(__name__)
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+class WebhookASGIApp:
+    def __init__(self, components_factory: Callable[[], AppComponents], *, handler_threads: int = 8) -> None:
+        if handler_threads <= 0:
+            raise ValueError("handler_threads must be positive")
+        self._components_factory = components_factory
+        self._executor = ThreadPoolExecutor(max_workers=handler_threads, thread_name_prefix="webhook-handler")
+        self._start_lock = threading.Lock()
+        self._components: AppComponents | None = None
+        self._handler: WebhookRequestHandler | None = None
+
+    def _start(self) -> WebhookRequestHandler:
+        with self._start_lock:
+            if self._handler is None:
+                self._components = self._components_factory()
+                self._handler = WebhookRequestHandler(
+                    settings=self._components.settings,
+                    orchestrator=self._components.orchestrator,
+                    event_repo=self._components.webhook_event_repo,
+                )
+            return self._handler
+
+    async def _ensure_started(self) -> WebhookRequestHandler:
+        # Servers without lifespan support build on the first request; building
+        # opens databases and starts workers, so keep it off the loop.
+        if self._handler is not None:
+            return self._handler
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._start)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        if scope.get("path") == "/metrics":
+            await self._metrics(scope, send)
+            return
+        if scope.get("path") != "/webhook":
+            await self._respond(send, "Not Found", 404)
+            return
+        if scope.get("method") != "POST":
+            await self._respond(send, "Method Not Allowed", 405)
+            return
+
+        handler = await self._ensure_started()
+        headers = Headers(
+            [(key.decode("latin-1"), value.decode("latin-1")) for key, value in scope["headers"]]
+        )
+        body = await self._read_body(receive)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, handler.handle, headers, lambda: body)
+        extra_headers = result[2] if len(result) == 3 else {}  # type: ignore[misc]
+        await self._respond(send, result[0], result[1], extra_headers)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self._ensure_started()
+                except Exception as exc:  # noqa: BLE001 - reported to the server
+                    logger.exception("Failed to start ASGI webhook app")
+                    await send({"type": "lifespan.startup.failed", "message": str(exc)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                components = self._components
+                if components is not None:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(
+                        None,
+                        components.shutdown,
+                        components.settings.shutdown_drain_timeout_seconds,
+                    )
+                self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _metrics(self, scope: Scope, send: Send) -> None:
+        await self._ensure_started()
+        assert self._components is not None
+        if not self._components.settings.metrics_enabled:
+            await self._respond(send, "Not Found", 404)
+            return
+        if scope.get("method") != "GET":
+            await self._respond(send, "Method Not Allowed", 405)
+            return
+        await self._respond(send, REGISTRY.render(), 200, content_type=PROMETHEUS_CONTENT_TYPE)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks: list[bytes] = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _respond(
+        send: Send,
+        text: str,
+        status: int,
+        extra_headers: Dict[str, str] | None = None,
+        *,
+        content_type: str = "text/plain; charset=utf-8",
+    ) -> None:
+        payload = text.encode("utf-8")
+        headers = [
+            (b"content-type", content_type.encode("latin-1")),
+            (b"content-length", str(len(payload)).encode("ascii")),
+        ]
+        for name, value in (extra_headers or {}).items():
+            headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+
+def _build_from_env() -> AppComponents:
+    settings = AppSettings.from_env()
+    setup_logging(settings.log_level)
+    return build_components(settings)
+
+
+app = WebhookASGIApp(_build_from_env)
@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+from src.app.config import AppSettings
+from src.app.orchestrator import WebhookOrchestrator
+from src.domains.progress_comment.service import ProgressCommentService, ProgressCommentTask
+from src.domains.refactor_suggestion.service import RefactorSuggestionReviewService
+from src.domains.refactor_suggestion.tasks import (
+    RefactorSuggestionReviewTask,
+    refactor_suggestion_task_project_key,
+)
+from src.domains.review.service import ReviewService
+from src.domains.review.tasks import (
+    MergeRequestReviewTask,
+    PushReviewTask,
+    degrade_review_task,
+    make_review_task_priority,
+    review_task_coalesce_key,
+    review_task_project_key,
+    review_task_serial_key,
+)
+from src.infra.clients.gitlab import GitLabClient, GitLabClientConfig
+from src.infra.clients.llm import LLMClient, LLMClientConfig
+from src.infra.monitoring.llm_webhook import LLMMonitoringWebhookClient
+from src.infra.queue.codec import DataclassTaskCodec
+from src.infra.queue.concurrency import AimdConcurrencyController
+from src.infra.queue.inprocess_queue import InProcessWorkerQueue, WorkerQueue
+from src.infra.queue.sharding import ShardAssignment
+from src.infra.queue.sqlite_queue import SQLiteWorkerQueue
+from src.infra.repositories.refactor_suggestion_state_repo import RefactorSuggestionStateRepository
+from src.infra.repositories.review_cache_repo import ReviewCacheRepository
+from src.infra.repositories.webhook_event_repo import WebhookEventRepository
+from src.shared.rate_limiter import (
+    AdaptiveRateLimiter,
+    CompositeRateLimiter,
+    KeyedIntervalRateLimiter,
+    RateLimiter,
+    SQLiteIntervalRateLimiter,
+    SQLiteKeyedIntervalRateLimiter,
+    SharedRateBudget,
+    TokenBucketRateLimiter,
+)
+from src.shared.throttle import CallerThrottleObserver
+
+
+TTask = TypeVar("TTask")
+
+
+def setup_logging(log_level_name: str) -> None:
+    level = getattr(logging, log_level_name.upper(), None)
+    if not isinstance(level, int):
+        level = logging.INFO
+        logging.basicConfig(level=level)
+        logging.getLogger(__name__).warning(
+            "Invalid LOG_LEVEL '%s', defaulting to INFO",
+            log_level_name,
+        )
+        return
+
+    logging.basicConfig(level=level)
+
+
+@dataclass(frozen=True)
+class AppComponents:
+    """Long-lived objects shared by the Flask and ASGI entry points."""
+
+    settings: AppSettings
+    orchestrator: WebhookOrchestrator
+    webhook_event_repo: WebhookEventRepository | None
+    review_queue: WorkerQueue[MergeRequestReviewTask | PushReviewTask] | None
+    refactor_suggestion_queue: WorkerQueue[RefactorSuggestionReviewTask] | None
+    progress_comment_queue: WorkerQueue[ProgressCommentTask] | None
+
+    def shutdown(self, timeout_seconds: float) -> bool:
+        """Stop intake, let queued/in-flight work finish within the timeout, stop workers.
+
+        Debounced pushes are released first so they are not lost. Returns False
+        if some work could not finish in time (the durable queue keeps it).
+        """
+        deadline = time.monotonic() + max(0.0, timeout_seconds)
+        released = self.orchestrator.flush_debounced_pushes()
+        queues = [
+            queue
+            for queue in (self.review_queue, self.refactor_suggestion_queue, self.progress_comment_queue)
+            if queue is not None
+        ]
+        for queue in queues:
+            queue.close()
+
+        drained = True
+        for queue in queues:
+            drained = queue.stop(max(0.0, deadline - time.monotonic())) and drained
+        logging.getLogger(__name__).info(
+            "Shutdown complete: drained=%s, debounced_pushes_released=%s", drained, released
+        )
+        return drained
+
+
+def _build_task_queue(
+    settings: AppSettings,
+    *,
+    task_types: tuple[type, ...],
+    name: str,
+    handler: Callable[[TTask], None],
+    shard_key: Callable[[TTask], Any],
+    consume: bool,
+    shard: ShardAssignment | None,
+    llm_client: LLMClient | None = None,
+    rate_budget: SharedRateBudget | None = None,
+    rate_budget_limiter: RateLimiter | None = None,
+    min_worker_concurrency: int | None = None,
+    serial_key: Callable[[TTask], Any] | None = None,
+    **options: Any,
+) -> WorkerQueue[TTask]:
+    """Create a review-stage queue on the configured backend (QUEUE_BACKEND).
+
+    The queue's global limit is a token bucket of RATE_LIMIT_BURST requests.
+    With LLM_ADAPTIVE_RATE_LIMIT it follows the throttling ``llm_client``
+    reports. With a ``rate_budget`` (LLM_MAX_REQUESTS_PER_MINUTE) the queue
+    instead takes a share of that provider-wide budget, guaranteed
+    ``max_requests_per_minute`` and borrowing whatever other queues leave unused.
+
+    RATE_LIMIT_DB_PATH stacks a schedule booked in SQLite behind that
+    process-local limiter, so the limit also holds across every process (e.g.
+    gunicorn workers) on the host: the queue's own limit, or with a budget
+    ``rate_budget_limiter``, the provider-wide total.
+    ``consume`` and ``shard`` only apply to the SQLite backend (see ``src.app.worker``).
+
+    ``min_worker_concurrency`` lets the in-memory backend scale its workers
+    between it and ``worker_concurrency`` (AIMD on latency, errors and the
+    throttling/timeouts ``llm_client`` reports for this queue's own calls);
+    the SQLite backend logs a warning and keeps a fixed pool. ``serial_key``
+    runs tasks with the same key one at a time and in order on either backend.
+    """
+    max_requests_per_minute = options.get("max_requests_per_minute")
+    if max_requests_per_minute is not None:
+        limiters: list[RateLimiter] = []
+        if rate_budget is not None:
+            limiters.append(rate_budget.share(name, min_requests_per_minute=max_requests_per_minute))
+            if rate_budget_limiter is not None:
+                limiters.append(rate_budget_limiter)
+        else:
+            if llm_client is not None and settings.llm_adaptive_rate_limit:
+                adaptive_limiter = AdaptiveRateLimiter(
+                    max_requests_per_minute=max_requests_per_minute,
+                    burst=settings.rate_limit_burst,
+                    name=name,
+                )
+                llm_client.add_throttle_observer(adaptive_limiter)
+                limiters.append(adaptive_limiter)
+            if settings.rate_limit_db_path:
+                limiters.append(
+                    SQLiteIntervalRateLimiter(
+                        db_path=settings.rate_limit_db_path,
+                        name=name,
+                        max_requests_per_minute=max_requests_per_minute,
+                        burst=settings.rate_limit_burst,
+                    )
+                )
+            if not limiters:
+                limiters.append(
+                    TokenBucketRateLimiter(
+                        max_requests_per_minute=max_requests_per_minute,
+                        burst=settings.rate_limit_burst,
+                    )
+                )
+        options["rate_limiter"] = limiters[0] if len(limiters) == 1 else CompositeRateLimiter(*limiters)
+    if settings.queue_backend == "sqlite":
+        if min_worker_concurrency is not None:
+            logging.getLogger(__name__).warning(
+                "Queue '%s' ignores its minimum worker concurrency with QUEUE_BACKEND=sqlite; running a fixed %s worker(s)",
+                name,
+                options.get("worker_concurrency", 1),
+            )
+        return SQLiteWorkerQueue(
+            name=name,
+            handler=handler,
+            db_path=settings.queue_db_path,
+            codec=DataclassTaskCodec(*task_types),
+            visibility_timeout_seconds=settings.queue_visibility_timeout_seconds,
+            consume=consume,
+            shard_key=shard_key,
+            shard=shard,
+            serial_key=serial_key,
+            **options,
+        )
+    max_workers = options.get("worker_concurrency", 1)
+    if min_worker_concurrency is not None and min_worker_concurrency < max_workers:
+        controller = AimdConcurrencyController(
+            min_workers=min_worker_concurrency,
+            max_workers=max_workers,
+            name=name,
+        )
+        if llm_client is not None:
+            # Only this queue's calls: throttling of another queue sharing the
+            # client must not shrink this pool.
+            llm_client.add_throttle_observer(CallerThrottleObserver(controller, name))
+        options["concurrency_controller"] = controller
+    return InProcessWorkerQueue(name=name, handler=handler, serial_key=serial_key, **options)
+
+
+def build_components(settings: AppSettings, *, shard: ShardAssignment | None = None) -> AppComponents:
+    """Wire clients, services and queues.
+
+    ``shard`` is passed by ``src.app.worker`` processes, which consume their
+    share of the durable queues; the web tier only enqueues when
+    ``QUEUE_CONSUMERS=external``.
+    """
+    consume = shard is not None or settings.queue_consumers == "inprocess"
+
+    gitlab_client = GitLabClient(
+        GitLabClientConfig(
+            api_base_url=settings.gitlab_api_base_url,
+            access_token=settings.gitlab_access_token,
+            timeout_seconds=settings.gitlab_request_timeout_seconds,
+            pool_size=settings.gitlab_http_pool_size,
+            max_retries=settings.gitlab_max_retries,
+            retry_backoff_seconds=settings.gitlab_retry_backoff_seconds,
+            response_cache_max_bytes=settings.gitlab_response_cache_mb * 1024 * 1024,
+        )
+    )
+
+    llm_client = LLMClient(
+        LLMClientConfig(
+            provider=settings.llm_provider,
+            model=settings.llm_model,
+            timeout_seconds=settings.llm_timeout_seconds,
+            max_retries=settings.llm_max_retries,
+            openai_api_key=settings.openai_api_key,
+            google_api_key=settings.google_api_key,
+            ollama_base_url=settings.ollama_base_url,
+            openrouter_api_key=settings.openrouter_api_key,
+            openrouter_base_url=settings.openrouter_base_url,
+            max_tokens_per_minute=settings.llm_max_tokens_per_minute,
+            rate_limit_retries=settings.llm_rate_limit_retries,
+        )
+    )
+
+    monitoring_client = LLMMonitoringWebhookClient(
+        webhook_url=settings.llm_monitoring_webhook_url,
+        timeout_seconds=settings.llm_monitoring_timeout_seconds,
+    )
+    review_cache_repo = ReviewCacheRepository(settings.review_cache_db_path)
+    refactor_suggestion_state_repo = RefactorSuggestionStateRepository(settings.refactor_suggestion_state_db_path)
+
+    review_service = ReviewService(
+        gitlab_client=gitlab_client,
+        llm_client=llm_client,
+        review_cache_repo=review_cache_repo,
+        monitoring_client=monitoring_client,
+        review_system_prompt=settings.review_system_prompt,
+    )
+    refactor_suggestion_service = RefactorSuggestionReviewService(
+        gitlab_client=gitlab_client,
+        llm_client=llm_client,
+        state_repo=refactor_suggestion_state_repo,
+        monitoring_client=monitoring_client,
+    )
+
+    # One requests-per-minute budget for every queue calling the provider. The
+    # budget is per process; with RATE_LIMIT_DB_PATH a SQLite schedule also
+    # caps the provider-wide total across processes.
+    llm_rate_budget: SharedRateBudget | None = None
+    llm_rate_budget_limiter: RateLimiter | None = None
+    if settings.llm_max_requests_per_minute is not None:
+        llm_rate_budget = SharedRateBudget(
+            max_requests_per_minute=settings.llm_max_requests_per_minute,
+            burst=settings.rate_limit_burst,
+            name=llm_client.provider_name,
+        )
+        if settings.llm_adaptive_rate_limit:
+            llm_client.add_throttle_observer(llm_rate_budget)
+        if settings.rate_limit_db_path:
+            llm_rate_budget_limiter = SQLiteIntervalRateLimiter(
+                db_path=settings.rate_limit_db_path,
+                name=f"llm-{llm_client.provider_name}",
+                max_requests_per_minute=settings.llm_max_requests_per_minute,
+                burst=settings.rate_limit_burst,
+            )
+
+    review_queue: WorkerQueue[MergeRequestReviewTask | PushReviewTask] | None = None
+    if settings.enable_merge_request_review or settings.enable_push_review:
+        project_rate_limiter: KeyedIntervalRateLimiter | None = None
+        if settings.review_fair_scheduling and (
+            settings.review_project_max_requests_per_minute is not None
+            or settings.review_project_max_requests_per_minute_overrides
+        ):
+            if settings.rate_limit_db_path:
+                project_rate_limiter = SQLiteKeyedIntervalRateLimiter(
+                    db_path=settings.rate_limit_db_path,
+                    name="review-project",
+                    default_max_requests_per_minute=settings.review_project_max_requests_per_minute,
+                    overrides=settings.review_project_max_requests_per_minute_overrides,
+                )
+            else:
+                project_rate_limiter = KeyedIntervalRateLimiter(
+                    default_max_requests_per_minute=settings.review_project_max_requests_per_minute,
+                    overrides=settings.review_project_max_requests_per_minute_overrides,
+                )
+        review_queue = _build_task_queue(
+            settings,
+            task_types=(MergeRequestReviewTask, PushReviewTask),
+            name="review",
+            shard_key=review_task_project_key,
+            consume=consume,
+            shard=shard,
+            handler=review_service.run_task,
+            llm_client=llm_client,
+            rate_budget=llm_rate_budget,
+            rate_budget_limiter=llm_rate_budget_limiter,
+            min_worker_concurrency=settings.review_worker_concurrency_min,
+            serial_key=review_task_serial_key if settings.review_serialize_per_key else None,
+            max_requests_per_minute=settings.review_max_requests_per_minute,
+            worker_concurrency=settings.review_worker_concurrency,
+            max_pending_jobs_soft_limit=settings.review_max_pending_jobs,
+            coalesce_key=(
+                review_task_coalesce_key if settings.review_coalesce_merge_requests else None
+            ),
+            max_pending_jobs=settings.review_queue_capacity,
+            overflow_policy=settings.review_queue_overflow_policy,
+            degrade=degrade_review_task,
+            fairness_key=review_task_project_key if settings.review_fair_scheduling else None,
+            flow_rate_limiter=project_rate_limiter,
+            priority=make_review_task_priority(
+                merge_request_priority=settings.review_merge_request_priority,
+                push_priority=settings.review_push_priority,
+            ),
+            priority_aging_seconds=settings.review_priority_aging_seconds,
+        )
+
+    refactor_suggestion_queue: WorkerQueue[RefactorSuggestionReviewTask] | None = None
+    if settings.enable_refactor_suggestion_review:
+        refactor_suggestion_queue = _build_task_queue(
+            settings,
+            task_types=(RefactorSuggestionReviewTask,),
+            name="refactor-suggestion",
+            shard_key=refactor_suggestion_task_project_key,
+            consume=consume,
+            shard=shard,
+            handler=refactor_suggestion_service.run_task,
+            llm_client=llm_client,
+            rate_budget=llm_rate_budget,
+            rate_budget_limiter=llm_rate_budget_limiter,
+            max_requests_per_minute=settings.refactor_suggestion_max_requests_per_minute,
+            worker_concurrency=settings.refactor_suggestion_worker_concurrency,
+            max_pending_jobs_soft_limit=settings.refactor_suggestion_max_pending_jobs,
+            max_pending_jobs=settings.refactor_suggestion_queue_capacity,
+            fairness_key=(
+                refactor_suggestion_task_project_key if settings.review_fair_scheduling else None
+            ),
+        )
+
+    progress_comment_service = ProgressCommentService(gitlab_client=gitlab_client)
+    progress_comment_queue: WorkerQueue[ProgressCommentTask] | None = None
+    if settings.webhook_async_ack:
+        # Progress notes are cheap GitLab calls; keep them off the LLM rate limit so the
+        # webhook can return right after enqueueing.
+        progress_comment_queue = InProcessWorkerQueue(
+            name="progress-comment",
+            handler=progress_comment_service.run_task,
+            max_requests_per_minute=None,
+            worker_concurrency=settings.webhook_ack_worker_concurrency,
+        )
+
+    orchestrator = WebhookOrchestrator(
+        settings=settings,
+        progress_comment_service=progress_comment_service,
+        progress_comment_queue=progress_comment_queue,
+        review_queue=review_queue,
+        refactor_suggestion_queue=refactor_suggestion_queue,
+        refactor_suggestion_state_repo=refactor_suggestion_state_repo,
+    )
+
+    webhook_event_repo: WebhookEventRepository | None = None
+    if settings.webhook_dedup_enabled:
+        webhook_event_repo = WebhookEventRepository(
+            ttl_seconds=settings.webhook_dedup_ttl_seconds,
+            max_entries=settings.webhook_dedup_max_entries,
+            db_path=settings.webhook_dedup_db_path,
+        )
+
+    return AppComponents(
+        settings=settings,
+        orchestrator=orchestrator,
+        webhook_event_repo=webhook_event_repo,
+        review_queue=review_queue,
+        refactor_suggestion_queue=refactor_suggestion_queue,
+        progress_comment_queue=progress_comment_queue,
+    )
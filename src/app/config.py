@@ -4,6 +4,7 @@ import os
 from dataclasses import dataclass
 
 from src.shared.errors import ConfigurationError
+from src.shared.types import OverflowPolicy
 
 
 def _clean_optional(value: str | None) -> str | None:
@@ -63,6 +64,30 @@ def _get_float(name: str, default: float, *, min_value: float | None = None) ->
     return value
 
 
+def _get_int_mapping(name: str, *, min_value: int | None = None) -> dict[int, int]:
+    """Parse ``"123:4,456:1"`` style per-id overrides."""
+    raw = _clean_optional(os.environ.get(name))
+    if raw is None:
+        return {}
+
+    mapping: dict[int, int] = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key_raw, sep, value_raw = item.partition(":")
+        try:
+            if not sep:
+                raise ValueError(item)
+            key, value = int(key_raw.strip()), int(value_raw.strip())
+        except ValueError as exc:
+            raise ConfigurationError(f"Invalid entry for {name}: {item}") from exc
+        if min_value is not None and value < min_value:
+            raise ConfigurationError(f"{name} values must be >= {min_value}")
+        mapping[key] = value
+    return mapping
+
+
 @dataclass(frozen=True)
 class AppSettings:
     log_level: str
@@ -71,18 +96,56 @@ class AppSettings:
     gitlab_url: str
     gitlab_webhook_secret_token: str
     gitlab_request_timeout_seconds: float
+    gitlab_http_pool_size: int
+    gitlab_max_retries: int
+    gitlab_retry_backoff_seconds: float
+    gitlab_response_cache_mb: int
 
     enable_merge_request_review: bool
     enable_push_review: bool
     enable_refactor_suggestion_review: bool
 
+    webhook_async_ack: bool
+    webhook_ack_worker_concurrency: int
+    webhook_dedup_enabled: bool
+    webhook_dedup_ttl_seconds: float
+    webhook_dedup_max_entries: int
+    webhook_dedup_db_path: str | None
+
+    queue_backend: str
+    queue_db_path: str
+    queue_visibility_timeout_seconds: float
+    rate_limit_db_path: str | None
+    rate_limit_burst: int
+    queue_consumers: str
+    worker_shards: int
+    shutdown_drain_timeout_seconds: float
+    metrics_enabled: bool
+    worker_metrics_port: int | None
+
     review_max_requests_per_minute: int
     review_worker_concurrency: int
+    review_worker_concurrency_min: int | None
     review_max_pending_jobs: int
+    review_coalesce_merge_requests: bool
+    review_serialize_per_key: bool
+    review_queue_capacity: int
+    review_queue_overflow_policy: OverflowPolicy
+    review_queue_reject_status_code: int
+    review_cancel_superseded: bool
+    review_fair_scheduling: bool
+    review_merge_request_priority: int
+    review_push_priority: int
+    review_priority_aging_seconds: float | None
+    review_project_max_requests_per_minute: int | None
+    review_project_max_requests_per_minute_overrides: dict[int, int]
+    push_review_range: bool
+    push_review_debounce_seconds: float
 
     refactor_suggestion_max_requests_per_minute: int
     refactor_suggestion_worker_concurrency: int
     refactor_suggestion_max_pending_jobs: int
+    refactor_suggestion_queue_capacity: int
     refactor_suggestion_max_files: int
     refactor_suggestion_max_file_chars: int
     refactor_suggestion_max_total_chars: int
@@ -91,6 +154,10 @@ class AppSettings:
     llm_model: str
     llm_timeout_seconds: float
     llm_max_retries: int
+    llm_max_requests_per_minute: int | None
+    llm_max_tokens_per_minute: int | None
+    llm_rate_limit_retries: int
+    llm_adaptive_rate_limit: bool
     openai_api_key: str | None
     google_api_key: str | None
     ollama_base_url: str
@@ -117,6 +184,39 @@ class AppSettings:
 
         llm_model = _get_optional_str("LLM_MODEL") or "gpt-5-mini"
 
+        overflow_policy_raw = (
+            _get_optional_str("REVIEW_QUEUE_OVERFLOW_POLICY") or OverflowPolicy.REJECT.value
+        ).lower()
+        try:
+            overflow_policy = OverflowPolicy(overflow_policy_raw)
+        except ValueError as exc:
+            raise ConfigurationError(
+                f"Unsupported REVIEW_QUEUE_OVERFLOW_POLICY: {overflow_policy_raw}"
+            ) from exc
+
+        reject_status_code = _get_int("REVIEW_QUEUE_REJECT_STATUS_CODE", 503)
+        if reject_status_code not in (429, 503):
+            raise ConfigurationError("REVIEW_QUEUE_REJECT_STATUS_CODE must be 429 or 503")
+
+        queue_backend = (_get_optional_str("QUEUE_BACKEND") or "memory").lower()
+        if queue_backend not in {"memory", "sqlite"}:
+            raise ConfigurationError(f"Unsupported QUEUE_BACKEND: {queue_backend}")
+
+        queue_consumers = (_get_optional_str("QUEUE_CONSUMERS") or "inprocess").lower()
+        if queue_consumers not in {"inprocess", "external"}:
+            raise ConfigurationError(f"Unsupported QUEUE_CONSUMERS: {queue_consumers}")
+        if queue_consumers == "external" and queue_backend != "sqlite":
+            raise ConfigurationError("QUEUE_CONSUMERS=external requires QUEUE_BACKEND=sqlite")
+
+        project_max_requests_per_minute = _get_int(
+            "REVIEW_PROJECT_MAX_REQUESTS_PER_MINUTE", 0, min_value=0
+        )
+
+        llm_max_requests_per_minute = _get_int("LLM_MAX_REQUESTS_PER_MINUTE", 0, min_value=0)
+        llm_max_tokens_per_minute = _get_int("LLM_MAX_TOKENS_PER_MINUTE", 0, min_value=0)
+
+        priority_aging_seconds = _get_float("REVIEW_PRIORITY_AGING_SECONDS", 120.0, min_value=0.0)
+
         settings = cls(
             log_level=(_get_optional_str("LOG_LEVEL") or "INFO").upper(),
             gitlab_access_token=_get_required_str("GITLAB_ACCESS_TOKEN"),
@@ -127,16 +227,68 @@ class AppSettings:
             gitlab_request_timeout_seconds=_get_float(
                 "GITLAB_REQUEST_TIMEOUT_SECONDS", 10.0, min_value=0.001
             ),
+            gitlab_http_pool_size=_get_int("GITLAB_HTTP_POOL_SIZE", 10, min_value=1),
+            gitlab_max_retries=_get_int("GITLAB_MAX_RETRIES", 3, min_value=0),
+            gitlab_retry_backoff_seconds=_get_float(
+                "GITLAB_RETRY_BACKOFF_SECONDS", 0.5, min_value=0.0
+            ),
+            gitlab_response_cache_mb=_get_int("GITLAB_RESPONSE_CACHE_MB", 32, min_value=0),
             enable_merge_request_review=_get_bool("ENABLE_MERGE_REQUEST_REVIEW", True),
             enable_push_review=_get_bool("ENABLE_PUSH_REVIEW", True),
             enable_refactor_suggestion_review=_get_bool("ENABLE_REFACTOR_SUGGESTION_REVIEW", True),
+            webhook_async_ack=_get_bool("WEBHOOK_ASYNC_ACK", False),
+            webhook_ack_worker_concurrency=_get_int(
+                "WEBHOOK_ACK_WORKER_CONCURRENCY", 2, min_value=1
+            ),
+            webhook_dedup_enabled=_get_bool("WEBHOOK_DEDUP_ENABLED", True),
+            webhook_dedup_ttl_seconds=_get_float(
+                "WEBHOOK_DEDUP_TTL_SECONDS", 3600.0, min_value=1.0
+            ),
+            webhook_dedup_max_entries=_get_int("WEBHOOK_DEDUP_MAX_ENTRIES", 10000, min_value=1),
+            webhook_dedup_db_path=_get_optional_str("WEBHOOK_DEDUP_DB_PATH"),
+            queue_backend=queue_backend,
+            queue_db_path=_get_optional_str("QUEUE_DB_PATH") or "data/queue.db",
+            queue_visibility_timeout_seconds=_get_float(
+                "QUEUE_VISIBILITY_TIMEOUT_SECONDS", 900.0, min_value=1.0
+            ),
+            rate_limit_db_path=_get_optional_str("RATE_LIMIT_DB_PATH"),
+            rate_limit_burst=_get_int("RATE_LIMIT_BURST", 1, min_value=1),
+            queue_consumers=queue_consumers,
+            worker_shards=_get_int("WORKER_SHARDS", 1, min_value=1),
+            shutdown_drain_timeout_seconds=_get_float(
+                "SHUTDOWN_DRAIN_TIMEOUT_SECONDS", 25.0, min_value=0.0
+            ),
+            metrics_enabled=_get_bool("METRICS_ENABLED", True),
+            worker_metrics_port=_get_int("WORKER_METRICS_PORT", 0, min_value=0) or None,
             review_max_requests_per_minute=_get_int(
                 "REVIEW_MAX_REQUESTS_PER_MINUTE", 2, min_value=1
             ),
             review_worker_concurrency=_get_int(
                 "REVIEW_WORKER_CONCURRENCY", 1, min_value=1
             ),
+            review_worker_concurrency_min=_get_int(
+                "REVIEW_WORKER_CONCURRENCY_MIN", 0, min_value=0
+            )
+            or None,
             review_max_pending_jobs=_get_int("REVIEW_MAX_PENDING_JOBS", 100, min_value=1),
+            review_coalesce_merge_requests=_get_bool("REVIEW_COALESCE_MERGE_REQUESTS", True),
+            review_serialize_per_key=_get_bool("REVIEW_SERIALIZE_PER_KEY", True),
+            review_queue_capacity=_get_int("REVIEW_QUEUE_CAPACITY", 1000, min_value=1),
+            review_queue_overflow_policy=overflow_policy,
+            review_queue_reject_status_code=reject_status_code,
+            review_cancel_superseded=_get_bool("REVIEW_CANCEL_SUPERSEDED", False),
+            review_fair_scheduling=_get_bool("REVIEW_FAIR_SCHEDULING", True),
+            review_merge_request_priority=_get_int("REVIEW_PRIORITY_MERGE_REQUEST", 10),
+            review_push_priority=_get_int("REVIEW_PRIORITY_PUSH", 0),
+            review_priority_aging_seconds=priority_aging_seconds or None,
+            review_project_max_requests_per_minute=project_max_requests_per_minute or None,
+            review_project_max_requests_per_minute_overrides=_get_int_mapping(
+                "REVIEW_PROJECT_MAX_REQUESTS_PER_MINUTE_OVERRIDES", min_value=1
+            ),
+            push_review_range=_get_bool("PUSH_REVIEW_RANGE", False),
+            push_review_debounce_seconds=_get_float(
+                "PUSH_REVIEW_DEBOUNCE_SECONDS", 0.0, min_value=0.0
+            ),
             refactor_suggestion_max_requests_per_minute=_get_int(
                 "REFACTOR_SUGGESTION_MAX_REQUESTS_PER_MINUTE", 1, min_value=1
             ),
@@ -146,6 +298,9 @@ class AppSettings:
             refactor_suggestion_max_pending_jobs=_get_int(
                 "REFACTOR_SUGGESTION_MAX_PENDING_JOBS", 50, min_value=1
             ),
+            refactor_suggestion_queue_capacity=_get_int(
+                "REFACTOR_SUGGESTION_QUEUE_CAPACITY", 500, min_value=1
+            ),
             refactor_suggestion_max_files=_get_int("REFACTOR_SUGGESTION_MAX_FILES", 20, min_value=1),
             refactor_suggestion_max_file_chars=_get_int(
                 "REFACTOR_SUGGESTION_MAX_FILE_CHARS", 12000, min_value=1
@@ -157,6 +312,10 @@ class AppSettings:
             llm_model=llm_model,
             llm_timeout_seconds=_get_float("LLM_TIMEOUT_SECONDS", 300.0, min_value=0.001),
             llm_max_retries=_get_int("LLM_MAX_RETRIES", 0, min_value=0),
+            llm_max_requests_per_minute=llm_max_requests_per_minute or None,
+            llm_max_tokens_per_minute=llm_max_tokens_per_minute or None,
+            llm_rate_limit_retries=_get_int("LLM_RATE_LIMIT_RETRIES", 3, min_value=0),
+            llm_adaptive_rate_limit=_get_bool("LLM_ADAPTIVE_RATE_LIMIT", True),
             openai_api_key=_get_optional_str("OPENAI_API_KEY"),
             google_api_key=_get_optional_str("GOOGLE_API_KEY"),
             ollama_base_url=_get_optional_str("OLLAMA_BASE_URL")
@@ -184,6 +343,18 @@ class AppSettings:
                 "At least one of ENABLE_MERGE_REQUEST_REVIEW, ENABLE_PUSH_REVIEW, ENABLE_REFACTOR_SUGGESTION_REVIEW must be true"
             )
 
+        if settings.llm_max_requests_per_minute is not None:
+            reserved = 0
+            if settings.enable_merge_request_review or settings.enable_push_review:
+                reserved += settings.review_max_requests_per_minute
+            if settings.enable_refactor_suggestion_review:
+                reserved += settings.refactor_suggestion_max_requests_per_minute
+            if reserved > settings.llm_max_requests_per_minute:
+                raise ConfigurationError(
+                    "REVIEW_MAX_REQUESTS_PER_MINUTE + REFACTOR_SUGGESTION_MAX_REQUESTS_PER_MINUTE "
+                    "must not exceed LLM_MAX_REQUESTS_PER_MINUTE"
+                )
+
         if settings.llm_provider == "openai" and not settings.openai_api_key:
             raise ConfigurationError("OPENAI_API_KEY is required when LLM_PROVIDER=openai")
         if settings.llm_provider == "gemini" and not settings.google_api_key:
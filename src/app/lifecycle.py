@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import logging
+import signal
+import threading
+from types import FrameType
+from typing import Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def install_shutdown_handler(shutdown: Callable[[], None], *, signum: int = signal.SIGTERM) -> bool:
+    """Run ``shutdown`` on SIGTERM, then hand over to the previous handler.
+
+    The previous handler (e.g. gunicorn's worker exit) runs afterwards; without
+    one the process exits via ``SystemExit``. Signal handlers can only be
+    installed from the main thread, so elsewhere this is a logged no-op.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        logger.warning("Not in the main thread; graceful shutdown on signal %s is disabled", signum)
+        return False
+
+    previous = signal.getsignal(signum)
+    state = {"handled": False}
+
+    def handle(received: int, frame: Optional[FrameType]) -> None:
+        if not state["handled"]:
+            state["handled"] = True
+            logger.info("Received signal %s; draining queues before exit", received)
+            try:
+                shutdown()
+            except Exception:  # noqa: BLE001 - still exit
+                logger.exception("Graceful shutdown failed")
+
+        if callable(previous):
+            previous(received, frame)
+            return
+        raise SystemExit(0)
+
+    signal.signal(signum, handle)
+    return True
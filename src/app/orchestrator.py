@@ -1,24 +1,45 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from functools import partial
+from typing import Any, Callable
 
 from src.app.config import AppSettings
+from src.domains.progress_comment.service import ProgressCommentService, ProgressCommentTask
+from src.domains.progress_comment.tasks import (
+    CommitProgressCommentTask,
+    MergeRequestProgressCommentTask,
+)
 from src.domains.refactor_suggestion.tasks import RefactorSuggestionReviewTask
-from src.domains.review.tasks import MergeRequestReviewTask, PushReviewTask
-from src.infra.clients.gitlab import GitLabClient
-from src.infra.queue.inprocess_queue import InProcessWorkerQueue
+from src.domains.review.tasks import (
+    MergeRequestReviewTask,
+    PushReviewTask,
+    merge_push_review_tasks,
+    merge_request_review_key,
+)
+from src.infra.queue.debouncer import KeyedDebouncer
+from src.infra.queue.inprocess_queue import EnqueueOutcome, WorkerQueue
 from src.infra.repositories.refactor_suggestion_state_repo import RefactorSuggestionStateRepository
+from src.shared.cancellation import CancellationRegistry, CancellationToken
+from src.shared.errors import QueueClosedError, QueueFullError
 
 
 logger = logging.getLogger(__name__)
 
-AI_PROGRESS_MESSAGE = (
-    "AI가 코드를 검토 중입니다. 잠시만 기다려 주세요.\n"
-    "\n"
-    "이 코멘트는 자동으로 생성되었습니다."
-)
 SUPPORTED_MERGE_REQUEST_ACTIONS = {"open", "update", "reopen"}
+# Tells the caller (GitLab's "Recent events" view) what admission control did.
+ADMISSION_HEADER = "X-Review-Admission"
+_OUTCOME_BODIES = {
+    EnqueueOutcome.ACCEPTED: "OK",
+    EnqueueOutcome.COALESCED: "OK (superseded a pending review)",
+    EnqueueOutcome.DROPPED_OLDEST: "OK (oldest pending review dropped)",
+    EnqueueOutcome.DEGRADED: "OK (summary-only review due to load)",
+}
+
+WebhookResult = tuple[str, int] | tuple[str, int, dict[str, str]]
+
+# GitLab sends an all-zeros SHA as `before` for new branches and as `after` for deletions.
+NULL_COMMIT_SHA = "0" * 40
 
 
 class WebhookOrchestrator:
@@ -26,16 +47,27 @@ class WebhookOrchestrator:
         self,
         *,
         settings: AppSettings,
-        gitlab_client: GitLabClient,
-        review_queue: InProcessWorkerQueue[MergeRequestReviewTask | PushReviewTask] | None,
-        refactor_suggestion_queue: InProcessWorkerQueue[RefactorSuggestionReviewTask] | None,
+        progress_comment_service: ProgressCommentService,
+        progress_comment_queue: WorkerQueue[ProgressCommentTask] | None,
+        review_queue: WorkerQueue[MergeRequestReviewTask | PushReviewTask] | None,
+        refactor_suggestion_queue: WorkerQueue[RefactorSuggestionReviewTask] | None,
         refactor_suggestion_state_repo: RefactorSuggestionStateRepository,
     ) -> None:
         self._settings = settings
-        self._gitlab_client = gitlab_client
+        self._progress_comment_service = progress_comment_service
+        self._progress_comment_queue = progress_comment_queue
         self._review_queue = review_queue
         self._refactor_suggestion_queue = refactor_suggestion_queue
         self._refactor_suggestion_state_repo = refactor_suggestion_state_repo
+        self._review_cancellations = CancellationRegistry()
+        self._push_debouncer: KeyedDebouncer[PushReviewTask] | None = None
+        if settings.enable_push_review and settings.push_review_debounce_seconds > 0:
+            self._push_debouncer = KeyedDebouncer(
+                name="push-debounce",
+                window_seconds=settings.push_review_debounce_seconds,
+                on_ready=self._release_debounced_push,
+                merge=merge_push_review_tasks,
+            )
 
     @staticmethod
     def _extract_mr_source_ref(payload: dict[str, Any]) -> str | None:
@@ -51,7 +83,36 @@ class WebhookOrchestrator:
 
         return None
 
-    def handle_merge_request_event(self, payload: dict[str, Any]) -> tuple[str, int]:
+    @staticmethod
+    def _resolve_push_base_ref(payload: dict[str, Any]) -> str | None:
+        """Pick the ref the pushed range is compared against, or None for head-only review."""
+        before = str(payload.get("before") or "")
+        if before and before != NULL_COMMIT_SHA:
+            return before
+
+        # New branch: compare against the default branch (merge base), unless the
+        # push created the default branch itself.
+        default_branch = (payload.get("project") or {}).get("default_branch")
+        ref = str(payload.get("ref") or "")
+        if default_branch and ref != f"refs/heads/{default_branch}":
+            return str(default_branch)
+        return None
+
+    def _notify_progress(self, task: ProgressCommentTask) -> None:
+        """Post the progress note inline, or hand it to the ack queue in async mode."""
+        if self._progress_comment_queue is None:
+            self._progress_comment_service.run_task(task)
+            return
+
+        try:
+            self._progress_comment_queue.enqueue(task)
+        except Exception:
+            logger.exception(
+                "Failed to enqueue AI progress comment task: project_id=%s",
+                task.project_id,
+            )
+
+    def handle_merge_request_event(self, payload: dict[str, Any]) -> WebhookResult:
         action = payload["object_attributes"]["action"]
         if action not in SUPPORTED_MERGE_REQUEST_ACTIONS:
             return "Unsupported merge_request action", 200
@@ -65,33 +126,32 @@ class WebhookOrchestrator:
             action,
         )
 
+        review_result: WebhookResult | None = None
         if self._settings.enable_merge_request_review and self._review_queue is not None:
-            try:
-                self._gitlab_client.post_merge_request_comment(
-                    project_id=project_id,
-                    merge_request_iid=mr_id,
-                    body=AI_PROGRESS_MESSAGE,
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to post AI progress comment for merge_request: project_id=%s, mr_id=%s",
-                    project_id,
-                    mr_id,
+            # A newer event makes any in-flight review of this MR stale; its worker
+            # abandons it at the next checkpoint. Only once the new task is
+            # admitted, though: a rejected event must not leave the MR unreviewed.
+            cancel_token = CancellationToken() if self._settings.review_cancel_superseded else None
+            on_admitted: Callable[[], None] | None = None
+            if cancel_token is not None:
+                on_admitted = partial(
+                    self._review_cancellations.activate,
+                    merge_request_review_key(project_id, mr_id),
+                    cancel_token,
                 )
 
-            try:
-                self._review_queue.enqueue(
-                    MergeRequestReviewTask(
-                        project_id=project_id,
-                        merge_request_iid=mr_id,
-                    )
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to enqueue merge_request review task: project_id=%s, mr_id=%s",
-                    project_id,
-                    mr_id,
-                )
+            review_result = self._enqueue_review(
+                MergeRequestReviewTask(
+                    project_id=project_id,
+                    merge_request_iid=mr_id,
+                    cancel_token=cancel_token,
+                ),
+                MergeRequestProgressCommentTask(
+                    project_id=project_id,
+                    merge_request_iid=mr_id,
+                ),
+                on_admitted=on_admitted,
+            )
 
         if (
             action == "open"
@@ -133,44 +193,106 @@ class WebhookOrchestrator:
                     mr_id,
                 )
 
-        return "OK", 200
+        return review_result or ("OK", 200)
 
-    def handle_push_event(self, payload: dict[str, Any]) -> tuple[str, int]:
+    def handle_push_event(self, payload: dict[str, Any]) -> WebhookResult:
         project_id = int(payload["project_id"])
         commit_id = str(payload["after"])
+        if commit_id == NULL_COMMIT_SHA:
+            return "Branch deletion push ignored", 200
+
+        base_ref = (
+            self._resolve_push_base_ref(payload) if self._settings.push_review_range else None
+        )
 
         logger.info(
-            "Handling push event: project_id=%s, commit_id=%s",
+            "Handling push event: project_id=%s, commit_id=%s, base_ref=%s",
             project_id,
             commit_id,
+            base_ref,
         )
 
         if self._settings.enable_push_review and self._review_queue is not None:
-            try:
-                self._gitlab_client.post_commit_comment(
-                    project_id=project_id,
-                    commit_id=commit_id,
-                    note=AI_PROGRESS_MESSAGE,
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to post AI progress comment for commit: project_id=%s, commit_id=%s",
-                    project_id,
-                    commit_id,
-                )
-
-            try:
-                self._review_queue.enqueue(
-                    PushReviewTask(
-                        project_id=project_id,
-                        commit_id=commit_id,
-                    )
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to enqueue push review task: project_id=%s, commit_id=%s",
-                    project_id,
-                    commit_id,
-                )
+            task = PushReviewTask(
+                project_id=project_id,
+                commit_id=commit_id,
+                base_ref=base_ref,
+            )
+            if self._push_debouncer is not None:
+                # Progress note and enqueue happen once the branch has been quiet for
+                # the window, on the final head only.
+                self._push_debouncer.submit((project_id, str(payload.get("ref") or "")), task)
+                return "OK (debounced)", 200, {ADMISSION_HEADER: "debounced"}
+            return self._enqueue_review(
+                task,
+                CommitProgressCommentTask(project_id=project_id, commit_id=commit_id),
+            )
 
         return "OK", 200
+
+    def flush_debounced_pushes(self) -> int:
+        """Hand debounced pushes to the review queue right away (used on shutdown)."""
+        if self._push_debouncer is None:
+            return 0
+        return self._push_debouncer.flush()
+
+    def _release_debounced_push(self, task: PushReviewTask) -> None:
+        # The webhook was answered long ago, so a rejection can only be logged.
+        body, status, *_ = self._enqueue_review(
+            task,
+            CommitProgressCommentTask(project_id=task.project_id, commit_id=task.commit_id),
+        )
+        if status != 200:
+            logger.warning(
+                "Dropped debounced push review: project_id=%s, commit_id=%s, status=%s, reason=%s",
+                task.project_id,
+                task.commit_id,
+                status,
+                body,
+            )
+
+    def _enqueue_review(
+        self,
+        task: MergeRequestReviewTask | PushReviewTask,
+        progress_task: ProgressCommentTask,
+        *,
+        on_admitted: Callable[[], None] | None = None,
+    ) -> WebhookResult:
+        """Admit a review task and translate the queue's decision into the webhook answer."""
+        if self._review_queue is None:
+            return "OK", 200
+
+        try:
+            outcome = self._review_queue.enqueue(task)
+        except QueueClosedError as exc:
+            return (
+                "Shutting down; retry later",
+                503,
+                {
+                    "Retry-After": str(exc.retry_after_seconds),
+                    ADMISSION_HEADER: "rejected",
+                },
+            )
+        except QueueFullError as exc:
+            return (
+                "Review queue is full; retry later",
+                self._settings.review_queue_reject_status_code,
+                {
+                    "Retry-After": str(exc.retry_after_seconds),
+                    ADMISSION_HEADER: "rejected",
+                },
+            )
+        except Exception:
+            logger.exception(
+                "Failed to enqueue review task: project_id=%s, task=%r",
+                task.project_id,
+                task,
+            )
+            return "OK", 200
+
+        if on_admitted is not None:
+            on_admitted()
+        # A coalesced task already has a progress note from the event it replaced.
+        if outcome is not EnqueueOutcome.COALESCED:
+            self._notify_progress(progress_task)
+        return _OUTCOME_BODIES[outcome], 200, {ADMISSION_HEADER: outcome.value}
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+def _as_dict(value: Any) -> dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _pick(source: dict[str, Any], keys: tuple[str, ...]) -> dict[str, Any]:
+    return {key: source[key] for key in keys if key in source}
+
+
+def extract_merge_request_fields(payload: dict[str, Any]) -> dict[str, Any]:
+    """Keep only the merge_request hook fields the orchestrator reads."""
+    object_attributes = _as_dict(payload.get("object_attributes"))
+    slim_attributes = _pick(object_attributes, ("action", "iid", "source_branch"))
+    last_commit_id = _as_dict(object_attributes.get("last_commit")).get("id")
+    if last_commit_id:
+        slim_attributes["last_commit"] = {"id": last_commit_id}
+
+    return {
+        "object_kind": "merge_request",
+        "project": _pick(_as_dict(payload.get("project")), ("id", "default_branch")),
+        "object_attributes": slim_attributes,
+    }
+
+
+def extract_push_fields(payload: dict[str, Any]) -> dict[str, Any]:
+    """Keep only the push hook fields the orchestrator reads (drops `commits` etc.)."""
+    slim = _pick(payload, ("project_id", "ref", "before", "after"))
+    slim["object_kind"] = "push"
+    slim["project"] = _pick(_as_dict(payload.get("project")), ("id", "default_branch"))
+    return slim
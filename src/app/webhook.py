@@ -1,37 +1,163 @@
 from __future__ import annotations
 
+import logging
+from time import perf_counter
+from typing import Callable, Mapping
+
 from flask import Flask, request
 
 from src.app.config import AppSettings
-from src.app.orchestrator import WebhookOrchestrator
+from src.app.orchestrator import WebhookOrchestrator, WebhookResult
+from src.app.payloads import extract_merge_request_fields, extract_push_fields
+from src.infra.repositories.webhook_event_repo import WebhookEventRepository
+from src.shared.json_utils import loads
+from src.shared.time_utils import format_seconds
 
 
-def register_webhook_routes(
-    app: Flask,
-    *,
-    settings: AppSettings,
-    orchestrator: WebhookOrchestrator,
-) -> None:
-    @app.route("/webhook", methods=["POST"])
-    def webhook() -> tuple[str, int]:
-        received_token = request.headers.get("X-Gitlab-Token")
-        if received_token != settings.gitlab_webhook_secret_token:
+logger = logging.getLogger(__name__)
+
+# Idempotency-Key stays the same across GitLab's retries of one delivery; the
+# event UUID is the fallback for GitLab versions that do not send it.
+_EVENT_ID_HEADERS = ("Idempotency-Key", "X-Gitlab-Event-UUID")
+# Hooks routed on the X-Gitlab-Event header alone; any other named hook except
+# system hooks (whose kind is only in the body) is acknowledged without parsing.
+_EVENT_HEADER_KINDS = {
+    "Merge Request Hook": "merge_request",
+    "Push Hook": "push",
+}
+_BODY_ROUTED_EVENT_HEADERS = {"System Hook"}
+
+
+class WebhookRequestHandler:
+    """Framework-agnostic `/webhook` logic shared by the Flask and ASGI entry points.
+
+    ``headers`` must be a case-insensitive mapping; ``read_body`` is only called
+    when the event actually needs its payload.
+    """
+
+    def __init__(
+        self,
+        *,
+        settings: AppSettings,
+        orchestrator: WebhookOrchestrator,
+        event_repo: WebhookEventRepository | None = None,
+    ) -> None:
+        self._settings = settings
+        self._orchestrator = orchestrator
+        self._event_repo = event_repo
+
+    def handle(
+        self,
+        headers: Mapping[str, str],
+        read_body: Callable[[], bytes],
+    ) -> WebhookResult:
+        started_at = perf_counter()
+        result = self._dispatch(headers, read_body)
+        logger.info(
+            "Webhook acknowledged: event=%s, status=%s, elapsed=%s",
+            headers.get("X-Gitlab-Event"),
+            result[1],
+            format_seconds(perf_counter() - started_at),
+        )
+        return result
+
+    @staticmethod
+    def _event_id(headers: Mapping[str, str]) -> str | None:
+        for header in _EVENT_ID_HEADERS:
+            value = (headers.get(header) or "").strip()
+            if value:
+                return value
+        return None
+
+    def _dispatch(
+        self,
+        headers: Mapping[str, str],
+        read_body: Callable[[], bytes],
+    ) -> WebhookResult:
+        received_token = headers.get("X-Gitlab-Token")
+        if received_token != self._settings.gitlab_webhook_secret_token:
             return "Unauthorized", 403
 
-        payload = request.json or {}
-        object_kind = payload.get("object_kind")
+        event_repo = self._event_repo
+        delivery_id = self._event_id(headers) if event_repo is not None else None
+        if event_repo is None or delivery_id is None:
+            return self._handle_event(headers, read_body)
+
+        previous = event_repo.claim(delivery_id)
+        if previous is not None:
+            logger.info("Duplicate webhook delivery answered from seen-set: event_id=%s", delivery_id)
+            return previous
+
+        try:
+            response = self._handle_event(headers, read_body)
+        except Exception:
+            event_repo.release(delivery_id)
+            raise
+        event_repo.complete(delivery_id, response)
+        return response
+
+    def _kind_disabled(self, object_kind: str | None) -> str | None:
+        settings = self._settings
+        if object_kind == "merge_request" and (
+            not settings.enable_merge_request_review
+            and not settings.enable_refactor_suggestion_review
+        ):
+            return "merge_request handling disabled"
+        if object_kind == "push" and not settings.enable_push_review:
+            return "push handling disabled"
+        return None
+
+    def _handle_event(
+        self,
+        headers: Mapping[str, str],
+        read_body: Callable[[], bytes],
+    ) -> WebhookResult:
+        event_header = headers.get("X-Gitlab-Event")
+        object_kind = _EVENT_HEADER_KINDS.get(event_header or "")
+        if event_header and object_kind is None and event_header not in _BODY_ROUTED_EVENT_HEADERS:
+            return "OK", 200
+
+        disabled = self._kind_disabled(object_kind)
+        if disabled is not None:
+            return disabled, 200
+
+        try:
+            payload = loads(read_body() or b"{}")
+        except ValueError:
+            return "Invalid JSON payload", 400
+        if not isinstance(payload, dict):
+            payload = {}
+
+        if object_kind is None:
+            object_kind = payload.get("object_kind")
+            disabled = self._kind_disabled(object_kind)
+            if disabled is not None:
+                return disabled, 200
 
         if object_kind == "merge_request":
-            if (
-                not settings.enable_merge_request_review
-                and not settings.enable_refactor_suggestion_review
-            ):
-                return "merge_request handling disabled", 200
-            return orchestrator.handle_merge_request_event(payload)
+            return self._orchestrator.handle_merge_request_event(
+                extract_merge_request_fields(payload)
+            )
 
         if object_kind == "push":
-            if not settings.enable_push_review:
-                return "push handling disabled", 200
-            return orchestrator.handle_push_event(payload)
+            return self._orchestrator.handle_push_event(extract_push_fields(payload))
 
         return "OK", 200
+
+
+def register_webhook_routes(
+    app: Flask,
+    *,
+    settings: AppSettings,
+    orchestrator: WebhookOrchestrator,
+    event_repo: WebhookEventRepository | None = None,
+) -> None:
+    handler = WebhookRequestHandler(
+        settings=settings,
+        orchestrator=orchestrator,
+        event_repo=event_repo,
+    )
+
+    @app.route("/webhook", methods=["POST"])
+    def webhook() -> WebhookResult:
+        return handler.handle(request.headers, lambda: request.get_data(cache=False))
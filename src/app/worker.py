@@ -0,0 +1,149 @@
+"""Standalone queue consumer: `python -m src.app.worker [--shards N] [--shard I]`.
+
+Runs the review and refactor-suggestion workers outside the web process. The
+web tier is started with `QUEUE_BACKEND=sqlite` and `QUEUE_CONSUMERS=external`
+so it only enqueues, and LLM throughput is scaled by adding worker processes.
+
+Tasks are sharded by consistent hashing on `project_id`: each project is served
+by exactly one shard process, in queue order. Shard processes that crash are
+restarted until the worker is shut down.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import threading
+from typing import Callable, List, Optional, Sequence
+
+from src.app.bootstrap import build_components, setup_logging
+from src.app.config import AppSettings
+from src.app.lifecycle import install_shutdown_handler
+from src.app.metrics import start_metrics_server
+from src.infra.queue.sharding import ShardAssignment
+from src.shared.errors import ConfigurationError
+
+
+logger = logging.getLogger(__name__)
+
+_SHARD_SUPERVISE_INTERVAL_SECONDS = 1.0
+
+
+def _load_settings() -> AppSettings:
+    settings = AppSettings.from_env(require_webhook_secret=False)
+    if settings.queue_backend != "sqlite":
+        raise ConfigurationError("src.app.worker requires QUEUE_BACKEND=sqlite")
+    return settings
+
+
+def _check_shard_count(settings: AppSettings, count: int) -> None:
+    if count <= 0:
+        raise ConfigurationError("--shards must be >= 1")
+    if count > 1 and not settings.rate_limit_db_path:
+        raise ConfigurationError(
+            "RATE_LIMIT_DB_PATH is required with more than one worker shard; "
+            "otherwise every shard applies the full rate limit on its own"
+        )
+
+
+def run_shard(index: int, count: int) -> None:
+    settings = _load_settings()
+    setup_logging(settings.log_level)
+    _check_shard_count(settings, count)
+
+    components = build_components(settings, shard=ShardAssignment(index=index, count=count))
+    install_shutdown_handler(lambda: components.shutdown(settings.shutdown_drain_timeout_seconds))
+    if settings.metrics_enabled and settings.worker_metrics_port is not None:
+        # One port per shard so every process can be scraped on the same host.
+        port = settings.worker_metrics_port + index
+        start_metrics_server(port)
+        logger.info("Worker shard %s/%s serving /metrics on port %s", index, count, port)
+    logger.info("Worker shard %s/%s started", index, count)
+    # Queue workers are daemon threads; keep the process alive for them until
+    # SIGTERM drains the queues and exits.
+    threading.Event().wait()
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.app.worker", description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="Total number of shards (default: WORKER_SHARDS).",
+    )
+    parser.add_argument(
+        "--shard",
+        type=int,
+        default=None,
+        help="Run only this shard index in the current process (e.g. one container per shard).",
+    )
+    return parser.parse_args(argv)
+
+
+def supervise_shards(
+    processes: List[multiprocessing.process.BaseProcess],
+    start_shard: Callable[[int], multiprocessing.process.BaseProcess],
+    stopping: threading.Event,
+    *,
+    interval_seconds: float = _SHARD_SUPERVISE_INTERVAL_SECONDS,
+) -> None:
+    """Restart crashed shards in place until shutdown or every shard exits cleanly.
+
+    A non-zero exit code (an exception, or a signal such as the OOM killer's
+    SIGKILL) is a crash; exit code 0 means the shard was shut down on purpose.
+    """
+    restarts = 0
+    while not stopping.wait(interval_seconds):
+        for index, process in enumerate(processes):
+            if process.exitcode is None or process.exitcode == 0 or stopping.is_set():
+                continue
+            restarts += 1
+            logger.error(
+                "Worker shard %s exited with code %s; restarting (restarts=%s)",
+                index,
+                process.exitcode,
+                restarts,
+            )
+            processes[index] = start_shard(index)
+        if all(process.exitcode == 0 for process in processes):
+            return
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parse_args(argv)
+    settings = _load_settings()
+    setup_logging(settings.log_level)
+    count = args.shards if args.shards is not None else settings.worker_shards
+    _check_shard_count(settings, count)
+
+    if args.shard is not None:
+        run_shard(args.shard, count)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    stopping = threading.Event()
+
+    def start_shard(index: int) -> multiprocessing.process.BaseProcess:
+        process = context.Process(target=run_shard, args=(index, count), name=f"worker-shard-{index}")
+        process.start()
+        return process
+
+    processes = [start_shard(index) for index in range(count)]
+    logger.info("Started %s worker shard process(es)", count)
+
+    def stop_shards() -> None:
+        stopping.set()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(settings.shutdown_drain_timeout_seconds + 5)
+
+    install_shutdown_handler(stop_shards)
+    supervise_shards(processes, start_shard, stopping)
+
+
+if __name__ == "__main__":
+    main()
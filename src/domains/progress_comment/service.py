@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from src.domains.progress_comment.tasks import (
+    CommitProgressCommentTask,
+    MergeRequestProgressCommentTask,
+)
+from src.infra.clients.gitlab import GitLabClient
+from src.shared.time_utils import format_seconds
+
+
+logger = logging.getLogger(__name__)
+
+AI_PROGRESS_MESSAGE = (
+    "AI가 코드를 검토 중입니다. 잠시만 기다려 주세요.\n"
+    "\n"
+    "이 코멘트는 자동으로 생성되었습니다."
+)
+
+ProgressCommentTask = MergeRequestProgressCommentTask | CommitProgressCommentTask
+
+
+class ProgressCommentService:
+    """Posts the "review in progress" note, inline or from a background queue."""
+
+    def __init__(self, *, gitlab_client: GitLabClient) -> None:
+        self._gitlab_client = gitlab_client
+
+    def run_task(self, task: ProgressCommentTask) -> None:
+        if isinstance(task, MergeRequestProgressCommentTask):
+            self.post_merge_request_progress(task)
+            return
+        if isinstance(task, CommitProgressCommentTask):
+            self.post_commit_progress(task)
+            return
+        raise TypeError(f"Unknown progress comment task type: {type(task)}")
+
+    def post_merge_request_progress(self, task: MergeRequestProgressCommentTask) -> None:
+        started_at = time.monotonic()
+        try:
+            self._gitlab_client.post_merge_request_comment(
+                project_id=task.project_id,
+                merge_request_iid=task.merge_request_iid,
+                body=AI_PROGRESS_MESSAGE,
+            )
+        except Exception:  # noqa: BLE001 - best effort
+            logger.exception(
+                "Failed to post AI progress comment for merge_request: project_id=%s, mr_id=%s",
+                task.project_id,
+                task.merge_request_iid,
+            )
+            return
+
+        finished_at = time.monotonic()
+        logger.info(
+            "Posted AI progress comment for merge_request: project_id=%s, mr_id=%s, queue_wait=%s, post=%s",
+            task.project_id,
+            task.merge_request_iid,
+            format_seconds(started_at - task.enqueued_at),
+            format_seconds(finished_at - started_at),
+        )
+
+    def post_commit_progress(self, task: CommitProgressCommentTask) -> None:
+        started_at = time.monotonic()
+        try:
+            self._gitlab_client.post_commit_comment(
+                project_id=task.project_id,
+                commit_id=task.commit_id,
+                note=AI_PROGRESS_MESSAGE,
+            )
+        except Exception:  # noqa: BLE001 - best effort
+            logger.exception(
+                "Failed to post AI progress comment for commit: project_id=%s, commit_id=%s",
+                task.project_id,
+                task.commit_id,
+            )
+            return
+
+        finished_at = time.monotonic()
+        logger.info(
+            "Posted AI progress comment for commit: project_id=%s, commit_id=%s, queue_wait=%s, post=%s",
+            task.project_id,
+            task.commit_id,
+            format_seconds(started_at - task.enqueued_at),
+            format_seconds(finished_at - started_at),
+        )
@@ -0,0 +1,16 @@
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class MergeRequestProgressCommentTask:
+    project_id: int
+    merge_request_iid: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass(frozen=True)
+class CommitProgressCommentTask:
+    project_id: int
+    commit_id: str
+    enqueued_at: float = field(default_factory=time.monotonic)
@@ -10,6 +10,7 @@ from src.infra.clients.llm import LLMClient
 from src.infra.monitoring.llm_webhook import LLMMonitoringWebhookClient
 from src.infra.repositories.refactor_suggestion_state_repo import RefactorSuggestionStateRepository
 from src.shared.comment_utils import build_llm_footer
+from src.shared.timing import span
 
 
 logger = logging.getLogger(__name__)
@@ -121,8 +122,10 @@ class RefactorSuggestionReviewService:
                 self._state_repo.mark_completed(task.project_id, task.merge_request_iid)
                 return
 
-            messages = generate_refactor_suggestion_prompt(files)
-            llm_result = self._llm_client.generate_review_content_with_stats(messages)
+            with span("prompt_build"):
+                messages = generate_refactor_suggestion_prompt(files)
+            with span("llm"):
+                llm_result = self._llm_client.generate_review_content_with_stats(messages)
 
             comment_body = (
                 _build_comment_header()
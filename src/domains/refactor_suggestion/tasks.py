@@ -9,3 +9,7 @@ class RefactorSuggestionReviewTask:
     max_files: int
     max_file_chars: int
     max_total_chars: int
+
+
+def refactor_suggestion_task_project_key(task: RefactorSuggestionReviewTask) -> int:
+    return task.project_id
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from typing import List
 
-from src.domains.review.prompt import generate_review_prompt
+from src.domains.review.prompt import SUMMARY_ONLY_SYSTEM_INSTRUCTION, generate_review_prompt
 from src.infra.clients.llm import LLMClient
+from src.shared.cancellation import CancellationToken
+from src.shared.timing import span
 from src.shared.types import GitDiffChange, LLMReviewResult
 
 
@@ -14,9 +16,22 @@ class ReviewChain:
         self._llm_client = llm_client
         self._system_instruction = system_instruction
 
-    def invoke(self, changes: List[GitDiffChange]) -> LLMReviewResult:
-        messages = generate_review_prompt(
-            changes,
-            system_instruction=self._system_instruction,
-        )
-        return self._llm_client.generate_review_content_with_stats(messages)
+    def invoke(
+        self,
+        changes: List[GitDiffChange],
+        *,
+        cancel_token: CancellationToken | None = None,
+        summary_only: bool = False,
+    ) -> LLMReviewResult:
+        with span("prompt_build"):
+            messages = generate_review_prompt(
+                changes,
+                system_instruction=(
+                    SUMMARY_ONLY_SYSTEM_INSTRUCTION if summary_only else self._system_instruction
+                ),
+            )
+        with span("llm"):
+            return self._llm_client.generate_review_content_with_stats(
+                messages,
+                cancel_token=cancel_token,
+            )
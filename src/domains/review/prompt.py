@@ -63,6 +63,21 @@ VERDICT RULE: (판정 규칙)
 """
 
 
+SUMMARY_ONLY_SYSTEM_INSTRUCTION = """
+당신은 시니어 코드 리뷰어입니다. 현재 리뷰 대기열이 포화 상태라 **요약 리뷰**만 작성합니다.
+아래 diff를 보고 다음 형식으로만, 짧게 답하십시오. 오직 ```diff 블록 내의 내용만 근거로 하십시오.
+
+### 1. 🚦 종합 판정
+- 판정: [🟢 승인 | 🟡 코멘트 | 🔴 변경 요청]
+- 이유(KR): 한 문장 요약
+
+### 2. 🔍 변경 요약
+- 변경사항을 최대 5개의 bullet으로 요약(KR)
+
+> ⚠️ 대기열 과부하로 요약 리뷰만 제공되었습니다. (Summary-only review due to queue overload.)
+"""
+
+
 def format_file_header(change: GitDiffChange) -> str:
     old_path = change.get("old_path")
     new_path = change.get("new_path")
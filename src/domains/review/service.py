@@ -8,8 +8,11 @@ from src.infra.clients.gitlab import GitLabClient
 from src.infra.clients.llm import LLMClient
 from src.infra.monitoring.llm_webhook import LLMMonitoringWebhookClient
 from src.infra.repositories.review_cache_repo import ReviewCacheRepository
+from src.shared.cancellation import CancellationToken, raise_if_cancelled
 from src.shared.comment_utils import build_ai_error_comment, build_llm_footer
-from src.shared.types import GitDiffChange, LLMReviewResult
+from src.shared.errors import TaskCancelledError
+from src.shared.timing import span
+from src.shared.types import GitDiffChange, LLMReviewResult, TaskOutcome
 
 
 logger = logging.getLogger(__name__)
@@ -36,16 +39,14 @@ class ReviewService:
             system_instruction=review_system_prompt,
         )
 
-    def run_task(self, task: ReviewTask) -> None:
+    def run_task(self, task: ReviewTask) -> TaskOutcome:
         if isinstance(task, MergeRequestReviewTask):
-            self.run_merge_request_review(task)
-            return
+            return self.run_merge_request_review(task)
         if isinstance(task, PushReviewTask):
-            self.run_push_review(task)
-            return
+            return self.run_push_review(task)
         raise TypeError(f"Unknown review task type: {type(task)}")
 
-    def run_merge_request_review(self, task: MergeRequestReviewTask) -> None:
+    def run_merge_request_review(self, task: MergeRequestReviewTask) -> TaskOutcome:
         logger.info(
             "Running merge_request review: project_id=%s, mr_id=%s",
             task.project_id,
@@ -61,8 +62,16 @@ class ReviewService:
                 merge_request_iid=task.merge_request_iid,
             )
             changes: list[GitDiffChange] = mr_changes.get("changes", [])
+            raise_if_cancelled(task.cancel_token)
 
-            llm_result = self._get_or_create_review(provider, model, changes)
+            llm_result = self._get_or_create_review(
+                provider,
+                model,
+                changes,
+                cancel_token=task.cancel_token,
+                summary_only=task.summary_only,
+            )
+            raise_if_cancelled(task.cancel_token)
 
             self._monitoring_client.send_success(
                 review_type="merge_request_review",
@@ -79,6 +88,14 @@ class ReviewService:
                 merge_request_iid=task.merge_request_iid,
                 body=answer,
             )
+        except TaskCancelledError as cancelled:
+            logger.info(
+                "Abandoned superseded merge_request review: project_id=%s, mr_id=%s, reason=%s",
+                task.project_id,
+                task.merge_request_iid,
+                cancelled,
+            )
+            return TaskOutcome.CANCELLED
         except Exception as error:  # noqa: BLE001 - external APIs wrapper
             logger.exception(
                 "Failed to generate review for merge_request: project_id=%s, mr_id=%s",
@@ -111,30 +128,63 @@ class ReviewService:
                     task.project_id,
                     task.merge_request_iid,
                 )
+            return TaskOutcome.FAILED
+        return TaskOutcome.COMPLETED
+
+    def _fetch_push_changes(self, task: PushReviewTask) -> list[GitDiffChange]:
+        if task.base_ref:
+            changes = self._gitlab_client.get_compare_diff(
+                project_id=task.project_id,
+                from_ref=task.base_ref,
+                to_ref=task.commit_id,
+            )
+            if changes:
+                return changes
+            logger.info(
+                "Compare diff is empty; falling back to head commit diff: project_id=%s, base_ref=%s, commit_id=%s",
+                task.project_id,
+                task.base_ref,
+                task.commit_id,
+            )
+
+        return self._gitlab_client.get_commit_diff(
+            project_id=task.project_id,
+            commit_id=task.commit_id,
+        )
 
-    def run_push_review(self, task: PushReviewTask) -> None:
+    @staticmethod
+    def _push_gitlab_context(task: PushReviewTask) -> dict[str, object]:
+        context: dict[str, object] = {
+            "project_id": task.project_id,
+            "commit_id": task.commit_id,
+        }
+        if task.base_ref:
+            context["base_ref"] = task.base_ref
+        return context
+
+    def run_push_review(self, task: PushReviewTask) -> TaskOutcome:
         logger.info(
-            "Running push review: project_id=%s, commit_id=%s",
+            "Running push review: project_id=%s, commit_id=%s, base_ref=%s",
             task.project_id,
             task.commit_id,
+            task.base_ref,
         )
 
         provider = self._llm_client.provider_name
         model = self._llm_client.model_name
 
         try:
-            changes = self._gitlab_client.get_commit_diff(
-                project_id=task.project_id,
-                commit_id=task.commit_id,
+            changes = self._fetch_push_changes(task)
+            llm_result = self._get_or_create_review(
+                provider,
+                model,
+                changes,
+                summary_only=task.summary_only,
             )
-            llm_result = self._get_or_create_review(provider, model, changes)
 
             self._monitoring_client.send_success(
                 review_type="push_review",
-                gitlab_context={
-                    "project_id": task.project_id,
-                    "commit_id": task.commit_id,
-                },
+                gitlab_context=self._push_gitlab_context(task),
                 llm_result=llm_result,
             )
 
@@ -152,10 +202,7 @@ class ReviewService:
             )
             self._monitoring_client.send_error(
                 review_type="push_review",
-                gitlab_context={
-                    "project_id": task.project_id,
-                    "commit_id": task.commit_id,
-                },
+                gitlab_context=self._push_gitlab_context(task),
                 provider=provider,
                 model=model,
                 error=error,
@@ -176,27 +223,43 @@ class ReviewService:
                     task.project_id,
                     task.commit_id,
                 )
+            return TaskOutcome.FAILED
+        return TaskOutcome.COMPLETED
 
     def _get_or_create_review(
         self,
         provider: str,
         model: str,
         changes: list[GitDiffChange],
+        *,
+        cancel_token: CancellationToken | None = None,
+        summary_only: bool = False,
     ) -> LLMReviewResult:
-        cached = self._review_cache_repo.get(
-            provider=provider,
-            model=model,
-            changes=changes,
-        )
+        if summary_only:
+            # Summary reviews are a load-shedding fallback; keep them out of the cache so
+            # a later full review of the same diff is not served a summary.
+            return self._review_chain.invoke(
+                changes,
+                cancel_token=cancel_token,
+                summary_only=True,
+            )
+
+        with span("cache_lookup"):
+            cached = self._review_cache_repo.get(
+                provider=provider,
+                model=model,
+                changes=changes,
+            )
         if cached is not None:
             logger.info("Using cached LLM review result")
             return cached
 
-        llm_result = self._review_chain.invoke(changes)
-        self._review_cache_repo.put(
-            provider=provider,
-            model=model,
-            changes=changes,
-            result=llm_result,
-        )
+        llm_result = self._review_chain.invoke(changes, cancel_token=cancel_token)
+        with span("cache_store"):
+            self._review_cache_repo.put(
+                provider=provider,
+                model=model,
+                changes=changes,
+                result=llm_result,
+            )
         return llm_result
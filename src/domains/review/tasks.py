@@ -1,13 +1,80 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from typing import Callable, Hashable
+
+from src.shared.cancellation import CancellationToken
 
 
 @dataclass(frozen=True)
 class MergeRequestReviewTask:
     project_id: int
     merge_request_iid: int
+    # In-process only: durable queues drop it (see src.infra.queue.codec.TRANSIENT).
+    cancel_token: CancellationToken | None = field(
+        default=None, compare=False, repr=False, metadata={"transient": True}
+    )
+    # Set when admitted under load: a short verdict/summary instead of the full review.
+    summary_only: bool = False
 
 
 @dataclass(frozen=True)
 class PushReviewTask:
     project_id: int
     commit_id: str
+    # When set, the whole ``base_ref..commit_id`` range is reviewed in one call.
+    base_ref: str | None = None
+    summary_only: bool = False
+
+
+def merge_request_review_key(project_id: int, merge_request_iid: int) -> Hashable:
+    return ("merge_request", project_id, merge_request_iid)
+
+
+def review_task_coalesce_key(task: MergeRequestReviewTask | PushReviewTask) -> Hashable | None:
+    """Only the latest pending review of a merge request matters; pushes are kept as-is."""
+    if isinstance(task, MergeRequestReviewTask):
+        return merge_request_review_key(task.project_id, task.merge_request_iid)
+    return None
+
+
+def review_task_serial_key(task: MergeRequestReviewTask | PushReviewTask) -> Hashable:
+    """Reviews of one merge request (or one commit) must not run concurrently."""
+    if isinstance(task, MergeRequestReviewTask):
+        return merge_request_review_key(task.project_id, task.merge_request_iid)
+    return ("commit", task.project_id, task.commit_id)
+
+
+def review_task_project_key(task: MergeRequestReviewTask | PushReviewTask) -> Hashable:
+    """Fairness flow of a review task: one flow per GitLab project."""
+    return task.project_id
+
+
+def make_review_task_priority(
+    *, merge_request_priority: int, push_priority: int
+) -> Callable[[MergeRequestReviewTask | PushReviewTask], int]:
+    """Priority class per task type for the shared review queue (higher runs first)."""
+
+    def priority(task: MergeRequestReviewTask | PushReviewTask) -> int:
+        if isinstance(task, MergeRequestReviewTask):
+            return merge_request_priority
+        return push_priority
+
+    return priority
+
+
+def merge_push_review_tasks(older: PushReviewTask, newer: PushReviewTask) -> PushReviewTask:
+    """Fold a burst of pushes into one review of the newest head.
+
+    The oldest base is kept so the combined range still covers every push.
+    """
+    return PushReviewTask(
+        project_id=newer.project_id,
+        commit_id=newer.commit_id,
+        base_ref=older.base_ref or newer.base_ref,
+        summary_only=newer.summary_only,
+    )
+
+
+def degrade_review_task(
+    task: MergeRequestReviewTask | PushReviewTask,
+) -> MergeRequestReviewTask | PushReviewTask:
+    return replace(task, summary_only=True)
@@ -1,61 +1,395 @@
 from __future__ import annotations
 
 import logging
+import random
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, Hashable, List, Mapping
 from urllib.parse import quote
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
 from src.shared.errors import GitLabAPIError
+from src.shared.metrics import REGISTRY
+from src.shared.throttle import parse_retry_after
+from src.shared.timing import record
 from src.shared.types import GitDiffChange, MergeRequestChangesResponse
 
 
 logger = logging.getLogger(__name__)
 
+# ``endpoint`` is a fixed name per API route (not the URL) to keep label
+# cardinality bounded; ``status`` is the HTTP status or "error" without one.
+GITLAB_REQUEST_SECONDS = REGISTRY.histogram(
+    "gitlab_ai_reviewer_gitlab_request_seconds",
+    "GitLab API request latency.",
+    ("endpoint", "method", "status"),
+)
+
+GITLAB_RETRIES = REGISTRY.counter(
+    "gitlab_ai_reviewer_gitlab_retries_total",
+    "GitLab API requests retried after a transient failure.",
+    ("endpoint", "reason"),
+)
+
+GITLAB_RESPONSE_CACHE = REGISTRY.counter(
+    "gitlab_ai_reviewer_gitlab_response_cache_total",
+    "Conditional GitLab GETs by outcome: hit (304 served from cache) or miss.",
+    ("endpoint", "result"),
+)
+
+_RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class _CachedResponse:
+    """What a cache hit needs to rebuild a response: body, status and headers."""
+
+    etag: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    encoding: str | None
+
+    @classmethod
+    def from_response(cls, etag: str, response: requests.Response) -> "_CachedResponse":
+        return cls(
+            etag=etag,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            content=response.content,
+            encoding=response.encoding,
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(len(name) + len(value) for name, value in self.headers.items())
+
+    def to_response(self, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.encoding = self.encoding
+        response.url = url
+        return response
+
+
+class _ResponseCache:
+    """LRU of GET responses that carried an ``ETag``, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _CachedResponse]" = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any] | None) -> Hashable:
+        return url, tuple(sorted((str(name), str(value)) for name, value in (params or {}).items()))
+
+    def get(self, key: Hashable) -> _CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, etag: str, response: requests.Response) -> None:
+        entry = _CachedResponse.from_response(etag, response)
+        with self._lock:
+            self._discard_locked(key)
+            if entry.size > self._max_bytes:
+                return
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._discard_locked(key)
+
+    def _discard_locked(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+def _get_int_header(headers: Mapping[str, str], name: str) -> int | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _reset_in_seconds(value: str | None) -> float | None:
+    """``RateLimit-Reset`` is a Unix timestamp on GitLab; accept delta-seconds too."""
+    if value is None:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1_000_000_000:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def _observe_request(endpoint: str, method: str, started_at: float, response: requests.Response | None) -> None:
+    status = str(response.status_code) if response is not None else "error"
+    elapsed = time.monotonic() - started_at
+    GITLAB_REQUEST_SECONDS.labels(endpoint, method, status).observe(elapsed)
+    record(f"gitlab.{endpoint}", elapsed)
+
 
 @dataclass(frozen=True)
 class GitLabClientConfig:
     api_base_url: str
     access_token: str
     timeout_seconds: float
+    # Keep-alive connections kept open per host; size it to the number of
+    # worker threads that call GitLab concurrently.
+    pool_size: int = 10
+    # Retries of GETs (and of requests GitLab rejected with 429) on 429/5xx
+    # gateway errors and connection failures, with full-jitter backoff.
+    max_retries: int = 3
+    retry_backoff_seconds: float = 0.5
+    retry_backoff_max_seconds: float = 30.0
+    # Below this share of ``RateLimit-Limit`` left, requests are spread evenly
+    # until ``RateLimit-Reset``.
+    rate_limit_slowdown_ratio: float = 0.1
+    # Total bytes of ETag'd GET responses kept for conditional re-reads (0 disables).
+    response_cache_max_bytes: int = 32 * 1024 * 1024
 
 
 class GitLabClient:
+    """GitLab REST client sharing one keep-alive connection pool.
+
+    All calls go through a single ``requests.Session``, so worker threads reuse
+    pooled TCP/TLS connections instead of opening one per request. When more
+    than ``pool_size`` threads call at once the extra connections are opened
+    and discarded after use rather than blocking.
+
+    Transient failures (429, 502-504, connection errors) of GETs are retried up
+    to ``max_retries`` times, honouring ``Retry-After``. GitLab's
+    ``RateLimit-Remaining``/``RateLimit-Reset`` headers pace every thread using
+    the client: once little of the budget is left, requests are spaced to last
+    until the reset, and an exhausted budget or a 429 pauses all of them.
+
+    Bodies of GET responses that carry an ``ETag`` are kept in an LRU of at
+    most ``response_cache_max_bytes``, keyed by URL and params. Repeated reads
+    send ``If-None-Match`` and a ``304 Not Modified`` is answered from the
+    cache, so unchanged MR changes and files cost GitLab almost nothing.
+    """
+
     def __init__(self, config: GitLabClientConfig) -> None:
+        if config.pool_size <= 0:
+            raise ValueError("pool_size must be positive")
+        if config.max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+        if config.response_cache_max_bytes < 0:
+            raise ValueError("response_cache_max_bytes must not be negative")
+
         self._api_base_url = config.api_base_url
         self._access_token = config.access_token
         self._timeout_seconds = config.timeout_seconds
+        self._max_retries = config.max_retries
+        self._retry_backoff_seconds = config.retry_backoff_seconds
+        self._retry_backoff_max_seconds = config.retry_backoff_max_seconds
+        self._rate_limit_slowdown_ratio = config.rate_limit_slowdown_ratio
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_size)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(self._headers())
+
+        self._response_cache = (
+            _ResponseCache(config.response_cache_max_bytes) if config.response_cache_max_bytes else None
+        )
+
+        self._rate_lock = threading.Lock()
+        self._not_before = 0.0
+        self._pace_interval = 0.0
 
     def _headers(self) -> Dict[str, str]:
         return {"Private-Token": self._access_token}
 
-    def _request_json(
+    def close(self) -> None:
+        self._session.close()
+
+    def _wait_for_rate_limit(self) -> None:
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._not_before)
+            self._not_before = start + self._pace_interval
+        wait = start - now
+        if wait > 0.0:
+            time.sleep(wait)
+            record("gitlab_rate_limit_wait", wait)
+
+    def _observe_rate_limit(self, response: requests.Response) -> None:
+        headers = response.headers
+        remaining = _get_int_header(headers, "RateLimit-Remaining")
+        limit = _get_int_header(headers, "RateLimit-Limit")
+        reset_in = _reset_in_seconds(headers.get("RateLimit-Reset"))
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+
+        pause = None
+        if response.status_code == 429:
+            pause = retry_after if retry_after is not None else reset_in
+        elif remaining == 0:
+            pause = reset_in
+        with self._rate_lock:
+            if pause is not None:
+                self._not_before = max(self._not_before, time.monotonic() + pause)
+            if remaining is None or reset_in is None:
+                return
+            previous = self._pace_interval
+            if limit and remaining <= limit * self._rate_limit_slowdown_ratio:
+                self._pace_interval = reset_in / max(1, remaining)
+            else:
+                self._pace_interval = 0.0
+            paced = self._pace_interval
+        if paced and not previous:
+            logger.warning(
+                "GitLab rate limit almost exhausted (remaining=%s/%s, reset in %.0fs); spacing requests %.2fs apart",
+                remaining,
+                limit,
+                reset_in,
+                paced,
+            )
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        ceiling = min(self._retry_backoff_max_seconds, self._retry_backoff_seconds * (2**attempt))
+        return random.uniform(0.0, ceiling)
+
+    def _send(
         self,
         *,
+        endpoint: str,
         method: str,
         url: str,
         params: Dict[str, Any] | None = None,
         json_payload: Dict[str, Any] | None = None,
-    ) -> Any:
-        try:
-            response = requests.request(
+        headers: Dict[str, str] | None = None,
+    ) -> requests.Response:
+        attempt = 0
+        while True:
+            # Only GETs are safe to repeat after an unknown outcome; a 429 means
+            # GitLab did not process the request, so any method may retry it.
+            retries = self._max_retries if method == "GET" else 0
+            self._wait_for_rate_limit()
+            started_at = time.monotonic()
+            response: requests.Response | None = None
+            try:
+                try:
+                    response = self._session.request(
+                        method,
+                        url,
+                        params=params,
+                        json=json_payload,
+                        headers=headers,
+                        timeout=self._timeout_seconds,
+                    )
+                finally:
+                    _observe_request(endpoint, method, started_at, response)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt >= retries:
+                    raise GitLabAPIError(f"GitLab API request failed: {method} {url}") from exc
+                reason = type(exc).__name__
+                delay = self._backoff_seconds(attempt)
+            except requests.RequestException as exc:
+                raise GitLabAPIError(f"GitLab API request failed: {method} {url}") from exc
+            else:
+                self._observe_rate_limit(response)
+                if response.status_code == 429:
+                    retries = self._max_retries
+                if response.status_code not in _RETRYABLE_STATUS or attempt >= retries:
+                    try:
+                        response.raise_for_status()
+                    except requests.HTTPError as exc:
+                        raise GitLabAPIError(
+                            f"GitLab API request failed: {method} {url} status={response.status_code}"
+                        ) from exc
+                    return response
+                reason = str(response.status_code)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = retry_after if retry_after is not None else self._backoff_seconds(attempt)
+
+            GITLAB_RETRIES.labels(endpoint, reason).inc()
+            logger.warning(
+                "GitLab API %s %s failed (%s); retrying in %.2fs (attempt %s/%s)",
                 method,
                 url,
-                headers=self._headers(),
-                params=params,
-                json=json_payload,
-                timeout=self._timeout_seconds,
+                reason,
+                delay,
+                attempt + 1,
+                retries,
             )
-            response.raise_for_status()
+            time.sleep(delay)
+            record("gitlab_retry_wait", delay)
+            attempt += 1
+
+    def _fetch(
+        self,
+        *,
+        endpoint: str,
+        method: str,
+        url: str,
+        params: Dict[str, Any] | None = None,
+        json_payload: Dict[str, Any] | None = None,
+    ) -> requests.Response:
+        """``_send`` with conditional GETs answered from the response cache."""
+        if method != "GET" or self._response_cache is None:
+            return self._send(
+                endpoint=endpoint, method=method, url=url, params=params, json_payload=json_payload
+            )
+
+        key = _ResponseCache.key(url, params)
+        cached = self._response_cache.get(key)
+        response = self._send(
+            endpoint=endpoint,
+            method=method,
+            url=url,
+            params=params,
+            headers={"If-None-Match": cached.etag} if cached is not None else None,
+        )
+        if response.status_code == 304 and cached is not None:
+            GITLAB_RESPONSE_CACHE.labels(endpoint, "hit").inc()
+            return cached.to_response(url)
+
+        GITLAB_RESPONSE_CACHE.labels(endpoint, "miss").inc()
+        etag = response.headers.get("ETag")
+        if etag:
+            self._response_cache.put(key, etag, response)
+        else:
+            self._response_cache.discard(key)
+        return response
+
+    def _request_json(
+        self,
+        *,
+        endpoint: str,
+        method: str,
+        url: str,
+        params: Dict[str, Any] | None = None,
+        json_payload: Dict[str, Any] | None = None,
+    ) -> Any:
+        response = self._fetch(
+            endpoint=endpoint, method=method, url=url, params=params, json_payload=json_payload
+        )
+        try:
             return response.json()
-        except requests.HTTPError as exc:
-            status_code = exc.response.status_code if exc.response is not None else "unknown"
-            raise GitLabAPIError(
-                f"GitLab API request failed: {method} {url} status={status_code}"
-            ) from exc
-        except requests.RequestException as exc:
-            raise GitLabAPIError(f"GitLab API request failed: {method} {url}") from exc
         except ValueError as exc:
             raise GitLabAPIError(
                 f"GitLab API returned invalid JSON: {method} {url}"
@@ -64,27 +398,12 @@ class GitLabClient:
     def _request_text(
         self,
         *,
+        endpoint: str,
         method: str,
         url: str,
         params: Dict[str, Any] | None = None,
     ) -> str:
-        try:
-            response = requests.request(
-                method,
-                url,
-                headers=self._headers(),
-                params=params,
-                timeout=self._timeout_seconds,
-            )
-            response.raise_for_status()
-            return response.text
-        except requests.HTTPError as exc:
-            status_code = exc.response.status_code if exc.response is not None else "unknown"
-            raise GitLabAPIError(
-                f"GitLab API request failed: {method} {url} status={status_code}"
-            ) from exc
-        except requests.RequestException as exc:
-            raise GitLabAPIError(f"GitLab API request failed: {method} {url}") from exc
+        return self._fetch(endpoint=endpoint, method=method, url=url, params=params).text
 
     def get_merge_request_changes(
         self,
@@ -95,7 +414,7 @@ class GitLabClient:
         url = (
             f"{self._api_base_url}/projects/{project_id}/merge_requests/{merge_request_iid}/changes"
         )
-        data = self._request_json(method="GET", url=url)
+        data = self._request_json(endpoint="merge_request_changes", method="GET", url=url)
         logger.info(
             "Fetched merge_request changes: project_id=%s, mr_id=%s",
             project_id,
@@ -122,7 +441,9 @@ class GitLabClient:
         url = (
             f"{self._api_base_url}/projects/{project_id}/merge_requests/{merge_request_iid}/notes"
         )
-        _ = self._request_json(method="POST", url=url, json_payload={"body": body})
+        _ = self._request_json(
+            endpoint="merge_request_notes", method="POST", url=url, json_payload={"body": body}
+        )
         logger.info(
             "Posted merge_request review comment: project_id=%s, mr_id=%s",
             project_id,
@@ -131,13 +452,51 @@ class GitLabClient:
 
     def get_commit_diff(self, *, project_id: int, commit_id: str) -> List[GitDiffChange]:
         url = f"{self._api_base_url}/projects/{project_id}/repository/commits/{commit_id}/diff"
-        data = self._request_json(method="GET", url=url)
+        data = self._request_json(endpoint="commit_diff", method="GET", url=url)
         logger.info("Fetched commit diff: project_id=%s, commit_id=%s", project_id, commit_id)
 
         if not isinstance(data, list):
             raise GitLabAPIError("Invalid commit diff response: expected list")
         return data  # type: ignore[return-value]
 
+    def get_compare_diff(
+        self,
+        *,
+        project_id: int,
+        from_ref: str,
+        to_ref: str,
+    ) -> List[GitDiffChange]:
+        """Combined diff of ``from_ref..to_ref`` taken from their merge base.
+
+        ``straight=false`` makes GitLab diff against the merge base, so force
+        pushes and branches created from another ref still yield only the
+        changes introduced on ``to_ref``.
+        """
+        url = f"{self._api_base_url}/projects/{project_id}/repository/compare"
+        data = self._request_json(
+            endpoint="compare",
+            method="GET",
+            url=url,
+            params={"from": from_ref, "to": to_ref, "straight": "false"},
+        )
+        logger.info(
+            "Fetched compare diff: project_id=%s, from=%s, to=%s",
+            project_id,
+            from_ref,
+            to_ref,
+        )
+
+        if not isinstance(data, dict) or not isinstance(data.get("diffs"), list):
+            raise GitLabAPIError("Invalid compare response: 'diffs' must be a list")
+        if data.get("compare_timeout"):
+            logger.warning(
+                "GitLab compare timed out; diff may be partial: project_id=%s, from=%s, to=%s",
+                project_id,
+                from_ref,
+                to_ref,
+            )
+        return data["diffs"]  # type: ignore[no-any-return]
+
     def post_commit_comment(
         self,
         *,
@@ -146,7 +505,9 @@ class GitLabClient:
         note: str,
     ) -> None:
         url = f"{self._api_base_url}/projects/{project_id}/repository/commits/{commit_id}/comments"
-        _ = self._request_json(method="POST", url=url, json_payload={"note": note})
+        _ = self._request_json(
+            endpoint="commit_comments", method="POST", url=url, json_payload={"note": note}
+        )
         logger.info(
             "Posted commit review comment: project_id=%s, commit_id=%s",
             project_id,
@@ -164,7 +525,9 @@ class GitLabClient:
         url = (
             f"{self._api_base_url}/projects/{project_id}/repository/files/{encoded_path}/raw"
         )
-        text = self._request_text(method="GET", url=url, params={"ref": ref})
+        text = self._request_text(
+            endpoint="repository_file_raw", method="GET", url=url, params={"ref": ref}
+        )
         logger.info(
             "Fetched repository file raw: project_id=%s, ref=%s, path=%s",
             project_id,
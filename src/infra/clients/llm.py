@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import logging
+import random
+import threading
 from dataclasses import dataclass
 from enum import Enum
-from time import perf_counter
-from typing import List
+from time import monotonic, perf_counter, sleep
+from typing import Any, List, Mapping
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
@@ -12,12 +14,48 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_ollama import ChatOllama
 from langchain_openai import ChatOpenAI
 
-from src.shared.errors import LLMInvocationError
+from src.shared.cancellation import CancellationToken
+from src.shared.errors import LLMInvocationError, LLMRateLimitedError, TaskCancelledError
+from src.shared.metrics import REGISTRY
+from src.shared.rate_limiter import TokenBucketRateLimiter, acquire_task_rate_slot
+from src.shared.throttle import (
+    ThrottleObserver,
+    ThrottleSignal,
+    is_timeout_error,
+    throttle_signal_from_exception,
+    throttle_signal_from_headers,
+)
+from src.shared.timing import record
 from src.shared.types import ChatMessageDict, LLMReviewResult
 
 
 logger = logging.getLogger(__name__)
 
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "gitlab_ai_reviewer_llm_request_seconds",
+    "LLM invocation latency.",
+    ("provider", "model", "outcome"),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "gitlab_ai_reviewer_llm_tokens_total",
+    "Tokens reported by the LLM provider.",
+    ("provider", "model", "direction"),
+)
+LLM_THROTTLED = REGISTRY.counter(
+    "gitlab_ai_reviewer_llm_throttled_total",
+    "LLM calls rejected by the provider's rate limit (HTTP 429).",
+    ("provider", "model"),
+)
+
+# Backoff between throttled attempts when the provider sends no Retry-After.
+_THROTTLE_BACKOFF_BASE_SECONDS = 5.0
+_THROTTLE_BACKOFF_MAX_SECONDS = 120.0
+# Spread retries of workers throttled together over this fraction of Retry-After.
+_RETRY_AFTER_JITTER_RATIO = 0.2
+# A streamed call is abandoned this long after the client timeout, so the
+# provider SDK's own timeout error normally comes first.
+_STREAM_DEADLINE_GRACE_SECONDS = 5.0
+
 
 class LLMProvider(str, Enum):
     OPENAI = "openai"
@@ -37,6 +75,8 @@ class LLMClientConfig:
     ollama_base_url: str
     openrouter_api_key: str | None
     openrouter_base_url: str
+    max_tokens_per_minute: int | None = None
+    rate_limit_retries: int = 3
 
 
 class LLMClient:
@@ -55,6 +95,39 @@ class LLMClient:
         self._ollama_base_url = config.ollama_base_url
         self._openrouter_api_key = config.openrouter_api_key
         self._openrouter_base_url = config.openrouter_base_url
+        self._token_budget = (
+            TokenBucketRateLimiter(
+                max_requests_per_minute=None,
+                max_tokens_per_minute=config.max_tokens_per_minute,
+            )
+            if config.max_tokens_per_minute is not None
+            else None
+        )
+        self._rate_limit_retries = config.rate_limit_retries
+        self._throttle_observers: List[ThrottleObserver] = []
+
+    def add_throttle_observer(self, observer: ThrottleObserver) -> None:
+        """Report every call's rate-limit signal to ``observer`` (e.g. an adaptive limiter)."""
+        self._throttle_observers.append(observer)
+
+    def _notify_throttled(self, signal: ThrottleSignal) -> None:
+        LLM_THROTTLED.labels(self._provider.value, self._model).inc()
+        for observer in self._throttle_observers:
+            observer.on_throttled(signal)
+
+    def _notify_timed_out(self) -> None:
+        signal = ThrottleSignal(throttled=False, timed_out=True)
+        for observer in self._throttle_observers:
+            observer.on_throttled(signal)
+
+    def _notify_success(self, response: Any) -> None:
+        if not self._throttle_observers:
+            return
+        metadata = getattr(response, "response_metadata", None)
+        headers = metadata.get("headers") if isinstance(metadata, dict) else None
+        signal = throttle_signal_from_headers(200, headers if isinstance(headers, Mapping) else None)
+        for observer in self._throttle_observers:
+            observer.on_success(signal)
 
     @property
     def provider_name(self) -> str:
@@ -64,6 +137,19 @@ class LLMClient:
     def model_name(self) -> str:
         return self._model
 
+    @staticmethod
+    def _estimate_prompt_tokens(messages: List[ChatMessageDict]) -> int:
+        # ~4 characters per token for English/code; reconciled with real usage after the call.
+        return sum(len(message.get("content", "")) for message in messages) // 4 + 1
+
+    def _reserve_tokens(self, messages: List[ChatMessageDict]) -> int:
+        if self._token_budget is None:
+            return 0
+        started_at = monotonic()
+        charged = self._token_budget.reserve_tokens(self._estimate_prompt_tokens(messages))
+        record("llm_token_budget_wait", monotonic() - started_at)
+        return charged
+
     @staticmethod
     def _to_langchain_messages(messages: List[ChatMessageDict]) -> List[BaseMessage]:
         lc_messages: List[BaseMessage] = []
@@ -101,6 +187,9 @@ class LLMClient:
             temperature=temperature,
             timeout=self._timeout_seconds,
             max_retries=self._max_retries,
+            stream_usage=True,
+            # Exposes x-ratelimit-* headers to the adaptive rate limiter.
+            include_response_headers=True,
         )
 
     def _create_gemini_llm(self, temperature: float) -> ChatGoogleGenerativeAI:
@@ -138,6 +227,9 @@ class LLMClient:
             timeout=self._timeout_seconds,
             base_url=self._openrouter_base_url,
             max_retries=self._max_retries,
+            stream_usage=True,
+            # Exposes x-ratelimit-* headers to the adaptive rate limiter.
+            include_response_headers=True,
         )
 
     def _create_llm(self, *, temperature: float) -> BaseChatModel:
@@ -158,20 +250,137 @@ class LLMClient:
 
         raise LLMInvocationError(f"Unsupported LLM provider: {self._provider.value}")
 
+    @staticmethod
+    def _invoke_cancellable(
+        llm: BaseChatModel,
+        lc_messages: List[BaseMessage],
+        cancel_token: CancellationToken,
+        *,
+        timeout_seconds: float,
+    ) -> BaseMessage:
+        """Stream the response on a helper thread so the caller can leave on cancel.
+
+        The calling worker returns as soon as the token is cancelled, or with
+        ``LLMInvocationError`` once ``timeout_seconds`` (plus a grace period)
+        has passed. The helper stops at the next chunk and closes the stream,
+        which closes the provider HTTP response for streaming-capable providers.
+        """
+        done = threading.Event()
+        abandoned = threading.Event()
+        outcome: dict[str, Any] = {}
+
+        def consume() -> None:
+            stream = llm.stream(lc_messages)
+            try:
+                aggregated: Any = None
+                for chunk in stream:
+                    if cancel_token.is_cancelled or abandoned.is_set():
+                        break
+                    aggregated = chunk if aggregated is None else aggregated + chunk
+                outcome["response"] = aggregated
+            except Exception as exc:  # noqa: BLE001 - re-raised on the caller thread
+                outcome["error"] = exc
+            finally:
+                close = getattr(stream, "close", None)
+                if callable(close):
+                    close()
+                done.set()
+
+        cancel_token.add_callback(done.set)
+        threading.Thread(target=consume, name="llm-stream", daemon=True).start()
+        finished = done.wait(timeout_seconds + _STREAM_DEADLINE_GRACE_SECONDS)
+
+        cancel_token.raise_if_cancelled()
+        if not finished:
+            abandoned.set()
+            # Chained so the caller classifies it as a timeout (see is_timeout_error).
+            raise LLMInvocationError(
+                f"LLM stream did not finish within {timeout_seconds:.0f}s"
+            ) from TimeoutError()
+        if "error" in outcome:
+            raise outcome["error"]
+        response = outcome.get("response")
+        if response is None:
+            raise LLMInvocationError("LLM returned an empty stream")
+        return response
+
+    def _wait_before_retry(
+        self,
+        signal: ThrottleSignal,
+        attempt: int,
+        cancel_token: CancellationToken | None,
+    ) -> None:
+        if signal.retry_after_seconds is not None:
+            # Never earlier than the provider asked for.
+            delay = signal.retry_after_seconds * (1.0 + random.uniform(0.0, _RETRY_AFTER_JITTER_RATIO))
+        else:
+            ceiling = min(_THROTTLE_BACKOFF_MAX_SECONDS, _THROTTLE_BACKOFF_BASE_SECONDS * (2**attempt))
+            delay = random.uniform(ceiling / 2, ceiling)
+        logger.warning(
+            "LLM provider throttled the request; retrying in %.1fs (attempt %s/%s): provider=%s, model=%s",
+            delay,
+            attempt + 1,
+            self._rate_limit_retries,
+            self._provider.value,
+            self._model,
+        )
+        started_at = monotonic()
+        if cancel_token is None:
+            sleep(delay)
+        elif cancel_token.wait(delay):
+            cancel_token.raise_if_cancelled()
+        # The retry is another provider call; pace it like any task of the queue.
+        acquire_task_rate_slot()
+        record("llm_throttle_wait", monotonic() - started_at)
+
+    def _observe_latency(self, seconds: float, outcome: str) -> None:
+        LLM_REQUEST_SECONDS.labels(self._provider.value, self._model, outcome).observe(seconds)
+
     def generate_review_content_with_stats(
         self,
         messages: List[ChatMessageDict],
+        *,
+        cancel_token: CancellationToken | None = None,
     ) -> LLMReviewResult:
         lc_messages = self._to_langchain_messages(messages)
 
         llm = self._create_llm(temperature=1.0)
 
-        try:
+        charged_tokens = self._reserve_tokens(messages)
+        attempt = 0
+        while True:
             started_at = perf_counter()
-            response = llm.invoke(lc_messages)
-            elapsed = perf_counter() - started_at
-        except Exception as exc:  # noqa: BLE001 - external provider wrapper
-            raise LLMInvocationError("Failed to invoke LLM") from exc
+            try:
+                if cancel_token is None:
+                    response = llm.invoke(lc_messages)
+                else:
+                    cancel_token.raise_if_cancelled()
+                    response = self._invoke_cancellable(
+                        llm, lc_messages, cancel_token, timeout_seconds=self._timeout_seconds
+                    )
+                elapsed = perf_counter() - started_at
+                break
+            except TaskCancelledError:
+                self._observe_latency(perf_counter() - started_at, "cancelled")
+                raise
+            except Exception as exc:  # noqa: BLE001 - external provider wrapper
+                signal = throttle_signal_from_exception(exc)
+                if signal is None:
+                    self._observe_latency(perf_counter() - started_at, "error")
+                    if is_timeout_error(exc):
+                        self._notify_timed_out()
+                    raise LLMInvocationError("Failed to invoke LLM") from exc
+                self._observe_latency(perf_counter() - started_at, "throttled")
+                self._notify_throttled(signal)
+                if attempt >= self._rate_limit_retries:
+                    raise LLMRateLimitedError(
+                        f"LLM provider is rate limiting requests (gave up after {attempt + 1} attempts)",
+                        retry_after_seconds=signal.retry_after_seconds,
+                    ) from exc
+                self._wait_before_retry(signal, attempt, cancel_token)
+                attempt += 1
+        self._observe_latency(elapsed, "success")
+        self._notify_success(response)
 
         content = str(response.content).strip()
         result: LLMReviewResult = {
@@ -207,9 +416,18 @@ class LLMClient:
 
         if input_tokens is not None:
             result["input_tokens"] = int(input_tokens)
+            LLM_TOKENS.labels(self._provider.value, self._model, "input").inc(int(input_tokens))
         if output_tokens is not None:
             result["output_tokens"] = int(output_tokens)
+            LLM_TOKENS.labels(self._provider.value, self._model, "output").inc(int(output_tokens))
         if total_tokens is not None:
             result["total_tokens"] = int(total_tokens)
 
+        if self._token_budget is not None:
+            actual_tokens = result.get("total_tokens")
+            if actual_tokens is None and (input_tokens is not None or output_tokens is not None):
+                actual_tokens = result.get("input_tokens", 0) + result.get("output_tokens", 0)
+            if actual_tokens is not None:
+                self._token_budget.reconcile_tokens(charged_tokens, actual_tokens)
+
         return result
@@ -6,6 +6,7 @@ from typing import Any, Dict
 
 import requests
 
+from src.shared.timing import current_timings, span
 from src.shared.types import LLMReviewResult
 
 
@@ -35,12 +36,18 @@ class LLMMonitoringWebhookClient:
         if self._webhook_url is None:
             return
 
+        timings = current_timings()
+        if timings is not None:
+            # Stages finished so far; stages after the webhook call are in the logs/metrics only.
+            payload["timings"] = timings.as_dict()
+
         try:
-            response = requests.post(
-                self._webhook_url,
-                json=payload,
-                timeout=self._timeout_seconds,
-            )
+            with span("monitoring_webhook"):
+                response = requests.post(
+                    self._webhook_url,
+                    json=payload,
+                    timeout=self._timeout_seconds,
+                )
             if response.status_code >= 400:
                 logger.warning(
                     "LLM monitoring webhook returned status_code=%s", response.status_code
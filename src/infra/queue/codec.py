@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from dataclasses import fields, is_dataclass
+from typing import Any, Dict, Generic, Type, TypeVar
+
+
+TTask = TypeVar("TTask")
+
+# Dataclass field metadata marking in-process state (e.g. cancellation tokens)
+# that cannot be persisted and is simply dropped by the codec.
+TRANSIENT = "transient"
+
+
+class DataclassTaskCodec(Generic[TTask]):
+    """JSON codec for the frozen dataclass tasks stored by durable queues."""
+
+    def __init__(self, *task_types: Type[Any]) -> None:
+        if not task_types:
+            raise ValueError("at least one task type is required")
+        for task_type in task_types:
+            if not is_dataclass(task_type):
+                raise TypeError(f"{task_type!r} is not a dataclass")
+        self._types: Dict[str, Type[Any]] = {task_type.__name__: task_type for task_type in task_types}
+
+    def encode(self, task: TTask) -> str:
+        type_name = type(task).__name__
+        if self._types.get(type_name) is not type(task):
+            raise TypeError(f"Unsupported task type: {type_name}")
+
+        values = {
+            field.name: getattr(task, field.name)
+            for field in fields(task)  # type: ignore[arg-type]
+            if not field.metadata.get(TRANSIENT)
+        }
+        return json.dumps({"type": type_name, "fields": values}, separators=(",", ":"))
+
+    def decode(self, payload: str) -> TTask:
+        data = json.loads(payload)
+        task_type = self._types.get(data.get("type"))
+        if task_type is None:
+            raise ValueError(f"Unsupported task type: {data.get('type')!r}")
+        return task_type(**data["fields"])
+
+    @staticmethod
+    def has_transient_state(task: TTask) -> bool:
+        return any(
+            field.metadata.get(TRANSIENT) and getattr(task, field.name) is not None
+            for field in fields(task)  # type: ignore[arg-type]
+        )
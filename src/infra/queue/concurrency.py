@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from src.shared.throttle import ThrottleSignal
+
+
+logger = logging.getLogger(__name__)
+
+
+class AimdConcurrencyController:
+    """Additive-increase / multiplicative-decrease target for a worker pool.
+
+    The queue reports every finished task; after each round of ``target`` tasks
+    the target grows by one worker if the queue still had a backlog, no task
+    failed and the round's mean latency stayed within ``latency_tolerance``
+    times the best round seen so far. Provider throttling or timeouts (reported
+    as a ``ThrottleObserver`` by the LLM client) and failed rounds cut the
+    target by ``decrease_factor``, at most once per ``cooldown_seconds``.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_workers: int,
+        max_workers: int,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        failure_ratio: float = 0.2,
+        cooldown_seconds: float = 30.0,
+        name: str = "queue",
+    ) -> None:
+        if min_workers <= 0:
+            raise ValueError("min_workers must be positive")
+        if max_workers < min_workers:
+            raise ValueError("max_workers must not be smaller than min_workers")
+        if not 0.0 < decrease_factor < 1.0:
+            raise ValueError("decrease_factor must be in (0, 1)")
+        if latency_tolerance < 1.0:
+            raise ValueError("latency_tolerance must be >= 1")
+
+        self._min = min_workers
+        self._max = max_workers
+        self._decrease_factor = decrease_factor
+        self._latency_tolerance = latency_tolerance
+        self._failure_ratio = failure_ratio
+        self._cooldown_seconds = cooldown_seconds
+        self._name = name
+
+        self._lock = threading.Lock()
+        self._target = min_workers
+        self._best_round_seconds: float | None = None
+        self._last_decrease_at = float("-inf")
+        self._reset_round_locked()
+
+    @property
+    def min_workers(self) -> int:
+        return self._min
+
+    @property
+    def max_workers(self) -> int:
+        return self._max
+
+    @property
+    def target(self) -> int:
+        with self._lock:
+            return self._target
+
+    def _reset_round_locked(self) -> None:
+        self._round_count = 0
+        self._round_seconds = 0.0
+        self._round_failures = 0
+
+    def _decrease_locked(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease_at < self._cooldown_seconds:
+            return
+        self._last_decrease_at = now
+        previous = self._target
+        self._target = max(self._min, int(self._target * self._decrease_factor))
+        self._reset_round_locked()
+        if self._target != previous:
+            logger.warning(
+                "Queue '%s' concurrency %s -> %s (%s)", self._name, previous, self._target, reason
+            )
+
+    def on_task_finished(self, *, seconds: float, failed: bool, backlog: bool) -> None:
+        with self._lock:
+            self._round_count += 1
+            self._round_seconds += seconds
+            self._round_failures += int(failed)
+            if self._round_count < self._target:
+                return
+
+            mean_seconds = self._round_seconds / self._round_count
+            failures = self._round_failures / self._round_count
+            self._reset_round_locked()
+            if failures > self._failure_ratio:
+                self._decrease_locked("failed tasks")
+                return
+            best = self._best_round_seconds
+            self._best_round_seconds = mean_seconds if best is None else min(best, mean_seconds)
+            if (
+                backlog
+                and self._target < self._max
+                and mean_seconds <= self._latency_tolerance * self._best_round_seconds
+            ):
+                self._target += 1
+
+    def on_throttled(self, signal: ThrottleSignal) -> None:
+        with self._lock:
+            self._decrease_locked("provider timed out" if signal.timed_out else "provider throttled")
+
+    def on_success(self, signal: ThrottleSignal) -> None:
+        return
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+TTask = TypeVar("TTask")
+
+
+class KeyedDebouncer(Generic[TTask]):
+    """Collapses bursts of tasks per key and releases one once the key is quiet.
+
+    Each submit pushes the key's deadline ``window_seconds`` into the future. A
+    single scheduler thread waits on a min-heap of deadlines; superseded heap
+    entries are skipped lazily, so there is no thread or timer per pending key.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        window_seconds: float,
+        on_ready: Callable[[TTask], None],
+        merge: Optional[Callable[[TTask, TTask], TTask]] = None,
+    ) -> None:
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+
+        self._name = name
+        self._window_seconds = window_seconds
+        self._on_ready = on_ready
+        self._merge = merge
+
+        self._cond = threading.Condition(threading.Lock())
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._pending: Dict[Hashable, Tuple[float, TTask]] = {}
+        self._sequence = itertools.count()
+        self._collapsed_count = 0
+
+        thread = threading.Thread(target=self._run, name=f"{name}-scheduler", daemon=True)
+        thread.start()
+
+        logger.info("Initialized debouncer '%s': window_seconds=%s", name, window_seconds)
+
+    @property
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    @property
+    def collapsed_count(self) -> int:
+        """Number of submits folded into an already pending task."""
+        with self._cond:
+            return self._collapsed_count
+
+    def submit(self, key: Hashable, task: TTask) -> None:
+        deadline = time.monotonic() + self._window_seconds
+        with self._cond:
+            existing = self._pending.get(key)
+            if existing is not None:
+                self._collapsed_count += 1
+                if self._merge is not None:
+                    task = self._merge(existing[1], task)
+            self._pending[key] = (deadline, task)
+            heapq.heappush(self._heap, (deadline, next(self._sequence), key))
+            self._cond.notify()
+
+    def flush(self) -> int:
+        """Release every pending task now (e.g. before shutdown); returns how many."""
+        with self._cond:
+            tasks = [task for _, task in self._pending.values()]
+            self._pending.clear()
+            self._heap.clear()
+
+        for task in tasks:
+            try:
+                self._on_ready(task)
+            except Exception:  # noqa: BLE001 - release the rest
+                logger.exception("Unexpected error while flushing debouncer '%s' task", self._name)
+        return len(tasks)
+
+    def _pop_ready(self) -> TTask:
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                deadline, _, key = self._heap[0]
+                current = self._pending.get(key)
+                if current is None or current[0] != deadline:
+                    heapq.heappop(self._heap)
+                    continue
+
+                wait = deadline - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+
+                heapq.heappop(self._heap)
+                del self._pending[key]
+                return current[1]
+
+    def _run(self) -> None:
+        while True:
+            task = self._pop_ready()
+            try:
+                self._on_ready(task)
+            except Exception:  # noqa: BLE001 - scheduler should stay alive
+                logger.exception("Unexpected error while releasing debouncer '%s' task", self._name)
@@ -1,67 +1,463 @@
 from __future__ import annotations
 
 import logging
-import queue
+import math
 import threading
-from typing import Callable, Generic, Optional, TypeVar
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Deque, Dict, Generic, Hashable, Optional, Protocol, TypeVar
 
-from src.shared.rate_limiter import FixedIntervalRateLimiter
+from src.infra.queue.concurrency import AimdConcurrencyController
+from src.infra.queue.schedulers import DeficitRoundRobinScheduler, FifoScheduler, PriorityScheduler
+from src.infra.queue.metrics import (
+    QUEUE_HANDLER_SECONDS,
+    QUEUE_WAIT_SECONDS,
+    RATE_LIMITER_WAIT_SECONDS,
+    observe_task_timings,
+    register_queue,
+)
+from src.infra.queue.worker_pool import WorkerPool
+from src.shared.errors import QueueClosedError, QueueFullError
+from src.shared.rate_limiter import (
+    FixedIntervalRateLimiter,
+    KeyedIntervalRateLimiter,
+    RateLimiter,
+    task_rate_limiter,
+)
+from src.shared.throttle import throttle_caller
+from src.shared.timing import TaskTimings, record, task_timings
+from src.shared.types import OverflowPolicy, TaskOutcome
 
 
 logger = logging.getLogger(__name__)
 
 TTask = TypeVar("TTask")
+TTask_contra = TypeVar("TTask_contra", contravariant=True)
+
+
+class EnqueueOutcome(str, Enum):
+    ACCEPTED = "accepted"
+    COALESCED = "coalesced"
+    DROPPED_OLDEST = "dropped_oldest"
+    DEGRADED = "degraded"
+
+
+class WorkerQueue(Protocol[TTask_contra]):
+    """What producers (the webhook orchestrator) need from a queue backend."""
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def pending_count(self) -> int: ...
+
+    def enqueue(self, task: TTask_contra) -> EnqueueOutcome: ...
+
+    def start(self) -> None: ...
+
+    def close(self) -> None: ...
+
+    def drain(self, timeout_seconds: float) -> bool: ...
+
+    def stop(self, timeout_seconds: float = 0.0) -> bool: ...
+
+
+@dataclass
+class _PendingEntry(Generic[TTask]):
+    task: TTask
+    key: Optional[Hashable]
+    seq: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+    serial_key: Optional[Hashable] = None
+
+
+@dataclass
+class WaitStats:
+    """Queue wait (enqueue -> worker start) aggregated per fairness flow."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def record(self, wait_seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += wait_seconds
+        self.max_seconds = max(self.max_seconds, wait_seconds)
 
 
 class InProcessWorkerQueue(Generic[TTask]):
-    """Generic in-process worker queue with global rate limiting."""
+    """Generic in-process worker queue with optional global rate limiting.
+
+    ``max_requests_per_minute=None`` disables rate limiting, which is used for
+    cheap stages (e.g. progress comments) that must not wait behind LLM budgets.
+
+    When ``coalesce_key`` is given, a task whose key matches a task that has not
+    started yet replaces it in place (O(1)) instead of being queued again. Tasks
+    for which the key function returns ``None`` are never coalesced.
+
+    ``max_pending_jobs`` is a hard capacity enforced according to
+    ``overflow_policy``; rejected tasks raise ``QueueFullError``.
+
+    ``fairness_key`` switches dispatch from FIFO to deficit round-robin across
+    the flows it returns (e.g. project ids), so one busy project cannot starve
+    the rest. ``flow_rate_limiter`` additionally caps each flow under the global
+    rate limit; flows over their ceiling are skipped rather than blocking a
+    worker.
+
+    ``priority`` puts tasks into classes (higher runs first) on top of that;
+    ``priority_aging_seconds`` lifts waiting work one class per interval so
+    low-priority tasks are never starved.
+
+    ``serial_key`` runs tasks that share a key (e.g. one merge request) one
+    at a time and in enqueue order. A worker that picks a task whose key is
+    busy parks it behind the running one and takes the next task instead, so
+    other keys never wait behind it; when the running task finishes, the
+    oldest parked task for its key is dispatched before the scheduler.
+
+    ``concurrency_controller`` makes ``worker_concurrency`` an upper bound:
+    the queue runs ``controller.target`` workers and resizes after every task
+    (see ``AimdConcurrencyController``). A task failed if its handler raised
+    or returned ``TaskOutcome.FAILED``.
+
+    ``rate_limiter`` replaces the per-queue ``FixedIntervalRateLimiter`` built
+    from ``max_requests_per_minute``, e.g. with one shared across processes.
+
+    ``clock`` (default ``time.monotonic``) timestamps enqueued tasks for wait
+    times and priority aging.
+
+    Workers start with the queue unless ``autostart=False`` (then call
+    ``start()``). ``drain`` closes intake and waits for pending and in-flight
+    tasks; ``stop`` drains up to a timeout and then lets workers exit, logging
+    whatever in-memory work is lost.
+    """
 
     def __init__(
         self,
         *,
         name: str,
-        handler: Callable[[TTask], None],
-        max_requests_per_minute: int,
+        handler: Callable[[TTask], Optional[TaskOutcome]],
+        max_requests_per_minute: Optional[int],
         worker_concurrency: int,
         max_pending_jobs_soft_limit: Optional[int] = None,
+        coalesce_key: Optional[Callable[[TTask], Optional[Hashable]]] = None,
+        max_pending_jobs: Optional[int] = None,
+        overflow_policy: OverflowPolicy = OverflowPolicy.REJECT,
+        degrade: Optional[Callable[[TTask], TTask]] = None,
+        fairness_key: Optional[Callable[[TTask], Hashable]] = None,
+        flow_rate_limiter: Optional[KeyedIntervalRateLimiter] = None,
+        priority: Optional[Callable[[TTask], int]] = None,
+        priority_aging_seconds: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        autostart: bool = True,
+        supervise_interval_seconds: float = 5.0,
+        concurrency_controller: Optional[AimdConcurrencyController] = None,
+        serial_key: Optional[Callable[[TTask], Optional[Hashable]]] = None,
+        clock: Callable[[], float] = time.monotonic,
     ) -> None:
         if worker_concurrency <= 0:
             raise ValueError("worker_concurrency must be positive")
+        if max_pending_jobs is not None and max_pending_jobs <= 0:
+            raise ValueError("max_pending_jobs must be positive")
+        if overflow_policy is OverflowPolicy.DEGRADE and degrade is None:
+            raise ValueError("overflow_policy=degrade requires a degrade function")
+        if flow_rate_limiter is not None and fairness_key is None:
+            raise ValueError("flow_rate_limiter requires a fairness_key")
+        if (
+            concurrency_controller is not None
+            and concurrency_controller.max_workers > worker_concurrency
+        ):
+            raise ValueError("concurrency_controller.max_workers must not exceed worker_concurrency")
 
         self._name = name
         self._handler = handler
-        self._job_queue: queue.Queue[TTask] = queue.Queue()
-        self._rate_limiter = FixedIntervalRateLimiter(max_requests_per_minute)
+        self._rate_limiter = rate_limiter or (
+            FixedIntervalRateLimiter(max_requests_per_minute)
+            if max_requests_per_minute is not None
+            else None
+        )
         self._max_pending_jobs_soft_limit = max_pending_jobs_soft_limit
+        self._coalesce_key = coalesce_key
+        self._max_pending_jobs = max_pending_jobs
+        self._overflow_policy = overflow_policy
+        self._degrade = degrade
+        self._worker_concurrency = worker_concurrency
+        self._fairness_key = fairness_key
+        self._flow_rate_limiter = flow_rate_limiter
+        self._concurrency = concurrency_controller
+        self._serial_key = serial_key
 
-        for index in range(worker_concurrency):
-            worker = threading.Thread(
-                target=self._worker_loop,
-                name=f"{name}-worker-{index + 1}",
-                daemon=True,
-            )
-            worker.start()
+        self._not_empty = threading.Condition(threading.Lock())
+        self._clock = clock
+        self._pending = self._build_scheduler(fairness_key, priority, priority_aging_seconds, clock)
+        self._next_seq = 0
+        self._wait_stats: Dict[Hashable, WaitStats] = {}
+        # Entries stay here until a worker actually starts them (i.e. after the
+        # rate limiter wait), so updates arriving meanwhile still coalesce.
+        self._unstarted_by_key: Dict[Hashable, _PendingEntry[TTask]] = {}
+        self._superseded_count = 0
+        self._rejected_count = 0
+        self._dropped_count = 0
+        self._degraded_count = 0
+        self._closed = False
+        # Entries popped by a worker and not finished yet (guarded by _not_empty).
+        self._taken = 0
+        # Serial keys with a task in flight, mapped to the entries parked behind
+        # it; released entries wait in _serial_ready until a worker takes them.
+        self._serial_busy: Dict[Hashable, Deque[_PendingEntry[TTask]]] = {}
+        self._serial_ready: Deque[_PendingEntry[TTask]] = deque()
+        self._serial_held = 0
+
+        self._wait_seconds = QUEUE_WAIT_SECONDS.labels(name)
+        self._limiter_wait_seconds = RATE_LIMITER_WAIT_SECONDS.labels(name)
+        self._handler_ok_seconds = QUEUE_HANDLER_SECONDS.labels(name, "success")
+        self._handler_error_seconds = QUEUE_HANDLER_SECONDS.labels(name, "error")
+        self._handler_cancelled_seconds = QUEUE_HANDLER_SECONDS.labels(name, "cancelled")
+
+        self._workers = WorkerPool(
+            name=name,
+            size=(
+                concurrency_controller.target
+                if concurrency_controller is not None
+                else worker_concurrency
+            ),
+            max_size=worker_concurrency,
+            target=self._worker_loop,
+            supervise_interval_seconds=supervise_interval_seconds,
+        )
+        if autostart:
+            self._workers.start()
+        register_queue(self)
 
         logger.info(
-            "Initialized queue '%s': workers=%s, max_requests_per_minute=%s, max_pending_jobs_soft_limit=%s",
+            "Initialized queue '%s': workers=%s, max_requests_per_minute=%s, max_pending_jobs_soft_limit=%s, coalescing=%s, max_pending_jobs=%s, overflow_policy=%s, fair=%s, prioritized=%s, serial=%s",
             name,
             worker_concurrency,
             max_requests_per_minute,
             max_pending_jobs_soft_limit,
+            coalesce_key is not None,
+            max_pending_jobs,
+            overflow_policy.value,
+            fairness_key is not None,
+            priority is not None,
+            serial_key is not None,
+        )
+
+    @staticmethod
+    def _build_scheduler(
+        fairness_key: Optional[Callable[[TTask], Hashable]],
+        priority: Optional[Callable[[TTask], int]],
+        priority_aging_seconds: Optional[float],
+        clock: Callable[[], float],
+    ):
+        def make_inner():
+            if fairness_key is not None:
+                return DeficitRoundRobinScheduler(flow_key=fairness_key)
+            return FifoScheduler()
+
+        if priority is None:
+            return make_inner()
+        return PriorityScheduler(
+            priority=priority,
+            make_inner=make_inner,
+            aging_seconds=priority_aging_seconds,
+            clock=clock,
+        )
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def in_flight_count(self) -> int:
+        """Tasks taken by a worker (waiting on the rate limiter or running)."""
+        return self._workers.in_flight_count
+
+    @property
+    def worker_count(self) -> int:
+        """Worker threads the queue currently runs (adjusted by the controller)."""
+        return self._workers.size
+
+    def start(self) -> None:
+        self._workers.start()
+
+    def close(self) -> None:
+        """Stop accepting new tasks; queued and running tasks still complete."""
+        with self._not_empty:
+            self._closed = True
+
+    def drain(self, timeout_seconds: float) -> bool:
+        """Close intake and wait until pending and in-flight tasks are done."""
+        self.close()
+        deadline = time.monotonic() + max(0.0, timeout_seconds)
+        while True:
+            with self._not_empty:
+                if not self._pending_count_locked() and not self._taken:
+                    return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def stop(self, timeout_seconds: float = 0.0) -> bool:
+        """Drain for up to ``timeout_seconds``, then stop the workers.
+
+        Returns False if work had to be abandoned; it is logged since an
+        in-memory queue cannot persist it.
+        """
+        drained = self.drain(timeout_seconds)
+        self._workers.request_stop()
+        with self._not_empty:
+            lost = self._pending_count_locked()
+            self._not_empty.notify_all()
+        in_flight = self._workers.in_flight()
+        if not drained:
+            logger.warning(
+                "Queue '%s' stopped before draining: pending_lost=%s, in_flight=%s",
+                self._name,
+                lost,
+                in_flight,
+            )
+        self._workers.join(0.1)
+        return drained
+
+    def _pending_count_locked(self) -> int:
+        # Entries parked behind a busy serial key have not started either.
+        return len(self._pending) + self._serial_held
+
+    @property
+    def pending_count(self) -> int:
+        with self._not_empty:
+            return self._pending_count_locked()
+
+    @property
+    def superseded_count(self) -> int:
+        """Number of queued tasks replaced by a newer task with the same key."""
+        with self._not_empty:
+            return self._superseded_count
+
+    @property
+    def rejected_count(self) -> int:
+        with self._not_empty:
+            return self._rejected_count
+
+    @property
+    def dropped_count(self) -> int:
+        with self._not_empty:
+            return self._dropped_count
+
+    @property
+    def degraded_count(self) -> int:
+        with self._not_empty:
+            return self._degraded_count
+
+    def wait_stats(self) -> Dict[Hashable, WaitStats]:
+        """Snapshot of queue wait per flow (a single ``None`` flow without fairness)."""
+        with self._not_empty:
+            return {
+                flow: WaitStats(stats.count, stats.total_seconds, stats.max_seconds)
+                for flow, stats in self._wait_stats.items()
+            }
+
+    def _retry_after_seconds_locked(self) -> int:
+        """Rough time until the backlog drains, used as the Retry-After hint."""
+        if self._rate_limiter is None:
+            return 1
+        backlog_seconds = self._pending_count_locked() * self._rate_limiter.interval_seconds
+        return max(1, math.ceil(backlog_seconds))
+
+    def _reject_locked(self, size: int) -> QueueFullError:
+        self._rejected_count += 1
+        logger.warning(
+            "Queue '%s' rejected task: pending=%s, capacity=%s, rejected_total=%s",
+            self._name,
+            size,
+            self._max_pending_jobs,
+            self._rejected_count,
+        )
+        return QueueFullError(
+            f"Queue '{self._name}' is full ({size} pending)",
+            retry_after_seconds=self._retry_after_seconds_locked(),
         )
 
-    def enqueue(self, task: TTask) -> None:
-        self._job_queue.put(task)
-        self._log_if_queue_too_long()
+    def _admit_locked(self, task: TTask) -> tuple[TTask, EnqueueOutcome]:
+        capacity = self._max_pending_jobs
+        size = self._pending_count_locked()
+        if capacity is None or size < capacity:
+            return task, EnqueueOutcome.ACCEPTED
+
+        if self._overflow_policy is OverflowPolicy.DROP_OLDEST:
+            dropped = self._pending.pop_oldest()
+            if dropped is None:
+                # Everything waiting is parked behind a running task of its serial
+                # key; those entries are not dropped, so there is no room.
+                raise self._reject_locked(size)
+            if dropped.key is not None and self._unstarted_by_key.get(dropped.key) is dropped:
+                del self._unstarted_by_key[dropped.key]
+            self._dropped_count += 1
+            logger.warning(
+                "Queue '%s' dropped oldest pending task: task=%r, dropped_total=%s",
+                self._name,
+                dropped.task,
+                self._dropped_count,
+            )
+            return task, EnqueueOutcome.DROPPED_OLDEST
+
+        if (
+            self._overflow_policy is OverflowPolicy.DEGRADE
+            and self._degrade is not None
+            and size < capacity * 2
+        ):
+            self._degraded_count += 1
+            return self._degrade(task), EnqueueOutcome.DEGRADED
+
+        raise self._reject_locked(size)
 
-    def _log_if_queue_too_long(self) -> None:
+    def enqueue(self, task: TTask) -> EnqueueOutcome:
+        key = self._coalesce_key(task) if self._coalesce_key is not None else None
+        serial_key = self._serial_key(task) if self._serial_key is not None else None
+
+        with self._not_empty:
+            if self._closed:
+                raise QueueClosedError(f"Queue '{self._name}' is shutting down", retry_after_seconds=1)
+            if key is not None:
+                existing = self._unstarted_by_key.get(key)
+                if existing is not None:
+                    existing.task = task
+                    self._superseded_count += 1
+                    logger.info(
+                        "Queue '%s' superseded pending task: key=%s, superseded_total=%s",
+                        self._name,
+                        key,
+                        self._superseded_count,
+                    )
+                    return EnqueueOutcome.COALESCED
+
+            task, outcome = self._admit_locked(task)
+            entry = _PendingEntry(
+                task=task, key=key, seq=self._next_seq, serial_key=serial_key, enqueued_at=self._clock()
+            )
+            self._next_seq += 1
+            self._pending.push(entry)
+            if key is not None:
+                self._unstarted_by_key[key] = entry
+            size = self._pending_count_locked()
+            self._not_empty.notify()
+
+        self._log_if_queue_too_long(size)
+        return outcome
+
+    def _log_if_queue_too_long(self, size: int) -> None:
         if (
             not self._max_pending_jobs_soft_limit
             or self._max_pending_jobs_soft_limit <= 0
         ):
             return
 
-        size = self._job_queue.qsize()
         if size > self._max_pending_jobs_soft_limit:
             logger.warning(
                 "Queue '%s' length %s exceeded soft limit %s",
@@ -70,13 +466,156 @@ class InProcessWorkerQueue(Generic[TTask]):
                 self._max_pending_jobs_soft_limit,
             )
 
+    def _flow_ready(self, flow: Hashable) -> bool:
+        assert self._flow_rate_limiter is not None
+        return self._flow_rate_limiter.ready_in(flow) <= 0.0
+
+    def _next_flow_ready_in_locked(self) -> Optional[float]:
+        """How long to sleep when every queued flow is over its ceiling."""
+        if self._flow_rate_limiter is None or not len(self._pending):
+            return None
+        return max(
+            0.01,
+            min(self._flow_rate_limiter.ready_in(flow) for flow in self._pending.flows()),
+        )
+
+    def _take_entry(self) -> Optional[_PendingEntry[TTask]]:
+        is_ready = self._flow_ready if self._flow_rate_limiter is not None else None
+        with self._not_empty:
+            while True:
+                if self._workers.stopping or self._workers.should_retire():
+                    return None
+                if self._serial_ready:
+                    # Its key is still marked busy on its behalf; it already
+                    # waited its turn, so it goes ahead of the scheduler.
+                    entry = self._serial_ready.popleft()
+                    self._serial_held -= 1
+                else:
+                    entry = self._pending.pop(is_ready)
+                    if entry is not None and not self._claim_serial_key_locked(entry):
+                        continue
+                if entry is not None:
+                    self._taken += 1
+                    if self._flow_rate_limiter is not None:
+                        self._flow_rate_limiter.reserve(self._pending.flow_of(entry))
+                    return entry
+                self._not_empty.wait(self._next_flow_ready_in_locked())
+
+    def _claim_serial_key_locked(self, entry: _PendingEntry[TTask]) -> bool:
+        """Mark the entry's serial key busy, or park the entry if it already is."""
+        if entry.serial_key is None:
+            return True
+        parked = self._serial_busy.get(entry.serial_key)
+        if parked is None:
+            self._serial_busy[entry.serial_key] = deque()
+            return True
+        parked.append(entry)
+        self._serial_held += 1
+        return False
+
+    def _release_serial_key(self, entry: _PendingEntry[TTask]) -> None:
+        if entry.serial_key is None:
+            return
+        with self._not_empty:
+            parked = self._serial_busy[entry.serial_key]
+            if not parked:
+                del self._serial_busy[entry.serial_key]
+                return
+            self._serial_ready.append(parked.popleft())
+            self._not_empty.notify()
+
+    def _start_entry(self, entry: _PendingEntry[TTask], limiter_wait_seconds: float) -> TTask:
+        with self._not_empty:
+            if entry.key is not None and self._unstarted_by_key.get(entry.key) is entry:
+                del self._unstarted_by_key[entry.key]
+            flow = self._fairness_key(entry.task) if self._fairness_key is not None else None
+            stats = self._wait_stats.get(flow)
+            if stats is None:
+                stats = self._wait_stats[flow] = WaitStats()
+            wait_seconds = self._clock() - entry.enqueued_at
+            stats.record(wait_seconds)
+        self._wait_seconds.observe(wait_seconds)
+        # Keep the per-task breakdown disjoint: the limiter wait is its own stage.
+        record("queue_wait", wait_seconds - limiter_wait_seconds)
+        return entry.task
+
+    def _acquire_rate_slot(self) -> float:
+        if self._rate_limiter is None:
+            return 0.0
+        started_at = time.monotonic()
+        self._rate_limiter.acquire()
+        waited = time.monotonic() - started_at
+        self._limiter_wait_seconds.observe(waited)
+        record("rate_limiter_wait", waited)
+        return waited
+
+    def _report_timings(self, timings: TaskTimings) -> None:
+        observe_task_timings(self._name, timings)
+        logger.info("Queue '%s' task timings: %s", self._name, timings.summary())
+
+    def _run_handler(self, task: TTask) -> None:
+        started_at = time.monotonic()
+        try:
+            with task_rate_limiter(self._rate_limiter), throttle_caller(self._name):
+                outcome = self._handler(task)
+        except BaseException:
+            seconds = time.monotonic() - started_at
+            self._handler_error_seconds.observe(seconds)
+            self._adjust_concurrency(seconds, failed=True)
+            raise
+        seconds = time.monotonic() - started_at
+        if outcome is TaskOutcome.CANCELLED:
+            # Abandoned work says nothing about latency or health; skip the AIMD round.
+            self._handler_cancelled_seconds.observe(seconds)
+            return
+        failed = outcome is TaskOutcome.FAILED
+        if failed:
+            self._handler_error_seconds.observe(seconds)
+        else:
+            self._handler_ok_seconds.observe(seconds)
+        self._adjust_concurrency(seconds, failed=failed)
+
+    def _adjust_concurrency(self, seconds: float, *, failed: bool) -> None:
+        if self._concurrency is None:
+            return
+        with self._not_empty:
+            backlog = len(self._pending) > 0
+        self._concurrency.on_task_finished(seconds=seconds, failed=failed, backlog=backlog)
+        self._sync_worker_count()
+
+    def _sync_worker_count(self) -> None:
+        if self._concurrency is None:
+            return
+        target = self._concurrency.target
+        if target == self._workers.size:
+            return
+        self._workers.resize(target)
+        with self._not_empty:
+            # Wake idle workers so surplus ones notice they should retire.
+            self._not_empty.notify_all()
+
     def _worker_loop(self) -> None:
-        while True:
-            task = self._job_queue.get()
-            try:
-                self._rate_limiter.acquire()
-                self._handler(task)
-            except Exception:  # noqa: BLE001 - workers should stay alive
-                logger.exception("Unexpected error while processing queue '%s' task", self._name)
-            finally:
-                self._job_queue.task_done()
+        while not self._workers.stopping:
+            # Throttling signals arrive from other threads; apply them here too.
+            self._sync_worker_count()
+            if self._workers.should_retire():
+                return
+            entry = self._take_entry()
+            if entry is None:
+                return
+            with self._workers.running(entry.task), task_timings() as timings:
+                try:
+                    limiter_wait_seconds = self._acquire_rate_slot()
+                    if self._workers.stopping:
+                        logger.warning(
+                            "Queue '%s' stopped before starting task %r", self._name, entry.task
+                        )
+                        return
+                    self._run_handler(self._start_entry(entry, limiter_wait_seconds))
+                except Exception:  # noqa: BLE001 - workers should stay alive
+                    logger.exception("Unexpected error while processing queue '%s' task", self._name)
+                finally:
+                    self._release_serial_key(entry)
+                    with self._not_empty:
+                        self._taken -= 1
+                self._report_timings(timings)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+import weakref
+from typing import Any, Dict, Iterator, Tuple
+
+from src.shared.metrics import QUEUE_WAIT_BUCKETS, REGISTRY
+from src.shared.timing import TaskTimings
+
+
+logger = logging.getLogger(__name__)
+
+# Queues register themselves so depth gauges are read at scrape time rather
+# than maintained on every enqueue/claim.
+_QUEUES: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def _collect(attribute: str) -> Iterator[Tuple[Tuple[str, ...], float]]:
+    # Several instances may share a name (e.g. one per shard); report the sum.
+    totals: Dict[str, float] = {}
+    for queue in list(_QUEUES):
+        try:
+            value = float(getattr(queue, attribute))
+        except Exception:  # noqa: BLE001 - a broken queue must not break the scrape
+            logger.exception("Failed to read %s of queue '%s'", attribute, queue.name)
+            continue
+        totals[queue.name] = totals.get(queue.name, 0.0) + value
+    for name, value in totals.items():
+        yield (name,), value
+
+
+QUEUE_PENDING = REGISTRY.gauge_callback(
+    "gitlab_ai_reviewer_queue_pending_tasks",
+    "Tasks waiting in the queue.",
+    ("queue",),
+    lambda: _collect("pending_count"),
+)
+QUEUE_IN_FLIGHT = REGISTRY.gauge_callback(
+    "gitlab_ai_reviewer_queue_in_flight_tasks",
+    "Tasks currently being handled by this process.",
+    ("queue",),
+    lambda: _collect("in_flight_count"),
+)
+QUEUE_WORKERS = REGISTRY.gauge_callback(
+    "gitlab_ai_reviewer_queue_workers",
+    "Worker threads the queue currently runs (its concurrency).",
+    ("queue",),
+    lambda: _collect("worker_count"),
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "gitlab_ai_reviewer_queue_wait_seconds",
+    "Time from enqueue until a worker starts the task.",
+    ("queue",),
+    buckets=QUEUE_WAIT_BUCKETS,
+)
+QUEUE_HANDLER_SECONDS = REGISTRY.histogram(
+    "gitlab_ai_reviewer_queue_handler_seconds",
+    "Task handler latency.",
+    ("queue", "outcome"),
+)
+RATE_LIMITER_WAIT_SECONDS = REGISTRY.histogram(
+    "gitlab_ai_reviewer_rate_limiter_wait_seconds",
+    "Time a worker blocked waiting for a rate limit slot.",
+    ("queue",),
+    buckets=QUEUE_WAIT_BUCKETS,
+)
+
+TASK_STAGE_SECONDS = REGISTRY.histogram(
+    "gitlab_ai_reviewer_task_stage_seconds",
+    "Time spent per stage of a queued task (queue wait, GitLab calls, LLM, ...).",
+    ("queue", "stage"),
+)
+
+
+def register_queue(queue: Any) -> None:
+    _QUEUES.add(queue)
+
+
+def observe_task_timings(queue_name: str, timings: TaskTimings) -> None:
+    for stage, seconds in timings.as_dict().items():
+        TASK_STAGE_SECONDS.labels(queue_name, stage).observe(seconds)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Generic, Hashable, Iterable, Optional, Protocol, TypeVar
+
+
+class SchedulableEntry(Protocol):
+    task: Any
+    seq: int
+    enqueued_at: float
+
+
+TEntry = TypeVar("TEntry", bound=SchedulableEntry)
+
+FlowReady = Callable[[Hashable], bool]
+
+
+class FifoScheduler(Generic[TEntry]):
+    """Arrival-order scheduling (the historical `queue.Queue` behaviour)."""
+
+    def __init__(self) -> None:
+        self._entries: Deque[TEntry] = deque()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def flow_of(self, entry: TEntry) -> Hashable:
+        return None
+
+    def push(self, entry: TEntry) -> None:
+        self._entries.append(entry)
+
+    def pop(self, is_ready: Optional[FlowReady] = None) -> Optional[TEntry]:
+        if not self._entries:
+            return None
+        return self._entries.popleft()
+
+    def pop_oldest(self) -> Optional[TEntry]:
+        return self.pop()
+
+    def peek_oldest(self) -> Optional[TEntry]:
+        return self._entries[0] if self._entries else None
+
+    def flows(self) -> Iterable[Hashable]:
+        return ()
+
+
+class DeficitRoundRobinScheduler(Generic[TEntry]):
+    """Deficit round-robin across flows (e.g. GitLab projects).
+
+    Each active flow gets ``quantum`` credit per round and spends ``cost(task)``
+    per dispatched task, so a flow with a deep backlog cannot starve others.
+    Within a flow tasks stay in arrival order. Flows for which ``is_ready``
+    returns False (e.g. over their own rate ceiling) are skipped for the round.
+    """
+
+    def __init__(
+        self,
+        *,
+        flow_key: Callable[[Any], Hashable],
+        quantum: float = 1.0,
+        cost: Optional[Callable[[Any], float]] = None,
+    ) -> None:
+        if quantum <= 0:
+            raise ValueError("quantum must be positive")
+
+        self._flow_key = flow_key
+        self._quantum = quantum
+        self._cost = cost or (lambda task: 1.0)
+        self._flows: "OrderedDict[Hashable, Deque[TEntry]]" = OrderedDict()
+        self._deficit: Dict[Hashable, float] = {}
+        self._active: Deque[Hashable] = deque()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def flow_of(self, entry: TEntry) -> Hashable:
+        return self._flow_key(entry.task)
+
+    def push(self, entry: TEntry) -> None:
+        flow = self.flow_of(entry)
+        queue = self._flows.get(flow)
+        if queue is None:
+            queue = deque()
+            self._flows[flow] = queue
+            self._deficit[flow] = 0.0
+            self._active.append(flow)
+        queue.append(entry)
+        self._size += 1
+
+    def _remove_head(self, flow: Hashable) -> TEntry:
+        queue = self._flows[flow]
+        entry = queue.popleft()
+        self._size -= 1
+        if not queue:
+            del self._flows[flow]
+            del self._deficit[flow]
+            self._active.remove(flow)
+        return entry
+
+    def pop(self, is_ready: Optional[FlowReady] = None) -> Optional[TEntry]:
+        skipped = 0
+        while self._active and skipped < len(self._active):
+            flow = self._active[0]
+            if is_ready is not None and not is_ready(flow):
+                self._active.rotate(-1)
+                skipped += 1
+                continue
+
+            queue = self._flows[flow]
+            cost = self._cost(queue[0].task)
+            if self._deficit[flow] < cost:
+                self._deficit[flow] += self._quantum
+                if self._deficit[flow] < cost:
+                    self._active.rotate(-1)
+                    continue
+
+            self._deficit[flow] -= cost
+            entry = self._remove_head(flow)
+            if flow in self._flows and self._deficit[flow] < self._cost(self._flows[flow][0].task):
+                self._active.rotate(-1)
+            return entry
+        return None
+
+    def peek_oldest(self) -> Optional[TEntry]:
+        heads = [queue[0] for queue in self._flows.values()]
+        return min(heads, key=lambda entry: entry.seq) if heads else None
+
+    def pop_oldest(self) -> Optional[TEntry]:
+        oldest = self.peek_oldest()
+        if oldest is None:
+            return None
+        return self._remove_head(self.flow_of(oldest))
+
+    def flows(self) -> Iterable[Hashable]:
+        return list(self._active)
+
+
+class PriorityScheduler(Generic[TEntry]):
+    """Strict priority classes (higher runs first) with aging.
+
+    Each class keeps its own inner scheduler (FIFO or DRR), built by
+    ``make_inner``. A class is ranked by ``priority + wait / aging_seconds`` of
+    its oldest entry, so low-priority work gains one level per
+    ``aging_seconds`` waited and is never starved.
+    """
+
+    def __init__(
+        self,
+        *,
+        priority: Callable[[Any], int],
+        make_inner: Callable[[], Any],
+        aging_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if aging_seconds is not None and aging_seconds <= 0:
+            raise ValueError("aging_seconds must be positive")
+
+        self._clock = clock
+        self._priority = priority
+        self._make_inner = make_inner
+        self._aging_seconds = aging_seconds
+        self._classes: Dict[int, Any] = {}
+        self._prototype = make_inner()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def flow_of(self, entry: TEntry) -> Hashable:
+        return self._prototype.flow_of(entry)
+
+    def push(self, entry: TEntry) -> None:
+        level = self._priority(entry.task)
+        inner = self._classes.get(level)
+        if inner is None:
+            inner = self._classes[level] = self._make_inner()
+        inner.push(entry)
+        self._size += 1
+
+    def _effective_priority(self, level: int, inner: Any, now: float) -> float:
+        if self._aging_seconds is None:
+            return float(level)
+        oldest = inner.peek_oldest()
+        return level + (now - oldest.enqueued_at) / self._aging_seconds
+
+    def _ranked_classes(self) -> list[tuple[int, Any]]:
+        now = self._clock()
+        return sorted(
+            self._classes.items(),
+            key=lambda item: (
+                -self._effective_priority(item[0], item[1], now),
+                item[1].peek_oldest().seq,
+            ),
+        )
+
+    def _after_pop(self, level: int, inner: Any, entry: Optional[TEntry]) -> Optional[TEntry]:
+        if entry is not None:
+            self._size -= 1
+            if not len(inner):
+                del self._classes[level]
+        return entry
+
+    def pop(self, is_ready: Optional[FlowReady] = None) -> Optional[TEntry]:
+        for level, inner in self._ranked_classes():
+            entry = self._after_pop(level, inner, inner.pop(is_ready))
+            if entry is not None:
+                return entry
+        return None
+
+    def peek_oldest(self) -> Optional[TEntry]:
+        heads = [inner.peek_oldest() for inner in self._classes.values()]
+        return min(heads, key=lambda entry: entry.seq) if heads else None
+
+    def pop_oldest(self) -> Optional[TEntry]:
+        if not self._classes:
+            return None
+        level, inner = min(self._classes.items(), key=lambda item: item[1].peek_oldest().seq)
+        return self._after_pop(level, inner, inner.pop_oldest())
+
+    def flows(self) -> Iterable[Hashable]:
+        flows: list[Hashable] = []
+        for inner in self._classes.values():
+            flows.extend(flow for flow in inner.flows() if flow not in flows)
+        return flows
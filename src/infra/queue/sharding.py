@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Hashable, List, Tuple
+
+
+# Tasks are hashed into a fixed number of buckets when enqueued; buckets (not
+# tasks) are then mapped onto shards, so the mapping can change with the number
+# of worker processes without rewriting queued rows.
+BUCKET_COUNT = 1024
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shard_bucket(key: Hashable) -> int:
+    return _hash64(json.dumps(key, separators=(",", ":"), default=str)) % BUCKET_COUNT
+
+
+class ConsistentHashRing:
+    """Maps buckets onto ``shard_count`` shards with virtual nodes.
+
+    Growing from N to N+1 shards moves only about 1/(N+1) of the buckets.
+    """
+
+    def __init__(self, shard_count: int, *, replicas: int = 64) -> None:
+        if shard_count <= 0:
+            raise ValueError("shard_count must be positive")
+        if replicas <= 0:
+            raise ValueError("replicas must be positive")
+
+        points: List[Tuple[int, int]] = sorted(
+            (_hash64(f"shard-{shard}-{replica}"), shard)
+            for shard in range(shard_count)
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for_bucket(self, bucket: int) -> int:
+        index = bisect.bisect(self._hashes, _hash64(f"bucket-{bucket}")) % len(self._hashes)
+        return self._shards[index]
+
+
+@dataclass(frozen=True)
+class ShardAssignment:
+    """Which shard (``index`` of ``count``) a consumer process serves."""
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if self.count <= 0:
+            raise ValueError("count must be positive")
+        if not 0 <= self.index < self.count:
+            raise ValueError("index must be in [0, count)")
+
+    @cached_property
+    def buckets(self) -> Tuple[int, ...]:
+        ring = ConsistentHashRing(self.count)
+        return tuple(
+            bucket for bucket in range(BUCKET_COUNT) if ring.shard_for_bucket(bucket) == self.index
+        )
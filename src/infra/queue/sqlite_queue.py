@@ -0,0 +1,1003 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, Hashable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from src.infra.queue.codec import DataclassTaskCodec
+from src.infra.queue.inprocess_queue import EnqueueOutcome, WaitStats
+from src.infra.queue.sharding import ShardAssignment, shard_bucket
+from src.infra.queue.metrics import (
+    QUEUE_HANDLER_SECONDS,
+    QUEUE_WAIT_SECONDS,
+    RATE_LIMITER_WAIT_SECONDS,
+    observe_task_timings,
+    register_queue,
+)
+from src.infra.queue.worker_pool import WorkerPool
+from src.shared.errors import QueueClosedError, QueueFullError
+from src.shared.rate_limiter import (
+    FixedIntervalRateLimiter,
+    KeyedIntervalRateLimiter,
+    RateLimiter,
+    task_rate_limiter,
+)
+from src.shared.throttle import throttle_caller
+from src.shared.timing import TaskTimings, record, task_timings
+from src.shared.types import OverflowPolicy, TaskOutcome
+
+
+logger = logging.getLogger(__name__)
+
+TTask = TypeVar("TTask")
+
+# How many pending rows a worker looks at when picking the next task. Fairness
+# and per-flow ceilings are applied within this window.
+_CANDIDATE_WINDOW = 256
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_start_time(pid: int) -> str:
+    """Start time of ``pid`` in clock ticks since boot, or "" without /proc."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as stat:
+            # Fields after the parenthesized command name; starttime is field 22.
+            fields = stat.read().rpartition(b")")[2].split()
+    except OSError:
+        return ""
+    return fields[19].decode() if len(fields) > 19 else ""
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    """Whether the process that wrote ``owner`` (pid:start time:instance) still runs.
+
+    The start time tells a reused pid (e.g. after a container restart) apart
+    from the original owner; owners written without one only check the pid.
+    """
+    pid_text, _, rest = (owner or "").partition(":")
+    if not pid_text.isdigit():
+        return False
+    pid = int(pid_text)
+    if pid == os.getpid() or not _pid_alive(pid):
+        return False
+    started = rest.rpartition(":")[0]
+    return not started or started == _process_start_time(pid)
+
+
+def _encode_key(key: Hashable) -> str:
+    return json.dumps(key, separators=(",", ":"), default=str)
+
+
+def _decode_key(raw: str) -> Hashable:
+    value = json.loads(raw)
+    return tuple(value) if isinstance(value, list) else value
+
+
+@dataclass
+class _EnqueueRequest(Generic[TTask]):
+    task: TTask
+    done: threading.Event = field(default_factory=threading.Event)
+    outcome: Optional[EnqueueOutcome] = None
+    error: Optional[Exception] = None
+    pending_after: int = 0
+
+
+@dataclass(frozen=True)
+class _ClaimedTask:
+    task_id: int
+    flow: Hashable
+    enqueued_at: float
+
+
+class SQLiteWorkerQueue(Generic[TTask]):
+    """Durable counterpart of ``InProcessWorkerQueue`` backed by SQLite (WAL).
+
+    Tasks are serialized with ``codec`` and only the rows a worker is choosing
+    between are read back, so large backlogs do not live in RAM. Concurrent
+    ``enqueue`` calls are group-committed: whichever caller finds no flush in
+    progress writes every buffered task in one transaction while the others
+    wait for it.
+
+    A claimed task is leased for ``visibility_timeout_seconds`` and the lease is
+    renewed while the task runs; if the worker dies (or the lease expires
+    anyway) the task becomes pending again, up to
+    ``max_attempts`` claims. Each claim records its owner (pid, process start
+    time and instance id); on startup tasks owned by dead processes (including
+    ones whose pid was since reused), or by an earlier queue instance in this
+    process, are returned to pending right away. Several processes on one
+    host (e.g. gunicorn workers) can therefore share one ``db_path``/``name``.
+
+    Coalescing, capacity/overflow, fairness, per-flow ceilings and priority
+    classes behave as in ``InProcessWorkerQueue``; fairness is approximated by
+    serving the least recently served flow among the oldest candidates. A
+    claimed task can still be coalesced into until its worker gets a rate slot
+    and starts it. With ``serial_key`` a task is only claimed once every older
+    task with its key has finished, so tasks sharing a key (e.g. one merge
+    request) run one at a time and in enqueue order, in every process.
+    Transient task fields (cancellation tokens) are kept in memory only for
+    tasks enqueued by this process.
+
+    ``consume=False`` makes a producer-only handle (the web tier when workers
+    run in ``src.app.worker``). ``shard_key`` buckets tasks at enqueue time and
+    a consumer with ``shard`` only claims the buckets its shard owns on the
+    consistent-hash ring, so e.g. one project is always served by one process.
+
+    Pending tasks are already persisted, so ``drain`` only closes intake, stops
+    claiming and waits for in-flight tasks; ``stop`` then hands the leases of
+    tasks still running back to the queue for another process to pick up.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        handler: Callable[[TTask], Optional[TaskOutcome]],
+        max_requests_per_minute: Optional[int],
+        worker_concurrency: int,
+        db_path: str,
+        codec: DataclassTaskCodec[TTask],
+        visibility_timeout_seconds: float = 900.0,
+        max_attempts: int = 3,
+        poll_interval_seconds: float = 1.0,
+        max_pending_jobs_soft_limit: Optional[int] = None,
+        coalesce_key: Optional[Callable[[TTask], Optional[Hashable]]] = None,
+        max_pending_jobs: Optional[int] = None,
+        overflow_policy: OverflowPolicy = OverflowPolicy.REJECT,
+        degrade: Optional[Callable[[TTask], TTask]] = None,
+        fairness_key: Optional[Callable[[TTask], Hashable]] = None,
+        flow_rate_limiter: Optional[KeyedIntervalRateLimiter] = None,
+        priority: Optional[Callable[[TTask], int]] = None,
+        priority_aging_seconds: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        consume: bool = True,
+        shard_key: Optional[Callable[[TTask], Hashable]] = None,
+        shard: Optional[ShardAssignment] = None,
+        serial_key: Optional[Callable[[TTask], Optional[Hashable]]] = None,
+        autostart: bool = True,
+        supervise_interval_seconds: float = 5.0,
+    ) -> None:
+        if worker_concurrency <= 0:
+            raise ValueError("worker_concurrency must be positive")
+        if visibility_timeout_seconds <= 0:
+            raise ValueError("visibility_timeout_seconds must be positive")
+        if max_attempts <= 0:
+            raise ValueError("max_attempts must be positive")
+        if max_pending_jobs is not None and max_pending_jobs <= 0:
+            raise ValueError("max_pending_jobs must be positive")
+        if overflow_policy is OverflowPolicy.DEGRADE and degrade is None:
+            raise ValueError("overflow_policy=degrade requires a degrade function")
+        if flow_rate_limiter is not None and fairness_key is None:
+            raise ValueError("flow_rate_limiter requires a fairness_key")
+        if priority_aging_seconds is not None and priority_aging_seconds <= 0:
+            raise ValueError("priority_aging_seconds must be positive")
+
+        self._name = name
+        self._handler = handler
+        self._rate_limiter = rate_limiter or (
+            FixedIntervalRateLimiter(max_requests_per_minute)
+            if max_requests_per_minute is not None
+            else None
+        )
+        self._db_path = db_path
+        self._codec = codec
+        self._visibility_timeout_seconds = visibility_timeout_seconds
+        self._max_attempts = max_attempts
+        self._poll_interval_seconds = poll_interval_seconds
+        self._max_pending_jobs_soft_limit = max_pending_jobs_soft_limit
+        self._coalesce_key = coalesce_key
+        self._max_pending_jobs = max_pending_jobs
+        self._overflow_policy = overflow_policy
+        self._degrade = degrade
+        self._fairness_key = fairness_key
+        self._flow_rate_limiter = flow_rate_limiter
+        self._priority = priority
+        self._priority_aging_seconds = priority_aging_seconds
+        self._shard_key = shard_key
+        self._shard = shard
+        self._serial_key = serial_key
+        # Rows whose key still has an older row (pending or running) must wait.
+        self._serial_filter = (
+            """
+                    AND (serial_key IS NULL OR NOT EXISTS (
+                        SELECT 1 FROM queue_task AS earlier
+                        WHERE earlier.queue = queue_task.queue
+                            AND earlier.serial_key = queue_task.serial_key
+                            AND (earlier.id < queue_task.id OR earlier.state = 'running')
+                    ))"""
+            if serial_key is not None
+            else ""
+        )
+        # Bucket ids are integers, so the filter can be inlined safely.
+        self._shard_filter = (
+            f" AND shard_bucket IN ({','.join(str(bucket) for bucket in shard.buckets)})"
+            if shard is not None
+            else ""
+        )
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(threading.Lock())
+        # Bumped on every notify so a worker that checked the DB outside the
+        # condition does not sleep through a task enqueued meanwhile.
+        self._work_signals = 0
+        self._batch_lock = threading.Lock()
+        self._batch: List[_EnqueueRequest[TTask]] = []
+        self._flushing = False
+
+        self._owner = f"{os.getpid()}:{_process_start_time(os.getpid())}:{uuid.uuid4().hex}"
+        self._live_tasks: Dict[int, TTask] = {}
+        self._serve_counter = 0
+        self._last_served: Dict[Hashable, int] = {}
+        self._wait_stats: Dict[Hashable, WaitStats] = {}
+        self._superseded_count = 0
+        self._rejected_count = 0
+        self._dropped_count = 0
+        self._degraded_count = 0
+
+        recovered = self._initialize()
+
+        self._closed = False
+        self._wait_seconds = QUEUE_WAIT_SECONDS.labels(name)
+        self._limiter_wait_seconds = RATE_LIMITER_WAIT_SECONDS.labels(name)
+        self._handler_ok_seconds = QUEUE_HANDLER_SECONDS.labels(name, "success")
+        self._handler_error_seconds = QUEUE_HANDLER_SECONDS.labels(name, "error")
+        self._handler_cancelled_seconds = QUEUE_HANDLER_SECONDS.labels(name, "cancelled")
+
+        self._workers = WorkerPool(
+            name=name,
+            size=worker_concurrency if consume else 0,
+            target=self._worker_loop,
+            supervise_interval_seconds=supervise_interval_seconds,
+        )
+        if autostart:
+            self._workers.start()
+        register_queue(self)
+
+        logger.info(
+            "Initialized durable queue '%s': db_path=%s, workers=%s, shard=%s, max_requests_per_minute=%s, max_pending_jobs=%s, overflow_policy=%s, visibility_timeout=%ss, serial=%s, recovered_in_flight=%s",
+            name,
+            db_path,
+            worker_concurrency if consume else 0,
+            f"{shard.index}/{shard.count}" if shard is not None else None,
+            max_requests_per_minute,
+            max_pending_jobs,
+            overflow_policy.value,
+            visibility_timeout_seconds,
+            serial_key is not None,
+            recovered,
+        )
+
+    # ------------------------------------------------------------------ storage
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE.
+        conn = sqlite3.connect(self._db_path, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _initialize(self) -> int:
+        directory = os.path.dirname(self._db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._get_connection()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS queue_task (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    queue TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    coalesce_key TEXT,
+                    flow TEXT,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    state TEXT NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS queue_task_ready ON queue_task (queue, state, priority, id)"
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS queue_task_coalesce
+                ON queue_task (queue, coalesce_key) WHERE state = 'pending'
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(queue_task)")}
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE queue_task ADD COLUMN owner TEXT")
+            if "shard_bucket" not in columns:
+                conn.execute(
+                    "ALTER TABLE queue_task ADD COLUMN shard_bucket INTEGER NOT NULL DEFAULT 0"
+                )
+            if "started_at" not in columns:
+                conn.execute("ALTER TABLE queue_task ADD COLUMN started_at REAL")
+            if "serial_key" not in columns:
+                conn.execute("ALTER TABLE queue_task ADD COLUMN serial_key TEXT")
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS queue_task_serial
+                ON queue_task (queue, serial_key, id) WHERE serial_key IS NOT NULL
+                """
+            )
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS queue_task_unstarted
+                ON queue_task (queue, coalesce_key) WHERE started_at IS NULL
+                """
+            )
+            return self._recover_orphans(conn)
+        finally:
+            conn.close()
+
+    def _recover_orphans(self, conn: sqlite3.Connection) -> int:
+        conn.execute("BEGIN IMMEDIATE")
+        owners = [
+            row[0]
+            for row in conn.execute(
+                "SELECT DISTINCT owner FROM queue_task WHERE queue = ? AND state = 'running'",
+                (self._name,),
+            )
+        ]
+        recovered = 0
+        for owner in owners:
+            if _owner_alive(owner):
+                continue
+            cursor = conn.execute(
+                """
+                UPDATE queue_task SET state = 'pending', lease_until = NULL, owner = NULL, started_at = NULL
+                WHERE queue = ? AND state = 'running' AND owner IS ?
+                """,
+                (self._name, owner),
+            )
+            recovered += cursor.rowcount
+        conn.execute("COMMIT")
+        return recovered
+
+    # --------------------------------------------------------------- properties
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def pending_count(self) -> int:
+        conn = self._get_connection()
+        try:
+            return self._count_pending(conn)
+        finally:
+            conn.close()
+
+    @property
+    def in_flight_count(self) -> int:
+        return self._workers.in_flight_count
+
+    @property
+    def worker_count(self) -> int:
+        return self._workers.size
+
+    def start(self) -> None:
+        self._workers.start()
+
+    def close(self) -> None:
+        with self._batch_lock:
+            self._closed = True
+
+    def drain(self, timeout_seconds: float) -> bool:
+        """Close intake, stop claiming and wait for in-flight tasks to finish."""
+        self.close()
+        self._workers.request_stop()
+        with self._not_empty:
+            self._not_empty.notify_all()
+        return self._workers.wait_idle(timeout_seconds)
+
+    def stop(self, timeout_seconds: float = 0.0) -> bool:
+        drained = self.drain(timeout_seconds)
+        if not drained:
+            released = self._release_leases()
+            logger.warning(
+                "Queue '%s' stopped with %s task(s) still running; released their leases",
+                self._name,
+                released,
+            )
+        self._workers.join(0.1)
+        return drained
+
+    def _release_leases(self) -> int:
+        conn = self._get_connection()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE queue_task SET state = 'pending', lease_until = NULL, owner = NULL, started_at = NULL
+                WHERE queue = ? AND state = 'running' AND owner = ?
+                """,
+                (self._name, self._owner),
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    @property
+    def superseded_count(self) -> int:
+        with self._lock:
+            return self._superseded_count
+
+    @property
+    def rejected_count(self) -> int:
+        with self._lock:
+            return self._rejected_count
+
+    @property
+    def dropped_count(self) -> int:
+        with self._lock:
+            return self._dropped_count
+
+    @property
+    def degraded_count(self) -> int:
+        with self._lock:
+            return self._degraded_count
+
+    def wait_stats(self) -> Dict[Hashable, WaitStats]:
+        with self._lock:
+            return {
+                flow: WaitStats(stats.count, stats.total_seconds, stats.max_seconds)
+                for flow, stats in self._wait_stats.items()
+            }
+
+    # ------------------------------------------------------------------ enqueue
+
+    def enqueue(self, task: TTask) -> EnqueueOutcome:
+        request = _EnqueueRequest(task=task)
+        with self._batch_lock:
+            if self._closed:
+                raise QueueClosedError(f"Queue '{self._name}' is shutting down", retry_after_seconds=1)
+            self._batch.append(request)
+            leader = not self._flushing
+            if leader:
+                self._flushing = True
+
+        if leader:
+            self._flush_batches()
+        request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+        assert request.outcome is not None
+        if request.outcome is not EnqueueOutcome.COALESCED:
+            with self._not_empty:
+                self._work_signals += 1
+                self._not_empty.notify()
+        self._log_if_queue_too_long(request.pending_after)
+        return request.outcome
+
+    def _flush_batches(self) -> None:
+        while True:
+            with self._batch_lock:
+                batch, self._batch = self._batch, []
+                if not batch:
+                    self._flushing = False
+                    return
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: Sequence[_EnqueueRequest[TTask]]) -> None:
+        conn: sqlite3.Connection | None = None
+        inserted_ids: List[int] = []
+        try:
+            conn = self._get_connection()
+            conn.execute("BEGIN IMMEDIATE")
+            pending = self._count_pending(conn)
+            for request in batch:
+                try:
+                    request.outcome, pending = self._insert(conn, request.task, pending, inserted_ids)
+                except QueueFullError as exc:
+                    request.error = exc
+                request.pending_after = pending
+            conn.execute("COMMIT")
+        except Exception as exc:  # noqa: BLE001 - surfaced to every waiting producer
+            logger.exception("Failed to persist %s task(s) to queue '%s'", len(batch), self._name)
+            if conn is not None and conn.in_transaction:
+                conn.execute("ROLLBACK")
+            with self._lock:
+                for task_id in inserted_ids:
+                    self._live_tasks.pop(task_id, None)
+            for request in batch:
+                request.outcome = None
+                request.error = exc
+        finally:
+            if conn is not None:
+                conn.close()
+            for request in batch:
+                request.done.set()
+
+    def _count_pending(self, conn: sqlite3.Connection) -> int:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM queue_task WHERE queue = ? AND state = 'pending'",
+            (self._name,),
+        ).fetchone()
+        return int(row[0])
+
+    def _remember_live(self, task_id: int, task: TTask) -> None:
+        if self._codec.has_transient_state(task):
+            with self._lock:
+                self._live_tasks[task_id] = task
+
+    def _insert(
+        self,
+        conn: sqlite3.Connection,
+        task: TTask,
+        pending: int,
+        inserted_ids: List[int],
+    ) -> Tuple[EnqueueOutcome, int]:
+        key = self._coalesce_key(task) if self._coalesce_key is not None else None
+        key_text = _encode_key(key) if key is not None else None
+
+        if key_text is not None:
+            # Pending rows and claimed rows whose worker has not started them yet.
+            row = conn.execute(
+                "SELECT id FROM queue_task WHERE queue = ? AND coalesce_key = ? AND started_at IS NULL LIMIT 1",
+                (self._name, key_text),
+            ).fetchone()
+            if row is not None:
+                task_id = int(row[0])
+                conn.execute(
+                    "UPDATE queue_task SET payload = ? WHERE id = ?",
+                    (self._codec.encode(task), task_id),
+                )
+                with self._lock:
+                    self._live_tasks.pop(task_id, None)
+                    self._superseded_count += 1
+                    superseded_total = self._superseded_count
+                self._remember_live(task_id, task)
+                logger.info(
+                    "Queue '%s' superseded pending task: key=%s, superseded_total=%s",
+                    self._name,
+                    key,
+                    superseded_total,
+                )
+                return EnqueueOutcome.COALESCED, pending
+
+        task, outcome = self._admit(conn, task, pending)
+        if outcome is EnqueueOutcome.DROPPED_OLDEST:
+            pending -= 1
+
+        flow = self._fairness_key(task) if self._fairness_key is not None else None
+        serial_key = self._serial_key(task) if self._serial_key is not None else None
+        cursor = conn.execute(
+            """
+            INSERT INTO queue_task (
+                queue, payload, coalesce_key, flow, serial_key, priority, shard_bucket, state, enqueued_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?)
+            """,
+            (
+                self._name,
+                self._codec.encode(task),
+                key_text,
+                _encode_key(flow) if flow is not None else None,
+                _encode_key(serial_key) if serial_key is not None else None,
+                self._priority(task) if self._priority is not None else 0,
+                shard_bucket(self._shard_key(task)) if self._shard_key is not None else 0,
+                time.time(),
+            ),
+        )
+        task_id = int(cursor.lastrowid)
+        inserted_ids.append(task_id)
+        self._remember_live(task_id, task)
+        return outcome, pending + 1
+
+    def _retry_after_seconds(self, pending: int) -> int:
+        if self._rate_limiter is None:
+            return 1
+        return max(1, math.ceil(pending * self._rate_limiter.interval_seconds))
+
+    def _admit(
+        self,
+        conn: sqlite3.Connection,
+        task: TTask,
+        pending: int,
+    ) -> Tuple[TTask, EnqueueOutcome]:
+        capacity = self._max_pending_jobs
+        if capacity is None or pending < capacity:
+            return task, EnqueueOutcome.ACCEPTED
+
+        if self._overflow_policy is OverflowPolicy.DROP_OLDEST:
+            row = conn.execute(
+                "SELECT id, payload FROM queue_task WHERE queue = ? AND state = 'pending' ORDER BY id LIMIT 1",
+                (self._name,),
+            ).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM queue_task WHERE id = ?", (row[0],))
+                with self._lock:
+                    self._live_tasks.pop(int(row[0]), None)
+                    self._dropped_count += 1
+                    dropped_total = self._dropped_count
+                logger.warning(
+                    "Queue '%s' dropped oldest pending task: payload=%s, dropped_total=%s",
+                    self._name,
+                    row[1],
+                    dropped_total,
+                )
+            return task, EnqueueOutcome.DROPPED_OLDEST
+
+        if (
+            self._overflow_policy is OverflowPolicy.DEGRADE
+            and self._degrade is not None
+            and pending < capacity * 2
+        ):
+            with self._lock:
+                self._degraded_count += 1
+            return self._degrade(task), EnqueueOutcome.DEGRADED
+
+        with self._lock:
+            self._rejected_count += 1
+            rejected_total = self._rejected_count
+        logger.warning(
+            "Queue '%s' rejected task: pending=%s, capacity=%s, rejected_total=%s",
+            self._name,
+            pending,
+            capacity,
+            rejected_total,
+        )
+        raise QueueFullError(
+            f"Queue '{self._name}' is full ({pending} pending)",
+            retry_after_seconds=self._retry_after_seconds(pending),
+        )
+
+    def _log_if_queue_too_long(self, size: int) -> None:
+        if (
+            not self._max_pending_jobs_soft_limit
+            or self._max_pending_jobs_soft_limit <= 0
+        ):
+            return
+
+        if size > self._max_pending_jobs_soft_limit:
+            logger.warning(
+                "Queue '%s' length %s exceeded soft limit %s",
+                self._name,
+                size,
+                self._max_pending_jobs_soft_limit,
+            )
+
+    # ------------------------------------------------------------------ workers
+
+    def _has_claimable(self) -> bool:
+        conn = self._get_connection()
+        try:
+            row = conn.execute(
+                f"""
+                SELECT 1 FROM queue_task
+                WHERE queue = ?
+                    AND ((state = 'pending'{self._shard_filter}) OR (state = 'running' AND lease_until < ?))
+                LIMIT 1
+                """,
+                (self._name, time.time()),
+            ).fetchone()
+            return row is not None
+        finally:
+            conn.close()
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute(
+            "SELECT id, attempts FROM queue_task WHERE queue = ? AND state = 'running' AND lease_until < ?",
+            (self._name, now),
+        ).fetchall()
+        for task_id, attempts in expired:
+            if attempts >= self._max_attempts:
+                conn.execute("DELETE FROM queue_task WHERE id = ?", (task_id,))
+                with self._lock:
+                    self._live_tasks.pop(int(task_id), None)
+                logger.error(
+                    "Queue '%s' gave up on task %s after %s expired lease(s)",
+                    self._name,
+                    task_id,
+                    attempts,
+                )
+            else:
+                conn.execute(
+                    """
+                    UPDATE queue_task SET state = 'pending', lease_until = NULL, owner = NULL, started_at = NULL
+                    WHERE id = ?
+                    """,
+                    (task_id,),
+                )
+                logger.warning(
+                    "Queue '%s' lease expired for task %s; returning it to pending (attempt %s)",
+                    self._name,
+                    task_id,
+                    attempts,
+                )
+
+    def _candidate_order(self, now: float) -> Tuple[str, Tuple[Any, ...]]:
+        if self._priority is None:
+            return "id", ()
+        if self._priority_aging_seconds is None:
+            return "priority DESC, id", ()
+        return "priority + (? - enqueued_at) / ? DESC, id", (now, self._priority_aging_seconds)
+
+    def _choose(self, rows: Sequence[Tuple[Any, ...]], now: float) -> Optional[Tuple[Any, ...]]:
+        best: Optional[Tuple[Any, ...]] = None
+        best_score: Optional[Tuple[float, int, int]] = None
+        flows = [_decode_key(row[1]) if row[1] is not None else None for row in rows]
+        # One limiter lookup for every candidate flow of this claim.
+        ready_in = self._flow_rate_limiter.ready_in_many(flows) if self._flow_rate_limiter is not None else {}
+        for row, flow in zip(rows, flows):
+            task_id, _, priority, enqueued_at = row
+            if ready_in.get(flow, 0.0) > 0:
+                continue
+            if self._fairness_key is None:
+                return row
+
+            level = float(priority)
+            if self._priority_aging_seconds is not None:
+                level += (now - enqueued_at) / self._priority_aging_seconds
+            with self._lock:
+                last_served = self._last_served.get(flow, 0)
+            score = (-math.floor(level), last_served, int(task_id))
+            if best_score is None or score < best_score:
+                best, best_score = row, score
+        return best
+
+    def _claim(self) -> Optional[_ClaimedTask]:
+        now = time.time()
+        conn = self._get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._requeue_expired(conn, now)
+            order_by, params = self._candidate_order(now)
+            rows = conn.execute(
+                f"""
+                SELECT id, flow, priority, enqueued_at FROM queue_task
+                WHERE queue = ? AND state = 'pending'{self._shard_filter}{self._serial_filter}
+                ORDER BY {order_by}
+                LIMIT ?
+                """,
+                (self._name, *params, _CANDIDATE_WINDOW),
+            ).fetchall()
+            chosen = self._choose(rows, now)
+            if chosen is not None:
+                conn.execute(
+                    """
+                    UPDATE queue_task
+                    SET state = 'running', lease_until = ?, attempts = attempts + 1, owner = ?
+                    WHERE id = ?
+                    """,
+                    (now + self._visibility_timeout_seconds, self._owner, chosen[0]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        if chosen is None:
+            return None
+
+        task_id, flow_text, _, enqueued_at = chosen
+        flow = _decode_key(flow_text) if flow_text is not None else None
+        with self._lock:
+            self._serve_counter += 1
+            self._last_served[flow] = self._serve_counter
+        if self._flow_rate_limiter is not None:
+            self._flow_rate_limiter.reserve(flow)
+        return _ClaimedTask(task_id=int(task_id), flow=flow, enqueued_at=enqueued_at)
+
+    def _start(self, task_id: int) -> Optional[TTask]:
+        """Mark a claimed task started and load its latest payload (None if the lease was lost)."""
+        conn = self._get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                "UPDATE queue_task SET started_at = ? WHERE id = ? AND state = 'running' AND owner = ?",
+                (time.time(), task_id, self._owner),
+            )
+            row = (
+                conn.execute("SELECT payload FROM queue_task WHERE id = ?", (task_id,)).fetchone()
+                if cursor.rowcount
+                else None
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        if row is None:
+            self._log_lost_lease(task_id)
+            return None
+        with self._lock:
+            task = self._live_tasks.pop(task_id, None)
+        return task if task is not None else self._codec.decode(row[0])
+
+    def _extend_lease(self, task_id: int) -> bool:
+        conn = self._get_connection()
+        try:
+            cursor = conn.execute(
+                "UPDATE queue_task SET lease_until = ? WHERE id = ? AND state = 'running' AND owner = ?",
+                (time.time() + self._visibility_timeout_seconds, task_id, self._owner),
+            )
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _leased(self, task_id: int) -> Iterator[None]:
+        """Renew the claim on ``task_id`` every third of the lease until the block exits."""
+        done = threading.Event()
+
+        def heartbeat() -> None:
+            while not done.wait(self._visibility_timeout_seconds / 3):
+                try:
+                    if not self._extend_lease(task_id):
+                        self._log_lost_lease(task_id)
+                        return
+                except Exception:  # noqa: BLE001 - retried on the next beat
+                    logger.exception("Failed to renew the lease on queue '%s' task %s", self._name, task_id)
+
+        thread = threading.Thread(target=heartbeat, name=f"{self._name}-lease-{task_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def _log_lost_lease(self, task_id: int) -> None:
+        logger.warning(
+            "Queue '%s' lost the lease on task %s; another worker may have taken it over",
+            self._name,
+            task_id,
+        )
+
+    def _ack(self, task_id: int) -> None:
+        conn = self._get_connection()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM queue_task WHERE id = ? AND owner = ?",
+                (task_id, self._owner),
+            )
+        finally:
+            conn.close()
+        if cursor.rowcount == 0:
+            self._log_lost_lease(task_id)
+        elif self._serial_key is not None:
+            # The next task with this key may have become claimable.
+            with self._not_empty:
+                self._work_signals += 1
+                self._not_empty.notify()
+
+    def _unclaim(self, task_id: int) -> None:
+        # Hand a claimed task back without counting the claim as an attempt.
+        conn = self._get_connection()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE queue_task
+                SET state = 'pending', lease_until = NULL, owner = NULL, started_at = NULL,
+                    attempts = attempts - 1
+                WHERE id = ? AND owner = ?
+                """,
+                (task_id, self._owner),
+            )
+        finally:
+            conn.close()
+        if cursor.rowcount == 0:
+            self._log_lost_lease(task_id)
+
+    def _record_wait(self, claimed: _ClaimedTask) -> None:
+        with self._lock:
+            stats = self._wait_stats.get(claimed.flow)
+            if stats is None:
+                stats = self._wait_stats[claimed.flow] = WaitStats()
+            wait_seconds = max(0.0, time.time() - claimed.enqueued_at)
+            stats.record(wait_seconds)
+        self._wait_seconds.observe(wait_seconds)
+        record("queue_wait", wait_seconds)
+
+    def _acquire_rate_slot(self) -> float:
+        if self._rate_limiter is None:
+            return 0.0
+        started_at = time.monotonic()
+        self._rate_limiter.acquire()
+        waited = time.monotonic() - started_at
+        self._limiter_wait_seconds.observe(waited)
+        record("rate_limiter_wait", waited)
+        return waited
+
+    def _report_timings(self, timings: TaskTimings) -> None:
+        observe_task_timings(self._name, timings)
+        logger.info("Queue '%s' task timings: %s", self._name, timings.summary())
+
+    def _run_handler(self, task: TTask) -> None:
+        started_at = time.monotonic()
+        try:
+            with task_rate_limiter(self._rate_limiter), throttle_caller(self._name):
+                outcome = self._handler(task)
+        except BaseException:
+            self._handler_error_seconds.observe(time.monotonic() - started_at)
+            raise
+        seconds = time.monotonic() - started_at
+        if outcome is TaskOutcome.FAILED:
+            self._handler_error_seconds.observe(seconds)
+        elif outcome is TaskOutcome.CANCELLED:
+            self._handler_cancelled_seconds.observe(seconds)
+        else:
+            self._handler_ok_seconds.observe(seconds)
+
+    def _wait_for_work(self) -> None:
+        # The query can wait on SQLite locks, so run it outside the condition
+        # that enqueue notifies through.
+        while not self._workers.stopping:
+            with self._not_empty:
+                signals = self._work_signals
+            if self._has_claimable():
+                return
+            with self._not_empty:
+                if self._work_signals == signals and not self._workers.stopping:
+                    self._not_empty.wait(self._poll_interval_seconds)
+
+    def _worker_loop(self) -> None:
+        while not self._workers.stopping:
+            claimed: Optional[_ClaimedTask] = None
+            with task_timings() as timings:
+                try:
+                    self._wait_for_work()
+                    if self._workers.stopping:
+                        return
+                    # Claim first so a slot is only spent on a task that will run;
+                    # pending rows may all belong to flows over their own ceiling.
+                    claimed = self._claim()
+                    if claimed is None:
+                        with self._not_empty:
+                            self._not_empty.wait(self._poll_interval_seconds)
+                        continue
+                    with self._leased(claimed.task_id):
+                        self._record_wait(claimed)
+                        self._acquire_rate_slot()
+                        # Newer tasks coalesce into the row until it is started here.
+                        task = None if self._workers.stopping else self._start(claimed.task_id)
+                        if task is not None:
+                            with self._workers.running(task):
+                                self._run_handler(task)
+                    if task is None:
+                        # Stopping (hand the claim back) or the lease was lost.
+                        if self._workers.stopping:
+                            self._unclaim(claimed.task_id)
+                        claimed = None
+                        continue
+                except Exception:  # noqa: BLE001 - workers should stay alive
+                    logger.exception("Unexpected error while processing queue '%s' task", self._name)
+                    if claimed is None:
+                        time.sleep(self._poll_interval_seconds)
+                finally:
+                    if claimed is not None:
+                        try:
+                            self._ack(claimed.task_id)
+                        except Exception:  # noqa: BLE001 - lease expiry will retry the task
+                            logger.exception("Failed to acknowledge queue '%s' task %s", self._name, claimed.task_id)
+                if claimed is not None:
+                    self._report_timings(timings)
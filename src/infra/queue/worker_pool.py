@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """Worker threads of one queue: start, supervision, in-flight tracking, stop.
+
+    ``target`` is the queue's worker loop; it must return once ``stopping`` is
+    set. A supervisor thread restarts workers that died (e.g. a handler raising
+    ``BaseException``) every ``supervise_interval_seconds`` until the pool stops.
+
+    ``resize`` changes the number of workers between 0 and ``max_size`` at
+    runtime. Extra workers are started right away; surplus workers leave when
+    their loop next checks ``should_retire``.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        size: int,
+        target: Callable[[], None],
+        supervise_interval_seconds: float = 5.0,
+        max_size: Optional[int] = None,
+    ) -> None:
+        if size < 0:
+            raise ValueError("size must not be negative")
+        if max_size is not None and max_size < size:
+            raise ValueError("max_size must not be smaller than size")
+        if supervise_interval_seconds <= 0:
+            raise ValueError("supervise_interval_seconds must be positive")
+
+        self._name = name
+        self._size = size
+        self._target = target
+        self._supervise_interval_seconds = supervise_interval_seconds
+
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._stopping = threading.Event()
+        self._threads: List[Optional[threading.Thread]] = [None] * (
+            max_size if max_size is not None else size
+        )
+        self._supervisor: Optional[threading.Thread] = None
+        self._in_flight: Dict[str, Any] = {}
+        self._restart_count = 0
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping.is_set()
+
+    @property
+    def started(self) -> bool:
+        with self._lock:
+            return self._supervisor is not None
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._size
+
+    @property
+    def in_flight_count(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    @property
+    def restart_count(self) -> int:
+        with self._lock:
+            return self._restart_count
+
+    def in_flight(self) -> List[Any]:
+        with self._lock:
+            return list(self._in_flight.values())
+
+    def _spawn_locked(self, index: int) -> None:
+        thread = threading.Thread(
+            target=self._target,
+            name=f"{self._name}-worker-{index + 1}",
+            daemon=True,
+        )
+        self._threads[index] = thread
+        thread.start()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._supervisor is not None or self._stopping.is_set():
+                return
+            for index in range(self._size):
+                self._spawn_locked(index)
+            self._supervisor = threading.Thread(
+                target=self._supervise,
+                name=f"{self._name}-supervisor",
+                daemon=True,
+            )
+            self._supervisor.start()
+
+    def resize(self, size: int) -> None:
+        with self._lock:
+            size = max(0, min(size, len(self._threads)))
+            if size == self._size:
+                return
+            logger.info("Queue '%s' workers: %s -> %s", self._name, self._size, size)
+            self._size = size
+            if self._supervisor is None or self._stopping.is_set():
+                return
+            for index in range(size):
+                thread = self._threads[index]
+                if thread is None or not thread.is_alive():
+                    self._spawn_locked(index)
+
+    def should_retire(self) -> bool:
+        """True if the calling worker is beyond the current size and should return."""
+        current = threading.current_thread()
+        with self._lock:
+            for index in range(self._size, len(self._threads)):
+                if self._threads[index] is current:
+                    return True
+            return False
+
+    def _supervise(self) -> None:
+        while not self._stopping.wait(self._supervise_interval_seconds):
+            with self._lock:
+                for index in range(self._size):
+                    thread = self._threads[index]
+                    if thread is not None and thread.is_alive():
+                        continue
+                    if self._stopping.is_set():
+                        return
+                    self._restart_count += 1
+                    logger.error(
+                        "Queue '%s' worker %s died; restarting (restarts=%s)",
+                        self._name,
+                        index + 1,
+                        self._restart_count,
+                    )
+                    self._spawn_locked(index)
+
+    @contextmanager
+    def running(self, task: Any) -> Iterator[None]:
+        """Mark ``task`` as in flight on the current worker thread."""
+        name = threading.current_thread().name
+        with self._lock:
+            self._in_flight[name] = task
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight.pop(name, None)
+                self._idle.notify_all()
+
+    def request_stop(self) -> None:
+        self._stopping.set()
+
+    def wait_idle(self, timeout_seconds: float) -> bool:
+        """Wait until no task is in flight; True if that happened in time."""
+        deadline = time.monotonic() + max(0.0, timeout_seconds)
+        with self._lock:
+            while self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def join(self, timeout_seconds: float) -> None:
+        deadline = time.monotonic() + max(0.0, timeout_seconds)
+        with self._lock:
+            threads = [thread for thread in self._threads if thread is not None]
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
@@ -7,11 +7,21 @@ import os
 import sqlite3
 from typing import List
 
+from src.shared.metrics import REGISTRY
 from src.shared.types import GitDiffChange, LLMReviewResult
 
 
 logger = logging.getLogger(__name__)
 
+REVIEW_CACHE_LOOKUPS = REGISTRY.counter(
+    "gitlab_ai_reviewer_review_cache_lookups_total",
+    "Review cache lookups by result (hit, miss, error).",
+    ("result",),
+)
+_CACHE_HIT = REVIEW_CACHE_LOOKUPS.labels("hit")
+_CACHE_MISS = REVIEW_CACHE_LOOKUPS.labels("miss")
+_CACHE_ERROR = REVIEW_CACHE_LOOKUPS.labels("error")
+
 
 class ReviewCacheRepository:
     def __init__(self, db_path: str) -> None:
@@ -83,11 +93,14 @@ class ReviewCacheRepository:
             )
             row = cursor.fetchone()
             if not row:
+                _CACHE_MISS.inc()
                 return None
             payload = row[0]
             data = json.loads(payload)
+            _CACHE_HIT.inc()
             return data  # type: ignore[return-value]
         except Exception:
+            _CACHE_ERROR.inc()
             logger.exception("Failed to read review cache; skipping cache usage")
             return None
         finally:
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+WebhookResponse = Union[Tuple[str, int], Tuple[str, int, Dict[str, str]]]
+
+_IN_PROGRESS: WebhookResponse = ("Duplicate delivery is being processed", 200)
+
+
+class WebhookEventRepository:
+    """TTL-bounded seen-set of webhook deliveries keyed by event UUID.
+
+    Answers are kept in memory (bounded by ``max_entries``) and, when ``db_path``
+    is set, mirrored to SQLite so retries arriving after a restart are still
+    recognised. Only responses GitLab would not retry (status < 500, not 429)
+    are remembered, together with their headers (e.g. ``X-Review-Admission``).
+    Deliveries still being processed are never evicted, so a retry arriving
+    meanwhile is always answered as a duplicate.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        db_path: str | None = None,
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._db_path = db_path
+        self._lock = threading.Lock()
+        # event_id -> (expires_at, response); None response marks an in-flight delivery.
+        self._entries: OrderedDict[str, tuple[float, WebhookResponse | None]] = OrderedDict()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        assert self._db_path is not None
+        directory = os.path.dirname(self._db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self._db_path)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS webhook_event (
+                event_id TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(webhook_event)")}
+        if "headers" not in columns:
+            conn.execute("ALTER TABLE webhook_event ADD COLUMN headers TEXT")
+        return conn
+
+    def _load_persisted(self, event_id: str, now: float) -> WebhookResponse | None:
+        if self._db_path is None:
+            return None
+
+        conn: sqlite3.Connection | None = None
+        try:
+            conn = self._get_connection()
+            row = conn.execute(
+                "SELECT body, status_code, headers FROM webhook_event WHERE event_id = ? AND expires_at > ?",
+                (event_id, now),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2]:
+                return str(row[0]), int(row[1]), dict(json.loads(row[2]))
+            return str(row[0]), int(row[1])
+        except Exception:
+            logger.exception("Failed to read webhook event dedup state; treating as new")
+            return None
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _persist(self, event_id: str, response: WebhookResponse, expires_at: float) -> None:
+        if self._db_path is None:
+            return
+
+        conn: sqlite3.Connection | None = None
+        try:
+            conn = self._get_connection()
+            conn.execute(
+                """
+                INSERT INTO webhook_event (event_id, body, status_code, headers, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(event_id) DO UPDATE SET
+                    body = excluded.body,
+                    status_code = excluded.status_code,
+                    headers = excluded.headers,
+                    expires_at = excluded.expires_at
+                """,
+                (
+                    event_id,
+                    response[0],
+                    response[1],
+                    json.dumps(response[2]) if len(response) == 3 else None,  # type: ignore[misc]
+                    expires_at,
+                ),
+            )
+            conn.execute("DELETE FROM webhook_event WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+        except Exception:
+            logger.exception("Failed to persist webhook event dedup state")
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _evict_locked(self, now: float) -> None:
+        excess = len(self._entries) - self._max_entries
+        evicted: list[str] = []
+        for event_id, (expires_at, response) in self._entries.items():
+            if expires_at > now and excess <= 0:
+                break
+            if response is None:
+                # In flight: dropping it would let a retry be processed concurrently.
+                continue
+            evicted.append(event_id)
+            excess -= 1
+        for event_id in evicted:
+            del self._entries[event_id]
+
+    def claim(self, event_id: str) -> WebhookResponse | None:
+        """Return ``None`` if the caller should process the event, else the prior answer."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(event_id)
+            if entry is not None and entry[0] > now:
+                return entry[1] or _IN_PROGRESS
+            self._entries[event_id] = (now + self._ttl_seconds, None)
+            self._entries.move_to_end(event_id)
+            self._evict_locked(now)
+
+        persisted = self._load_persisted(event_id, now)
+        if persisted is not None:
+            with self._lock:
+                self._entries[event_id] = (now + self._ttl_seconds, persisted)
+            return persisted
+        return None
+
+    def complete(self, event_id: str, response: WebhookResponse) -> None:
+        status_code = response[1]
+        if status_code >= 500 or status_code == 429:
+            self.release(event_id)
+            return
+
+        expires_at = time.time() + self._ttl_seconds
+        with self._lock:
+            self._entries[event_id] = (expires_at, response)
+            self._entries.move_to_end(event_id)
+        self._persist(event_id, response, expires_at)
+
+    def release(self, event_id: str) -> None:
+        with self._lock:
+            self._entries.pop(event_id, None)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Callable, Hashable, List
+
+from src.shared.errors import TaskCancelledError
+
+
+class CancellationToken:
+    """Cooperative cancellation flag checked by long-running work at checkpoints."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._reason = ""
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def reason(self) -> str:
+        return self._reason
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:  # noqa: BLE001 - cancellation must not fail the caller
+                pass
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` on cancellation (immediately if already cancelled)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise TaskCancelledError(self._reason)
+
+
+class CancellationRegistry:
+    """Tracks the newest token per key and cancels the previous one on replace.
+
+    Tokens are held weakly: once the task carrying a token is finished and
+    dropped, its entry disappears, so the registry does not grow with every MR.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: "weakref.WeakValueDictionary[Hashable, CancellationToken]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def replace(self, key: Hashable, *, reason: str = "superseded") -> CancellationToken:
+        token = CancellationToken()
+        self.activate(key, token, reason=reason)
+        return token
+
+    def activate(self, key: Hashable, token: CancellationToken, *, reason: str = "superseded") -> None:
+        """Make ``token`` the newest for ``key`` and cancel the one it replaces.
+
+        Callers create the token up front and activate it only once the task
+        carrying it was admitted, so a rejected task never cancels live work.
+        """
+        with self._lock:
+            previous = self._tokens.get(key)
+            self._tokens[key] = token
+        if previous is not None and previous is not token:
+            previous.cancel(reason)
+
+
+def raise_if_cancelled(token: CancellationToken | None) -> None:
+    """Checkpoint helper for code paths where a token is optional."""
+    if token is not None:
+        token.raise_if_cancelled()
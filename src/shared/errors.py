@@ -8,3 +8,27 @@ class GitLabAPIError(RuntimeError):
 
 class LLMInvocationError(RuntimeError):
     """Raised when LLM invocation fails or returns malformed output."""
+
+
+class LLMRateLimitedError(LLMInvocationError):
+    """Raised when the LLM provider keeps throttling after the allowed retries."""
+
+    def __init__(self, message: str, *, retry_after_seconds: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class TaskCancelledError(RuntimeError):
+    """Raised when a task is abandoned because newer work superseded it."""
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a bounded queue rejects a task; carries a retry hint for callers."""
+
+    def __init__(self, message: str, *, retry_after_seconds: int) -> None:
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+class QueueClosedError(QueueFullError):
+    """Raised when a queue is draining for shutdown and no longer accepts tasks."""
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # orjson ships with langsmith on CPython; fall back to stdlib otherwise.
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None  # type: ignore[assignment]
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON with orjson when available. Raises ValueError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,286 @@
+"""Minimal Prometheus-compatible metrics (text exposition format 0.0.4).
+
+Hot paths only touch a per-thread cell: each labelled series keeps one small
+list per writing thread, so ``inc``/``observe`` take no lock after a thread's
+first write. ``render`` sums the cells, which is cheap next to the scrape.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import weakref
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+# Queue waits are dominated by the LLM rate limit, i.e. seconds to tens of minutes.
+QUEUE_WAIT_BUCKETS: Tuple[float, ...] = (
+    0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _CellOwner:
+    """Held only by a thread's ``threading.local``; collected when the thread exits."""
+
+
+class _Series:
+    """One labelled series; ``width`` slots per thread cell.
+
+    When a thread exits, its cell is folded into ``_retired`` so short-lived
+    threads (e.g. per-request server threads) do not grow the cell list.
+    """
+
+    def __init__(self, width: int) -> None:
+        self._width = width
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._retired = [0.0] * width
+        self._cells_lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = [0.0] * self._width
+            owner = _CellOwner()
+            with self._cells_lock:
+                self._cells.append(cell)
+            weakref.finalize(owner, self._retire, cell)
+            self._local.owner = owner
+            self._local.cell = cell
+        return cell
+
+    def _retire(self, cell: List[float]) -> None:
+        with self._cells_lock:
+            for index, value in enumerate(cell):
+                self._retired[index] += value
+            # Equal-valued cells are distinct, so remove by identity.
+            self._cells[:] = [live for live in self._cells if live is not cell]
+
+    def totals(self) -> List[float]:
+        with self._cells_lock:
+            cells = list(self._cells)
+            totals = list(self._retired)
+        for cell in cells:
+            for index, value in enumerate(cell):
+                totals[index] += value
+        return totals
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[LabelValues, _Series] = {}
+        self._lock = threading.Lock()
+
+    def _width(self) -> int:
+        raise NotImplementedError
+
+    def _get_series(self, values: LabelValues) -> _Series:
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                series = self._series.setdefault(values, _Series(self._width()))
+        return series
+
+    def _snapshot(self) -> List[Tuple[LabelValues, List[float]]]:
+        with self._lock:
+            items = list(self._series.items())
+        return [(values, series.totals()) for values, series in sorted(items)]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _BoundCounter:
+    def __init__(self, series: _Series) -> None:
+        self._series = series
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._series.cell()[0] += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _width(self) -> int:
+        return 1
+
+    def labels(self, *values: str) -> _BoundCounter:
+        return _BoundCounter(self._get_series(tuple(str(value) for value in values)))
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def value(self, *values: str) -> float:
+        return self._get_series(tuple(str(value) for value in values)).totals()[0]
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(totals[0])}"
+            for values, totals in self._snapshot()
+        ]
+
+
+class _BoundHistogram:
+    def __init__(self, series: _Series, buckets: Tuple[float, ...]) -> None:
+        self._series = series
+        self._buckets = buckets
+
+    def observe(self, value: float) -> None:
+        cell = self._series.cell()
+        # Slots: [sum, count, bucket_0 .. bucket_n] (non-cumulative until render).
+        cell[0] += value
+        cell[1] += 1
+        cell[2 + bisect.bisect_left(self._buckets, value)] += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _width(self) -> int:
+        return 2 + len(self.buckets) + 1
+
+    def labels(self, *values: str) -> _BoundHistogram:
+        return _BoundHistogram(self._get_series(tuple(str(value) for value in values)), self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def count(self, *values: str) -> int:
+        return int(self._get_series(tuple(str(value) for value in values)).totals()[1])
+
+    def _render_samples(self) -> List[str]:
+        lines: List[str] = []
+        bucket_names = self.labelnames + ("le",)
+        for values, totals in self._snapshot():
+            cumulative = 0.0
+            for bound, observed in zip(self.buckets + (math.inf,), totals[2:]):
+                cumulative += observed
+                labels = _format_labels(bucket_names, values + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(totals[0])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(totals[1])}")
+        return lines
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose samples are collected at scrape time (e.g. queue depth)."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def _width(self) -> int:
+        return 1
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}"
+            for values, value in sorted(self._collect())
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def gauge_callback(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    ) -> CallbackGauge:
+        return self._register(CallbackGauge(name, documentation, labelnames, collect))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served on /metrics.
+REGISTRY = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
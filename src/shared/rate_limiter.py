@@ -1,5 +1,52 @@
+import json
+import logging
+import os
+import sqlite3
 import threading
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Hashable, Iterable, Iterator, Mapping, Optional, Protocol
+
+from src.shared.throttle import ThrottleSignal
+
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter(Protocol):
+    """Blocking global limiter used by queue workers before starting a task."""
+
+    @property
+    def interval_seconds(self) -> float: ...
+
+    def acquire(self) -> None: ...
+
+
+_task_limiter: ContextVar[Optional[RateLimiter]] = ContextVar("task_rate_limiter", default=None)
+
+
+@contextmanager
+def task_rate_limiter(limiter: Optional[RateLimiter]) -> Iterator[None]:
+    """Expose the limiter of the queue running the current task to its handler."""
+    token = _task_limiter.set(limiter)
+    try:
+        yield
+    finally:
+        _task_limiter.reset(token)
+
+
+def acquire_task_rate_slot() -> float:
+    """Take another slot from the running task's queue limiter, e.g. before a retry.
+
+    Returns the seconds spent waiting; a no-op outside a rate-limited queue.
+    """
+    limiter = _task_limiter.get()
+    if limiter is None:
+        return 0.0
+    started_at = time.monotonic()
+    limiter.acquire()
+    return time.monotonic() - started_at
 
 
 class FixedIntervalRateLimiter:
@@ -13,6 +60,10 @@ class FixedIntervalRateLimiter:
         self._lock = threading.Lock()
         self._next_available_time = 0.0
 
+    @property
+    def interval_seconds(self) -> float:
+        return self._interval_seconds
+
     def acquire(self) -> None:
         while True:
             with self._lock:
@@ -23,3 +74,636 @@ class FixedIntervalRateLimiter:
                     self._next_available_time = start_time + self._interval_seconds
                     return
             time.sleep(wait)
+
+
+class _Bucket:
+    """Token bucket refilled continuously; ``tokens`` may go negative (debt)."""
+
+    def __init__(self, *, capacity: float, refill_per_second: float) -> None:
+        self.capacity = capacity
+        self._refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self._refill_per_second)
+        self._updated_at = now
+
+    def set_refill_per_second(self, refill_per_second: float) -> None:
+        self._refill()
+        self._refill_per_second = refill_per_second
+
+    def drain(self) -> None:
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+    def wait_for(self, amount: float) -> float:
+        self._refill()
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) / self._refill_per_second
+
+    def take(self, amount: float) -> None:
+        self._tokens -= amount
+
+    def give(self, amount: float) -> None:
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class TokenBucketRateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets with bursts.
+
+    Drop-in ``RateLimiter`` for the queues: ``acquire`` takes one request from a
+    bucket holding up to ``burst`` requests, so after an idle period up to
+    ``burst`` tasks start at once and the long-run rate stays
+    ``max_requests_per_minute``. ``burst=1`` behaves like
+    ``FixedIntervalRateLimiter``.
+
+    The token budget is charged by the LLM client: ``reserve_tokens`` blocks
+    until the estimated prompt size fits, and ``reconcile_tokens`` settles the
+    difference once the provider reports real usage. Under-estimates leave the
+    bucket in debt, which later reservations wait out.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_requests_per_minute: int | None,
+        burst: int = 1,
+        max_tokens_per_minute: int | None = None,
+    ) -> None:
+        if max_requests_per_minute is not None and max_requests_per_minute <= 0:
+            raise ValueError("max_requests_per_minute must be positive")
+        if burst <= 0:
+            raise ValueError("burst must be positive")
+        if max_tokens_per_minute is not None and max_tokens_per_minute <= 0:
+            raise ValueError("max_tokens_per_minute must be positive")
+
+        self._lock = threading.Lock()
+        self._requests = (
+            _Bucket(capacity=float(burst), refill_per_second=max_requests_per_minute / 60.0)
+            if max_requests_per_minute is not None
+            else None
+        )
+        self._interval_seconds = (
+            60.0 / float(max_requests_per_minute) if max_requests_per_minute is not None else 0.0
+        )
+        self._tokens = (
+            _Bucket(capacity=float(max_tokens_per_minute), refill_per_second=max_tokens_per_minute / 60.0)
+            if max_tokens_per_minute is not None
+            else None
+        )
+
+    @property
+    def interval_seconds(self) -> float:
+        return self._interval_seconds
+
+    def _take(self, bucket: _Bucket, amount: float) -> None:
+        while True:
+            with self._lock:
+                wait = bucket.wait_for(amount)
+                if wait <= 0.0:
+                    bucket.take(amount)
+                    return
+            time.sleep(wait)
+
+    def acquire(self) -> None:
+        if self._requests is not None:
+            self._take(self._requests, 1.0)
+
+    def reserve_tokens(self, estimated_tokens: int) -> int:
+        """Block until ``estimated_tokens`` fit in the budget; returns the amount charged."""
+        if self._tokens is None:
+            return 0
+        # A prompt larger than a whole minute's budget would never fit; let it
+        # through alone once the bucket is full.
+        charged = max(0, min(int(estimated_tokens), int(self._tokens.capacity)))
+        self._take(self._tokens, float(charged))
+        return charged
+
+    def reconcile_tokens(self, charged_tokens: int, actual_tokens: int) -> None:
+        if self._tokens is None:
+            return
+        with self._lock:
+            self._tokens.give(float(charged_tokens - actual_tokens))
+
+
+class AdaptiveRateLimiter(TokenBucketRateLimiter):
+    """``TokenBucketRateLimiter`` whose request rate follows provider throttling.
+
+    Registered as a ``ThrottleObserver`` on the LLM client. A 429 halves the
+    rate (down to ``min_requests_per_minute``), empties the burst and pauses
+    every worker for the provider's ``Retry-After``; an exhausted
+    ``x-ratelimit-remaining-*`` budget pauses until its reset. Each successful
+    call adds ``recovery_fraction`` of the ceiling back until the configured
+    ``max_requests_per_minute`` is reached again.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_requests_per_minute: int,
+        burst: int = 1,
+        max_tokens_per_minute: int | None = None,
+        min_requests_per_minute: float | None = None,
+        decrease_factor: float = 0.5,
+        recovery_fraction: float = 0.1,
+        name: str = "llm",
+    ) -> None:
+        super().__init__(
+            max_requests_per_minute=max_requests_per_minute,
+            burst=burst,
+            max_tokens_per_minute=max_tokens_per_minute,
+        )
+        if not 0.0 < decrease_factor < 1.0:
+            raise ValueError("decrease_factor must be in (0, 1)")
+        if recovery_fraction <= 0.0:
+            raise ValueError("recovery_fraction must be positive")
+
+        self._name = name
+        self._ceiling = float(max_requests_per_minute)
+        self._floor = min(
+            self._ceiling,
+            float(min_requests_per_minute) if min_requests_per_minute else max(0.1, self._ceiling / 16.0),
+        )
+        self._decrease_factor = decrease_factor
+        self._recovery = self._ceiling * recovery_fraction
+        self._current = self._ceiling
+        self._paused_until = 0.0
+
+    @property
+    def current_requests_per_minute(self) -> float:
+        with self._lock:
+            return self._current
+
+    @property
+    def interval_seconds(self) -> float:
+        with self._lock:
+            return 60.0 / self._current
+
+    def _set_rate_locked(self, requests_per_minute: float) -> None:
+        self._current = requests_per_minute
+        assert self._requests is not None
+        self._requests.set_refill_per_second(requests_per_minute / 60.0)
+
+    def _pause_locked(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def on_throttled(self, signal: ThrottleSignal) -> None:
+        if not signal.throttled:
+            # Timeouts say nothing about the provider's request budget.
+            return
+        with self._lock:
+            previous = self._current
+            self._set_rate_locked(max(self._floor, self._current * self._decrease_factor))
+            assert self._requests is not None
+            self._requests.drain()
+            pause = signal.retry_after_seconds
+            if pause is None:
+                pause = signal.exhausted_for_seconds
+            self._pause_locked(pause if pause is not None else 60.0 / self._current)
+            current = self._current
+        logger.warning(
+            "Rate limiter '%s' throttled by provider: %.2f -> %.2f requests/min, retry_after=%s",
+            self._name,
+            previous,
+            current,
+            signal.retry_after_seconds,
+        )
+
+    def on_success(self, signal: ThrottleSignal) -> None:
+        with self._lock:
+            exhausted_for = signal.exhausted_for_seconds
+            if exhausted_for is not None:
+                self._pause_locked(exhausted_for)
+            if self._current >= self._ceiling:
+                return
+            self._set_rate_locked(min(self._ceiling, self._current + self._recovery))
+            recovered = self._current >= self._ceiling
+        if recovered:
+            logger.info("Rate limiter '%s' recovered to %.2f requests/min", self._name, self._ceiling)
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._paused_until - time.monotonic()
+            if wait <= 0.0:
+                break
+            time.sleep(wait)
+        super().acquire()
+
+
+class SharedRateBudget:
+    """One provider-wide requests-per-minute budget split between queues.
+
+    Queues calling the same provider (and API key) take their ``RateLimiter``
+    from ``share(name, min_requests_per_minute=...)``. Each share refills its
+    own one-request bucket at its guaranteed minimum, and the rest of
+    ``max_requests_per_minute`` refills a common pool of up to ``burst``
+    requests. ``acquire`` uses the share's own bucket first and otherwise
+    borrows from the pool. A share whose bucket is full (an idle queue) spills
+    its refill into the pool, so a busy queue can use the whole budget while
+    the combined rate never exceeds it.
+
+    As a ``ThrottleObserver`` it behaves like ``AdaptiveRateLimiter`` for the
+    whole budget: a 429 scales every share down by ``decrease_factor`` and
+    pauses all of them; successes restore ``recovery_fraction`` at a time.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_requests_per_minute: int,
+        burst: int = 1,
+        decrease_factor: float = 0.5,
+        recovery_fraction: float = 0.1,
+        min_scale: float = 1.0 / 16.0,
+        name: str = "llm",
+    ) -> None:
+        if max_requests_per_minute <= 0:
+            raise ValueError("max_requests_per_minute must be positive")
+        if burst <= 0:
+            raise ValueError("burst must be positive")
+        if not 0.0 < decrease_factor < 1.0:
+            raise ValueError("decrease_factor must be in (0, 1)")
+        if recovery_fraction <= 0.0:
+            raise ValueError("recovery_fraction must be positive")
+
+        self._name = name
+        self._lock = threading.Lock()
+        self._max_per_second = max_requests_per_minute / 60.0
+        self._reserved_per_second = 0.0
+        self._pool_capacity = float(burst)
+        self._pool = float(burst)
+        self._shares: Dict[str, "RateBudgetShare"] = {}
+        self._updated_at = time.monotonic()
+        self._decrease_factor = decrease_factor
+        self._recovery = recovery_fraction
+        self._min_scale = min_scale
+        self._scale = 1.0
+        self._paused_until = 0.0
+
+    @property
+    def max_requests_per_minute(self) -> float:
+        return self._max_per_second * 60.0
+
+    @property
+    def current_requests_per_minute(self) -> float:
+        with self._lock:
+            return self._max_per_second * 60.0 * self._scale
+
+    def share(self, name: str, *, min_requests_per_minute: float = 0.0) -> "RateBudgetShare":
+        if min_requests_per_minute < 0:
+            raise ValueError("min_requests_per_minute must not be negative")
+        with self._lock:
+            if name in self._shares:
+                raise ValueError(f"Rate budget '{self._name}' already has a share named '{name}'")
+            refill_per_second = min_requests_per_minute / 60.0
+            if self._reserved_per_second + refill_per_second > self._max_per_second + 1e-9:
+                raise ValueError(
+                    f"Minimum shares of rate budget '{self._name}' exceed "
+                    f"{self._max_per_second * 60.0:g} requests/min"
+                )
+            self._refill_locked()
+            self._reserved_per_second += refill_per_second
+            share = RateBudgetShare(budget=self, name=name, refill_per_second=refill_per_second)
+            self._shares[name] = share
+            return share
+
+    def _refill_locked(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        spilled = 0.0
+        for share in self._shares.values():
+            share.tokens += elapsed * share.refill_per_second * self._scale
+            if share.tokens > 1.0:
+                spilled += share.tokens - 1.0
+                share.tokens = 1.0
+        unreserved = (self._max_per_second - self._reserved_per_second) * self._scale
+        self._pool = min(self._pool_capacity, self._pool + elapsed * unreserved + spilled)
+
+    def _take(self, share: "RateBudgetShare") -> None:
+        while True:
+            with self._lock:
+                self._refill_locked()
+                wait = self._paused_until - time.monotonic()
+                if wait <= 0.0:
+                    if share.tokens >= 1.0:
+                        share.tokens -= 1.0
+                        return
+                    if self._pool >= 1.0:
+                        self._pool -= 1.0
+                        return
+                    wait = self._next_token_in_locked(share)
+            time.sleep(wait)
+
+    def _next_token_in_locked(self, share: "RateBudgetShare") -> float:
+        waits = [1.0]  # idle shares spill into the pool at rates not modelled here
+        own_rate = share.refill_per_second * self._scale
+        if own_rate > 0.0:
+            waits.append((1.0 - share.tokens) / own_rate)
+        unreserved = (self._max_per_second - self._reserved_per_second) * self._scale
+        if unreserved > 0.0:
+            waits.append((1.0 - self._pool) / unreserved)
+        return max(0.001, min(waits))
+
+    def on_throttled(self, signal: ThrottleSignal) -> None:
+        if not signal.throttled:
+            return
+        with self._lock:
+            self._refill_locked()
+            previous = self._scale
+            self._scale = max(self._min_scale, self._scale * self._decrease_factor)
+            self._pool = min(self._pool, 0.0)
+            for share in self._shares.values():
+                share.tokens = min(share.tokens, 0.0)
+            pause = signal.retry_after_seconds
+            if pause is None:
+                pause = signal.exhausted_for_seconds
+            if pause is None:
+                pause = 1.0 / (self._max_per_second * self._scale)
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            current = self._scale
+        logger.warning(
+            "Rate budget '%s' throttled by provider: %.2f -> %.2f requests/min, retry_after=%s",
+            self._name,
+            self._max_per_second * 60.0 * previous,
+            self._max_per_second * 60.0 * current,
+            signal.retry_after_seconds,
+        )
+
+    def on_success(self, signal: ThrottleSignal) -> None:
+        with self._lock:
+            exhausted_for = signal.exhausted_for_seconds
+            if exhausted_for is not None:
+                self._paused_until = max(self._paused_until, time.monotonic() + exhausted_for)
+            if self._scale >= 1.0:
+                return
+            self._refill_locked()
+            self._scale = min(1.0, self._scale + self._recovery)
+            recovered = self._scale >= 1.0
+        if recovered:
+            logger.info(
+                "Rate budget '%s' recovered to %.2f requests/min",
+                self._name,
+                self._max_per_second * 60.0,
+            )
+
+
+class RateBudgetShare:
+    """One queue's ``RateLimiter`` view of a ``SharedRateBudget``."""
+
+    def __init__(self, *, budget: SharedRateBudget, name: str, refill_per_second: float) -> None:
+        self._budget = budget
+        self.name = name
+        self.refill_per_second = refill_per_second
+        # Guarded by the budget's lock.
+        self.tokens = 0.0
+
+    @property
+    def interval_seconds(self) -> float:
+        rate = self.refill_per_second or self._budget.max_requests_per_minute / 60.0
+        return 1.0 / rate
+
+    def acquire(self) -> None:
+        self._budget._take(self)
+
+
+class KeyedIntervalRateLimiter:
+    """Per-key fixed-interval ceilings (e.g. per project) nested under a global limiter.
+
+    Unlike ``FixedIntervalRateLimiter`` this never blocks: the queue scheduler asks
+    ``ready_in`` and skips keys that are over their ceiling, then ``reserve``s the
+    slot for the key it dispatches.
+    """
+
+    _PRUNE_THRESHOLD = 1024
+
+    def __init__(
+        self,
+        *,
+        default_max_requests_per_minute: int | None,
+        overrides: Mapping[Hashable, int] | None = None,
+    ) -> None:
+        if default_max_requests_per_minute is not None and default_max_requests_per_minute <= 0:
+            raise ValueError("default_max_requests_per_minute must be positive")
+        for key, value in (overrides or {}).items():
+            if value <= 0:
+                raise ValueError(f"max_requests_per_minute for {key!r} must be positive")
+
+        self._default_interval = (
+            60.0 / float(default_max_requests_per_minute)
+            if default_max_requests_per_minute is not None
+            else None
+        )
+        self._intervals = {key: 60.0 / float(value) for key, value in (overrides or {}).items()}
+        self._lock = threading.Lock()
+        self._next_available: Dict[Hashable, float] = {}
+
+    def _interval_for(self, key: Hashable) -> float | None:
+        return self._intervals.get(key, self._default_interval)
+
+    def ready_in(self, key: Hashable) -> float:
+        with self._lock:
+            return max(0.0, self._next_available.get(key, 0.0) - time.time())
+
+    def ready_in_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, float]:
+        """``ready_in`` for several keys at once, e.g. every candidate of one claim."""
+        now = time.time()
+        with self._lock:
+            return {key: max(0.0, self._next_available.get(key, 0.0) - now) for key in keys}
+
+    def reserve(self, key: Hashable) -> None:
+        interval = self._interval_for(key)
+        if interval is None:
+            return
+
+        with self._lock:
+            now = time.time()
+            start_time = max(now, self._next_available.get(key, 0.0))
+            self._next_available[key] = start_time + interval
+            if len(self._next_available) > self._PRUNE_THRESHOLD:
+                self._next_available = {
+                    k: v for k, v in self._next_available.items() if v > now
+                }
+
+
+def _open_rate_limit_db(db_path: str) -> sqlite3.Connection:
+    # The schema is created once by the limiter's constructor.
+    return sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+
+
+def _connect_rate_limit_db(db_path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = _open_rate_limit_db(db_path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rate_limit (
+            name TEXT NOT NULL,
+            limit_key TEXT NOT NULL,
+            next_available REAL NOT NULL,
+            PRIMARY KEY (name, limit_key)
+        )
+        """
+    )
+    return conn
+
+
+def _reserve_shared_slot(
+    db_path: str,
+    name: str,
+    limit_key: str,
+    interval_seconds: float,
+    burst_seconds: float = 0.0,
+) -> float:
+    """Atomically book the next slot for ``(name, limit_key)``; returns seconds until it starts.
+
+    ``next_available`` is the theoretical arrival time of the generic cell rate
+    algorithm; ``burst_seconds`` lets a slot start that much ahead of it, which
+    is a token bucket holding ``1 + burst_seconds / interval_seconds`` requests.
+    """
+    conn = _open_rate_limit_db(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT next_available FROM rate_limit WHERE name = ? AND limit_key = ?",
+            (name, limit_key),
+        ).fetchone()
+        now = time.time()
+        scheduled = max(now, float(row[0]) if row else 0.0)
+        start_time = max(now, scheduled - burst_seconds)
+        conn.execute(
+            """
+            INSERT INTO rate_limit (name, limit_key, next_available)
+            VALUES (?, ?, ?)
+            ON CONFLICT(name, limit_key) DO UPDATE SET next_available = excluded.next_available
+            """,
+            (name, limit_key, scheduled + interval_seconds),
+        )
+        conn.execute("COMMIT")
+        return start_time - now
+    finally:
+        conn.close()
+
+
+class SQLiteIntervalRateLimiter:
+    """``FixedIntervalRateLimiter`` whose schedule lives in SQLite.
+
+    Every process on the host that opens the same ``db_path``/``name`` shares one
+    budget, so e.g. gunicorn ``-w 4`` still starts at most
+    ``max_requests_per_minute`` tasks in total. Each ``acquire`` books the next
+    free slot in one short transaction and then sleeps until it. ``burst`` has
+    the same meaning as for ``TokenBucketRateLimiter``.
+    """
+
+    def __init__(self, *, db_path: str, name: str, max_requests_per_minute: int, burst: int = 1) -> None:
+        if max_requests_per_minute <= 0:
+            raise ValueError("max_requests_per_minute must be positive")
+        if burst <= 0:
+            raise ValueError("burst must be positive")
+
+        self._db_path = db_path
+        self._name = name
+        self._interval_seconds = 60.0 / float(max_requests_per_minute)
+        self._burst_seconds = (burst - 1) * self._interval_seconds
+        conn = _connect_rate_limit_db(db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    @property
+    def interval_seconds(self) -> float:
+        return self._interval_seconds
+
+    def acquire(self) -> None:
+        wait = _reserve_shared_slot(
+            self._db_path, self._name, "", self._interval_seconds, self._burst_seconds
+        )
+        if wait > 0.0:
+            time.sleep(wait)
+
+
+class CompositeRateLimiter:
+    """Waits for each limiter in turn, so the strictest one sets the pace.
+
+    Used to stack a process-local limiter (adaptive bucket or budget share) in
+    front of a cross-process SQLite schedule. List limiters that book slots
+    ahead (SQLite) last, so a booked slot is not spent waiting on the others.
+    """
+
+    def __init__(self, *limiters: RateLimiter) -> None:
+        if not limiters:
+            raise ValueError("at least one limiter is required")
+        self._limiters = limiters
+
+    @property
+    def interval_seconds(self) -> float:
+        return max(limiter.interval_seconds for limiter in self._limiters)
+
+    def acquire(self) -> None:
+        for limiter in self._limiters:
+            limiter.acquire()
+
+
+class SQLiteKeyedIntervalRateLimiter(KeyedIntervalRateLimiter):
+    """``KeyedIntervalRateLimiter`` shared across processes through SQLite."""
+
+    def __init__(
+        self,
+        *,
+        db_path: str,
+        name: str,
+        default_max_requests_per_minute: int | None,
+        overrides: Mapping[Hashable, int] | None = None,
+    ) -> None:
+        super().__init__(
+            default_max_requests_per_minute=default_max_requests_per_minute,
+            overrides=overrides,
+        )
+        self._db_path = db_path
+        self._name = name
+        conn = _connect_rate_limit_db(db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _limit_key(key: Hashable) -> str:
+        return json.dumps(key, separators=(",", ":"), default=str)
+
+    def ready_in(self, key: Hashable) -> float:
+        return self.ready_in_many([key])[key]
+
+    def ready_in_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, float]:
+        ready: Dict[Hashable, float] = {key: 0.0 for key in keys}
+        limited = {self._limit_key(key): key for key in ready if self._interval_for(key) is not None}
+        if not limited:
+            return ready
+
+        placeholders = ",".join("?" for _ in limited)
+        conn = _open_rate_limit_db(self._db_path)
+        try:
+            rows = conn.execute(
+                f"SELECT limit_key, next_available FROM rate_limit WHERE name = ? AND limit_key IN ({placeholders})",
+                (self._name, *limited),
+            ).fetchall()
+        finally:
+            conn.close()
+        now = time.time()
+        for limit_key, next_available in rows:
+            ready[limited[limit_key]] = max(0.0, float(next_available) - now)
+        return ready
+
+    def reserve(self, key: Hashable) -> None:
+        interval = self._interval_for(key)
+        if interval is None:
+            return
+        _reserve_shared_slot(self._db_path, self._name, self._limit_key(key), interval)
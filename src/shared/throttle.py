@@ -0,0 +1,197 @@
+"""Throttling signals read from HTTP responses and errors of rate-limited APIs."""
+
+from __future__ import annotations
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterator, Mapping, Optional, Protocol
+
+
+@dataclass(frozen=True)
+class ThrottleSignal:
+    """What a provider said about its rate limit on one response.
+
+    ``throttled`` is True for 429/"resource exhausted" responses and
+    ``timed_out`` for calls that hit the client timeout. The other fields are
+    None when the provider did not send them.
+    """
+
+    throttled: bool
+    timed_out: bool = False
+    retry_after_seconds: Optional[float] = None
+    remaining_requests: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    reset_requests_seconds: Optional[float] = None
+    reset_tokens_seconds: Optional[float] = None
+
+    @property
+    def exhausted_for_seconds(self) -> Optional[float]:
+        """Seconds until the provider accepts requests again if a budget hit zero."""
+        waits = []
+        if self.remaining_requests == 0 and self.reset_requests_seconds is not None:
+            waits.append(self.reset_requests_seconds)
+        if self.remaining_tokens == 0 and self.reset_tokens_seconds is not None:
+            waits.append(self.reset_tokens_seconds)
+        return max(waits) if waits else None
+
+
+class ThrottleObserver(Protocol):
+    """Receives the signal of every call, e.g. an adaptive rate limiter."""
+
+    def on_throttled(self, signal: ThrottleSignal) -> None: ...
+
+    def on_success(self, signal: ThrottleSignal) -> None: ...
+
+
+_throttle_caller: ContextVar[Optional[str]] = ContextVar("throttle_caller", default=None)
+
+
+@contextmanager
+def throttle_caller(name: Optional[str]) -> Iterator[None]:
+    """Attribute the provider calls made inside the block to ``name`` (e.g. a queue)."""
+    token = _throttle_caller.set(name)
+    try:
+        yield
+    finally:
+        _throttle_caller.reset(token)
+
+
+class CallerThrottleObserver:
+    """Forwards only the signals of calls made under ``throttle_caller(caller)``.
+
+    Lets a per-queue observer (e.g. a worker concurrency controller) share a
+    client with other queues without reacting to their throttling.
+    """
+
+    def __init__(self, observer: ThrottleObserver, caller: str) -> None:
+        self._observer = observer
+        self._caller = caller
+
+    def on_throttled(self, signal: ThrottleSignal) -> None:
+        if _throttle_caller.get() == self._caller:
+            self._observer.on_throttled(signal)
+
+    def on_success(self, signal: ThrottleSignal) -> None:
+        if _throttle_caller.get() == self._caller:
+            self._observer.on_success(signal)
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse ``"20"``, ``"1.5s"``, ``"6m0s"`` or ``"250ms"`` into seconds."""
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    if not text:
+        return None
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def parse_retry_after(value: Optional[str], *, now: Optional[float] = None) -> Optional[float]:
+    """``Retry-After`` as delta-seconds or an HTTP date, in seconds from ``now``."""
+    if value is None:
+        return None
+    seconds = parse_duration_seconds(value)
+    if seconds is not None:
+        return seconds
+    try:
+        moment = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    current = time.time() if now is None else now
+    return max(0.0, moment.timestamp() - current)
+
+
+def _get_int(headers: Mapping[str, Any], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _lower_keys(headers: Mapping[str, Any]) -> Mapping[str, Any]:
+    return {str(key).lower(): value for key, value in headers.items()}
+
+
+def throttle_signal_from_headers(
+    status_code: Optional[int],
+    headers: Optional[Mapping[str, Any]],
+) -> ThrottleSignal:
+    """Read 429 status, ``Retry-After(-ms)`` and ``x-ratelimit-*`` headers."""
+    headers = _lower_keys(headers or {})
+    retry_after = None
+    if headers.get("retry-after-ms") is not None:
+        retry_after_ms = parse_duration_seconds(str(headers["retry-after-ms"]))
+        retry_after = retry_after_ms / 1000.0 if retry_after_ms is not None else None
+    if retry_after is None:
+        retry_after = parse_retry_after(headers.get("retry-after"))
+    return ThrottleSignal(
+        throttled=status_code == 429,
+        retry_after_seconds=retry_after,
+        remaining_requests=_get_int(headers, "x-ratelimit-remaining-requests"),
+        remaining_tokens=_get_int(headers, "x-ratelimit-remaining-tokens"),
+        reset_requests_seconds=parse_duration_seconds(headers.get("x-ratelimit-reset-requests")),
+        reset_tokens_seconds=parse_duration_seconds(headers.get("x-ratelimit-reset-tokens")),
+    )
+
+
+def throttle_signal_from_exception(error: BaseException) -> Optional[ThrottleSignal]:
+    """Signal for provider SDK errors that mean "rate limited", else None.
+
+    Looks through the exception chain for an HTTP status (``status_code``,
+    ``code`` or ``response.status_code``) of 429, or gRPC-style
+    ``RESOURCE_EXHAUSTED`` errors (Gemini), and reads the response headers.
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        response = getattr(current, "response", None)
+        status = getattr(current, "status_code", None)
+        if status is None:
+            status = getattr(response, "status_code", None)
+        if status is None and isinstance(getattr(current, "code", None), int):
+            status = current.code  # type: ignore[attr-defined]
+        if status == 429 or type(current).__name__ in {"RateLimitError", "ResourceExhausted"}:
+            headers = getattr(response, "headers", None)
+            return throttle_signal_from_headers(429, headers if isinstance(headers, Mapping) else None)
+        current = current.__cause__ or current.__context__
+    return None
+
+
+_TIMEOUT_ERROR_NAMES = {
+    "APITimeoutError",
+    "ConnectTimeout",
+    "DeadlineExceeded",
+    "ReadTimeout",
+    "TimeoutException",
+}
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """True if the exception chain contains a client/provider timeout."""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, TimeoutError) or type(current).__name__ in _TIMEOUT_ERROR_NAMES:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
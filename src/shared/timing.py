@@ -0,0 +1,72 @@
+"""Per-task timing breakdown.
+
+A queue worker opens ``task_timings()`` around each task; code running inside
+the task wraps its stages in ``span("stage")``. Spans outside a task (e.g. a
+webhook request thread) are no-ops, so library code can use them freely.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+
+class TaskTimings:
+    """Seconds spent per stage of one task; repeated stages accumulate."""
+
+    def __init__(self) -> None:
+        self._started_at = time.monotonic()
+        self._stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self._stages[stage] = self._stages.get(stage, 0.0) + max(0.0, seconds)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.monotonic() - self._started_at
+
+    def as_dict(self) -> Dict[str, float]:
+        return {stage: round(seconds, 4) for stage, seconds in self._stages.items()}
+
+    def summary(self) -> str:
+        parts = [f"{stage}={seconds:.3f}s" for stage, seconds in self._stages.items()]
+        parts.append(f"total={self.elapsed_seconds:.3f}s")
+        return " ".join(parts)
+
+
+_current: ContextVar[Optional[TaskTimings]] = ContextVar("task_timings", default=None)
+
+
+def current_timings() -> Optional[TaskTimings]:
+    return _current.get()
+
+
+@contextmanager
+def task_timings() -> Iterator[TaskTimings]:
+    timings = TaskTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def record(stage: str, seconds: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started_at = time.monotonic()
+    try:
+        yield
+    finally:
+        timings.add(stage, time.monotonic() - started_at)
@@ -1,3 +1,4 @@
+from enum import Enum
 from typing import List, NotRequired, TypedDict
 
 
@@ -35,3 +36,26 @@ class LLMReviewResult(TypedDict, total=False):
     input_tokens: NotRequired[int]
     output_tokens: NotRequired[int]
     total_tokens: NotRequired[int]
+
+
+class OverflowPolicy(str, Enum):
+    """What a full queue (``max_pending_jobs`` reached) does with a new task."""
+
+    REJECT = "reject"
+    DROP_OLDEST = "drop_oldest"
+    # Accept a cheaper variant of the task (see ``degrade``) up to twice the
+    # capacity, then reject.
+    DEGRADE = "degrade"
+
+
+class TaskOutcome(str, Enum):
+    """What a queue task handler may return; handlers that return None completed.
+
+    Handlers that report their own errors (e.g. post an error comment) return
+    FAILED so the queue still counts the task as failed; work abandoned because
+    a newer task superseded it returns CANCELLED.
+    """
+
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
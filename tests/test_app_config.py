@@ -27,6 +27,8 @@ def test_app_settings_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
     assert settings.llm_model == "gpt-5-mini"
     assert settings.review_max_requests_per_minute == 2
     assert settings.refactor_suggestion_max_files == 20
+    assert settings.review_cancel_superseded is False
+    assert settings.push_review_range is False
 
 
 def test_app_settings_missing_required_raises(monkeypatch: pytest.MonkeyPatch) -> None:
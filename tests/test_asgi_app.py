@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from src.app.asgi import WebhookASGIApp
+
+
+class _DummyOrchestrator:
+    def __init__(self) -> None:
+        self.push_called = False
+        self.thread_name = None
+
+    def handle_push_event(self, payload):
+        self.push_called = True
+        self.thread_name = threading.current_thread().name
+        return "PUSH", 200
+
+
+def _components(orchestrator: _DummyOrchestrator) -> SimpleNamespace:
+    settings = SimpleNamespace(
+        gitlab_webhook_secret_token="secret",
+        enable_merge_request_review=True,
+        enable_refactor_suggestion_review=True,
+        enable_push_review=True,
+        webhook_async_ack=True,
+        metrics_enabled=True,
+    )
+    return SimpleNamespace(settings=settings, orchestrator=orchestrator, webhook_event_repo=None)
+
+
+def _call(
+    app: WebhookASGIApp,
+    *,
+    path: str,
+    headers: list[tuple[bytes, bytes]],
+    body: bytes,
+    method: str = "POST",
+):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent: list[dict] = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": headers}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], sent[1]["body"]
+
+
+def test_asgi_app_routes_push_event() -> None:
+    orchestrator = _DummyOrchestrator()
+    app = WebhookASGIApp(lambda: _components(orchestrator))
+
+    status, body = _call(
+        app,
+        path="/webhook",
+        headers=[(b"x-gitlab-token", b"secret"), (b"x-gitlab-event", b"Push Hook")],
+        body=b'{"object_kind": "push", "project_id": 1, "after": "b"}',
+    )
+
+    assert status == 200
+    assert body == b"PUSH"
+    assert orchestrator.push_called is True
+    # The handler does blocking SQLite I/O, so it must stay off the event loop.
+    assert orchestrator.thread_name.startswith("webhook-handler")
+
+
+def test_asgi_app_builds_components_off_the_event_loop() -> None:
+    built_on: list[str] = []
+
+    def factory() -> SimpleNamespace:
+        built_on.append(threading.current_thread().name)
+        return _components(_DummyOrchestrator())
+
+    app = WebhookASGIApp(factory)
+
+    # No lifespan messages: the first request builds the components.
+    _call(app, path="/webhook", headers=[], body=b"{}")
+    _call(app, path="/webhook", headers=[], body=b"{}")
+
+    assert len(built_on) == 1
+    assert built_on[0].startswith("webhook-handler")
+
+
+def test_asgi_app_rejects_invalid_token_and_unknown_path() -> None:
+    orchestrator = _DummyOrchestrator()
+    app = WebhookASGIApp(lambda: _components(orchestrator))
+
+    status, _ = _call(app, path="/webhook", headers=[], body=b"{}")
+    assert status == 403
+
+    status, _ = _call(app, path="/other", headers=[], body=b"")
+    assert status == 404
+    assert orchestrator.push_called is False
+
+
+def test_asgi_app_serves_prometheus_metrics() -> None:
+    app = WebhookASGIApp(lambda: _components(_DummyOrchestrator()))
+
+    status, body = _call(app, path="/metrics", headers=[], body=b"", method="GET")
+
+    assert status == 200
+    assert b"# TYPE gitlab_ai_reviewer_queue_wait_seconds histogram" in body
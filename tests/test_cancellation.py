@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from src.infra.clients import llm as llm_client
+from src.infra.clients.llm import LLMClient
+from src.shared.cancellation import CancellationRegistry, CancellationToken
+from src.shared.errors import LLMInvocationError, TaskCancelledError
+from src.shared.throttle import is_timeout_error
+
+
+def test_registry_replace_cancels_previous_token() -> None:
+    registry = CancellationRegistry()
+
+    first = registry.replace(("merge_request", 1, 2))
+    second = registry.replace(("merge_request", 1, 2))
+    other = registry.replace(("merge_request", 1, 3))
+
+    assert first.is_cancelled is True
+    assert second.is_cancelled is False
+    assert other.is_cancelled is False
+    with pytest.raises(TaskCancelledError):
+        first.raise_if_cancelled()
+
+
+class _SlowStreamingModel:
+    def __init__(self) -> None:
+        self.closed = threading.Event()
+
+    def stream(self, messages):
+        try:
+            for _ in range(100):
+                time.sleep(0.02)
+                yield "chunk"
+        finally:
+            self.closed.set()
+
+
+def test_invoke_cancellable_returns_immediately_and_closes_stream() -> None:
+    model = _SlowStreamingModel()
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel, args=("superseded",)).start()
+
+    started_at = time.monotonic()
+    with pytest.raises(TaskCancelledError):
+        LLMClient._invoke_cancellable(model, [], token, timeout_seconds=30.0)
+
+    assert time.monotonic() - started_at < 1.0
+    assert model.closed.wait(timeout=1.0)
+
+
+def test_invoke_cancellable_gives_up_after_the_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm_client, "_STREAM_DEADLINE_GRACE_SECONDS", 0.0)
+    model = _SlowStreamingModel()
+
+    started_at = time.monotonic()
+    with pytest.raises(LLMInvocationError) as excinfo:
+        LLMClient._invoke_cancellable(model, [], CancellationToken(), timeout_seconds=0.1)
+
+    assert time.monotonic() - started_at < 1.0
+    assert is_timeout_error(excinfo.value)
+    assert model.closed.wait(timeout=1.0)
@@ -0,0 +1,40 @@
+import threading
+import time
+
+import pytest
+
+from src.infra.queue.debouncer import KeyedDebouncer
+
+
+def test_debouncer_rejects_non_positive_window() -> None:
+    with pytest.raises(ValueError):
+        KeyedDebouncer[int](name="invalid", window_seconds=0, on_ready=lambda task: None)
+
+
+def test_debouncer_collapses_burst_per_key() -> None:
+    released: list[tuple[str, int]] = []
+    lock = threading.Lock()
+
+    def on_ready(task: tuple[str, int]) -> None:
+        with lock:
+            released.append(task)
+
+    debouncer = KeyedDebouncer[tuple[str, int]](
+        name="test-debounce",
+        window_seconds=0.1,
+        on_ready=on_ready,
+        merge=lambda older, newer: (newer[0], older[1] + newer[1]),
+    )
+
+    for value in (1, 2, 3):
+        debouncer.submit("main", ("main", value))
+        time.sleep(0.02)
+    debouncer.submit("feature", ("feature", 10))
+
+    assert debouncer.pending_count == 2
+    time.sleep(0.3)
+
+    with lock:
+        assert sorted(released) == [("feature", 10), ("main", 6)]
+    assert debouncer.collapsed_count == 2
+    assert debouncer.pending_count == 0
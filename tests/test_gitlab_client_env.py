@@ -1,8 +1,13 @@
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
 
 import pytest
 
-from src.infra.clients.gitlab import GitLabClient, GitLabClientConfig
+from src.infra.clients.gitlab import GITLAB_RESPONSE_CACHE, GitLabClient, GitLabClientConfig
+from src.shared.errors import GitLabAPIError
 
 
 def _require_env(name: str) -> str:
@@ -57,3 +62,233 @@ def test_get_commit_diff_with_real_gitlab() -> None:
     )
 
     assert isinstance(diffs, list)
+
+
+def test_gitlab_client_reuses_pooled_connections_across_threads() -> None:
+    connections: list[int] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self) -> None:
+            super().setup()
+            connections.append(1)
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            assert self.headers["Private-Token"] == "token"
+            body = b"print('hi')\n"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = GitLabClient(
+        GitLabClientConfig(
+            api_base_url=f"http://127.0.0.1:{server.server_address[1]}/api/v4",
+            access_token="token",
+            timeout_seconds=5.0,
+            pool_size=2,
+        )
+    )
+
+    def fetch() -> None:
+        for _ in range(10):
+            assert client.get_repository_file_raw(project_id=1, file_path="a.py", ref="main") == "print('hi')\n"
+
+    try:
+        threads = [threading.Thread(target=fetch) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+    finally:
+        client.close()
+        server.shutdown()
+
+    assert 1 <= len(connections) <= 2
+
+
+def _scripted_gitlab(responses: list[tuple[int, dict[str, str]]]) -> tuple[ThreadingHTTPServer, list[tuple[str, float]]]:
+    """Local GitLab stand-in replying with ``responses`` in order, then ``200 []``."""
+    calls: list[tuple[str, float]] = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _reply(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            with lock:
+                calls.append((self.command, time.monotonic()))
+                status, headers = responses.pop(0) if responses else (200, {})
+            body = b"[]"
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = _reply  # noqa: N815 - http.server naming
+        do_POST = _reply  # noqa: N815 - http.server naming
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, calls
+
+
+def _local_client(server: ThreadingHTTPServer, **config: Any) -> GitLabClient:
+    return GitLabClient(
+        GitLabClientConfig(
+            api_base_url=f"http://127.0.0.1:{server.server_address[1]}/api/v4",
+            access_token="token",
+            timeout_seconds=5.0,
+            retry_backoff_seconds=0.01,
+            **config,
+        )
+    )
+
+
+def test_gitlab_client_retries_transient_get_errors() -> None:
+    server, calls = _scripted_gitlab([(502, {}), (503, {"Retry-After": "0"}), (429, {})])
+    client = _local_client(server)
+    try:
+        assert client.get_commit_diff(project_id=1, commit_id="abc") == []
+    finally:
+        client.close()
+        server.shutdown()
+    assert [method for method, _ in calls] == ["GET"] * 4
+
+
+def test_gitlab_client_does_not_retry_failed_posts() -> None:
+    server, calls = _scripted_gitlab([(502, {}), (502, {})])
+    client = _local_client(server)
+    try:
+        with pytest.raises(GitLabAPIError, match="status=502"):
+            client.post_merge_request_comment(project_id=1, merge_request_iid=2, body="hi")
+    finally:
+        client.close()
+        server.shutdown()
+    assert [method for method, _ in calls] == ["POST"]
+
+
+def test_gitlab_client_gives_up_after_max_retries() -> None:
+    server, calls = _scripted_gitlab([(503, {})] * 5)
+    client = _local_client(server)
+    try:
+        with pytest.raises(GitLabAPIError, match="status=503"):
+            client.get_commit_diff(project_id=1, commit_id="abc")
+    finally:
+        client.close()
+        server.shutdown()
+    assert len(calls) == 4  # first attempt + GitLabClientConfig.max_retries
+
+
+def test_gitlab_client_pauses_when_rate_limit_is_exhausted() -> None:
+    server, calls = _scripted_gitlab(
+        [(200, {"RateLimit-Limit": "600", "RateLimit-Remaining": "0", "RateLimit-Reset": "0.3"})]
+    )
+    client = _local_client(server)
+    try:
+        client.get_commit_diff(project_id=1, commit_id="abc")
+        client.get_commit_diff(project_id=1, commit_id="abc")
+    finally:
+        client.close()
+        server.shutdown()
+    assert calls[1][1] - calls[0][1] >= 0.25
+
+
+def test_gitlab_client_serves_not_modified_reads_from_cache() -> None:
+    state = {"etag": '"v1"', "body": b"first\n"}
+    conditional: list[str | None] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            conditional.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == state["etag"]:
+                self.send_response(304)
+                self.send_header("ETag", state["etag"])
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", state["etag"])
+            self.send_header("Content-Length", str(len(state["body"])))
+            self.end_headers()
+            self.wfile.write(state["body"])
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = _local_client(server)
+    hits_before = GITLAB_RESPONSE_CACHE.value("repository_file_raw", "hit")
+
+    def read(ref: str = "main") -> str:
+        return client.get_repository_file_raw(project_id=1, file_path="a.py", ref=ref)
+
+    try:
+        assert read() == "first\n"
+        assert read() == "first\n"  # 304, served from the cache
+        state.update(etag='"v2"', body=b"second\n")
+        assert read() == "second\n"
+        assert read("other") == "second\n"  # params are part of the key
+    finally:
+        client.close()
+        server.shutdown()
+
+    assert conditional == [None, '"v1"', '"v1"', None]
+    assert GITLAB_RESPONSE_CACHE.value("repository_file_raw", "hit") == hits_before + 1
+
+
+def test_gitlab_client_response_cache_is_bounded_by_bytes() -> None:
+    body = b"x" * 400
+    conditional: list[str | None] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            conditional.append(self.headers.get("If-None-Match"))
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Room for one 400-byte body, not two.
+    client = _local_client(server, response_cache_max_bytes=600)
+
+    try:
+        for path in ("a.py", "a.py", "b.py", "a.py"):
+            client.get_repository_file_raw(project_id=1, file_path=path, ref="main")
+    finally:
+        client.close()
+        server.shutdown()
+
+    # Caching b.py evicted a.py, so the last read is unconditional again.
+    assert conditional == [None, '"v1"', None, None]
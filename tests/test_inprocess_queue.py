@@ -1,7 +1,14 @@
 import threading
 import time
 
-from src.infra.queue.inprocess_queue import InProcessWorkerQueue
+import pytest
+
+from src.infra.queue.concurrency import AimdConcurrencyController
+from src.infra.queue.inprocess_queue import EnqueueOutcome, InProcessWorkerQueue
+from src.shared.errors import QueueClosedError, QueueFullError
+from src.shared.rate_limiter import KeyedIntervalRateLimiter
+from src.shared.throttle import CallerThrottleObserver, ThrottleSignal
+from src.shared.types import OverflowPolicy, TaskOutcome
 
 
 def test_inprocess_queue_processes_tasks() -> None:
@@ -51,3 +58,491 @@ def test_inprocess_queue_worker_survives_handler_exceptions() -> None:
 
     # allow background queue thread to settle for deterministic behavior
     time.sleep(0.05)
+
+
+def test_inprocess_queue_coalesces_pending_tasks_with_same_key() -> None:
+    release = threading.Event()
+    started = threading.Event()
+    done = threading.Event()
+    seen: list[tuple[str, int]] = []
+
+    def handler(value: tuple[str, int]) -> None:
+        if value[0] == "blocker":
+            started.set()
+            release.wait(timeout=2)
+            return
+        seen.append(value)
+        if value == ("mr", 3):
+            done.set()
+
+    q = InProcessWorkerQueue[tuple[str, int]](
+        name="test-coalesce",
+        handler=handler,
+        max_requests_per_minute=None,
+        worker_concurrency=1,
+        coalesce_key=lambda value: value[0] if value[0] == "mr" else None,
+    )
+
+    q.enqueue(("blocker", 0))
+    assert started.wait(timeout=2)
+    q.enqueue(("mr", 1))
+    q.enqueue(("mr", 2))
+    q.enqueue(("mr", 3))
+    assert q.pending_count == 1
+    release.set()
+
+    assert done.wait(timeout=2)
+    assert seen == [("mr", 3)]
+    assert q.superseded_count == 2
+
+
+def _blocked_queue(name: str, **kwargs) -> tuple[InProcessWorkerQueue[int], threading.Event, list[int]]:
+    release = threading.Event()
+    started = threading.Event()
+    seen: list[int] = []
+
+    def handler(value: int) -> None:
+        if value == 0:
+            started.set()
+            release.wait(timeout=2)
+            return
+        seen.append(value)
+
+    q = InProcessWorkerQueue[int](
+        name=name,
+        handler=handler,
+        max_requests_per_minute=None,
+        worker_concurrency=1,
+        **kwargs,
+    )
+    q.enqueue(0)
+    assert started.wait(timeout=2)
+    return q, release, seen
+
+
+def test_inprocess_queue_rejects_when_full() -> None:
+    q, release, _ = _blocked_queue("test-reject", max_pending_jobs=2)
+
+    assert q.enqueue(1) is EnqueueOutcome.ACCEPTED
+    assert q.enqueue(2) is EnqueueOutcome.ACCEPTED
+    with pytest.raises(QueueFullError) as exc_info:
+        q.enqueue(3)
+
+    assert exc_info.value.retry_after_seconds >= 1
+    assert q.rejected_count == 1
+    release.set()
+
+
+def test_inprocess_queue_drops_oldest_when_full() -> None:
+    q, release, seen = _blocked_queue(
+        "test-drop-oldest",
+        max_pending_jobs=2,
+        overflow_policy=OverflowPolicy.DROP_OLDEST,
+    )
+
+    q.enqueue(1)
+    q.enqueue(2)
+    assert q.enqueue(3) is EnqueueOutcome.DROPPED_OLDEST
+    release.set()
+
+    deadline = time.time() + 2
+    while len(seen) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert seen == [2, 3]
+    assert q.dropped_count == 1
+
+
+def test_inprocess_queue_degrades_when_full() -> None:
+    q, release, seen = _blocked_queue(
+        "test-degrade",
+        max_pending_jobs=1,
+        overflow_policy=OverflowPolicy.DEGRADE,
+        degrade=lambda value: value * 100,
+    )
+
+    q.enqueue(1)
+    assert q.enqueue(2) is EnqueueOutcome.DEGRADED
+    with pytest.raises(QueueFullError):
+        q.enqueue(3)
+    release.set()
+
+    deadline = time.time() + 2
+    while len(seen) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert seen == [1, 200]
+
+
+def _wait_for(seen: list, count: int) -> None:
+    deadline = time.time() + 2
+    while len(seen) < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_inprocess_queue_fair_scheduling_round_robins_projects() -> None:
+    # value // 100 is the project: project 1 floods the queue before project 2 arrives.
+    q, release, seen = _blocked_queue("test-fair", fairness_key=lambda value: value // 100)
+
+    for value in (101, 102, 103, 104):
+        q.enqueue(value)
+    q.enqueue(201)
+    q.enqueue(202)
+    release.set()
+
+    _wait_for(seen, 6)
+    assert seen == [101, 201, 102, 202, 103, 104]
+    stats = q.wait_stats()
+    assert stats[1].count == 4
+    assert stats[2].count == 2
+    assert stats[2].max_seconds >= 0.0
+
+
+def test_inprocess_queue_flow_rate_limiter_skips_projects_over_ceiling() -> None:
+    q, release, seen = _blocked_queue(
+        "test-fair-ceiling",
+        fairness_key=lambda value: value // 100,
+        flow_rate_limiter=KeyedIntervalRateLimiter(
+            default_max_requests_per_minute=None,
+            overrides={1: 1},
+        ),
+    )
+
+    for value in (101, 102, 103):
+        q.enqueue(value)
+    q.enqueue(201)
+    q.enqueue(202)
+    release.set()
+
+    _wait_for(seen, 3)
+    time.sleep(0.05)
+    # Project 1 gets one slot per minute; project 2 is not held back by it.
+    assert seen == [101, 201, 202]
+    assert q.pending_count == 2
+
+
+def test_inprocess_queue_flow_rate_limiter_requires_fairness_key() -> None:
+    with pytest.raises(ValueError):
+        InProcessWorkerQueue[int](
+            name="test-invalid",
+            handler=lambda value: None,
+            max_requests_per_minute=None,
+            worker_concurrency=1,
+            flow_rate_limiter=KeyedIntervalRateLimiter(default_max_requests_per_minute=1),
+        )
+
+
+def test_inprocess_queue_runs_higher_priority_classes_first() -> None:
+    # Values >= 100 are "merge request" tasks, the rest are "push" tasks.
+    q, release, seen = _blocked_queue("test-priority", priority=lambda value: 10 if value >= 100 else 0)
+
+    q.enqueue(1)
+    q.enqueue(2)
+    q.enqueue(101)
+    q.enqueue(102)
+    release.set()
+
+    _wait_for(seen, 4)
+    assert seen == [101, 102, 1, 2]
+
+
+def test_inprocess_queue_ages_low_priority_tasks() -> None:
+    now = [0.0]
+    q, release, seen = _blocked_queue(
+        "test-priority-aging",
+        priority=lambda value: 10 if value >= 100 else 0,
+        priority_aging_seconds=1.0,
+        clock=lambda: now[0],
+    )
+
+    q.enqueue(1)
+    now[0] += 20.0
+    q.enqueue(101)
+    release.set()
+
+    # The push task has waited 20 aging intervals, which outranks a fresh MR task.
+    _wait_for(seen, 2)
+    assert seen == [1, 101]
+
+
+def test_inprocess_queue_drain_finishes_pending_work_and_closes_intake() -> None:
+    q, release, seen = _blocked_queue("test-drain")
+    q.enqueue(1)
+    q.enqueue(2)
+
+    assert q.drain(timeout_seconds=0.1) is False  # blocker still running
+    with pytest.raises(QueueClosedError):
+        q.enqueue(3)
+
+    release.set()
+    assert q.drain(timeout_seconds=2) is True
+    assert seen == [1, 2]
+    assert q.in_flight_count == 0
+    assert q.stop() is True
+
+
+def test_inprocess_queue_stop_reports_abandoned_work() -> None:
+    q, release, _ = _blocked_queue("test-stop")
+    q.enqueue(1)
+
+    assert q.stop(timeout_seconds=0.05) is False
+    release.set()
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_inprocess_queue_supervisor_restarts_dead_workers() -> None:
+    seen: list[int] = []
+
+    def handler(value: int) -> None:
+        if value == 1:
+            raise SystemExit  # kills the worker thread outright
+        seen.append(value)
+
+    q = InProcessWorkerQueue[int](
+        name="test-supervisor",
+        handler=handler,
+        max_requests_per_minute=None,
+        worker_concurrency=1,
+        autostart=False,
+        supervise_interval_seconds=0.02,
+    )
+    q.enqueue(1)
+    q.enqueue(2)
+    time.sleep(0.05)
+    assert seen == []  # not started yet
+
+    q.start()
+    _wait_for(seen, 1)
+    assert seen == [2]
+
+
+def test_aimd_controller_grows_with_backlog_and_halves_on_throttling() -> None:
+    controller = AimdConcurrencyController(min_workers=1, max_workers=4, cooldown_seconds=0.0)
+
+    controller.on_task_finished(seconds=1.0, failed=False, backlog=True)
+    assert controller.target == 2
+    controller.on_task_finished(seconds=1.0, failed=False, backlog=False)
+    controller.on_task_finished(seconds=1.0, failed=False, backlog=False)
+    assert controller.target == 2  # no backlog, no reason to grow
+    for _ in range(2):
+        controller.on_task_finished(seconds=5.0, failed=False, backlog=True)
+    assert controller.target == 2  # latency degraded beyond the tolerance
+    for _ in range(2):
+        controller.on_task_finished(seconds=1.0, failed=False, backlog=True)
+    assert controller.target == 3
+
+    controller.on_throttled(ThrottleSignal(throttled=True))
+    assert controller.target == 1
+    controller.on_throttled(ThrottleSignal(throttled=False, timed_out=True))
+    assert controller.target == 1  # never below the minimum
+
+
+def test_aimd_controller_shrinks_on_failed_rounds_once_per_cooldown() -> None:
+    controller = AimdConcurrencyController(min_workers=1, max_workers=8, cooldown_seconds=60.0)
+    for _ in range(1 + 2 + 3):
+        controller.on_task_finished(seconds=1.0, failed=False, backlog=True)
+    assert controller.target == 4
+
+    for _ in range(4):
+        controller.on_task_finished(seconds=1.0, failed=True, backlog=True)
+    assert controller.target == 2
+    controller.on_throttled(ThrottleSignal(throttled=True))
+    assert controller.target == 2  # still cooling down from the last decrease
+
+
+def test_inprocess_queue_resizes_workers_from_controller() -> None:
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+    seen: list[int] = []
+
+    def handler(value: int) -> None:
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.01)
+        with lock:
+            running["now"] -= 1
+            seen.append(value)
+
+    controller = AimdConcurrencyController(min_workers=1, max_workers=3, cooldown_seconds=0.0)
+    q = InProcessWorkerQueue[int](
+        name="test-aimd",
+        handler=handler,
+        max_requests_per_minute=None,
+        worker_concurrency=3,
+        concurrency_controller=controller,
+    )
+    assert q.worker_count == 1
+
+    for value in range(40):
+        q.enqueue(value)
+    _wait_for(seen, 40)
+    assert q.worker_count == 3
+    assert running["max"] > 1
+
+    controller.on_throttled(ThrottleSignal(throttled=True))
+    q.enqueue(40)
+    _wait_for(seen, 41)
+    deadline = time.time() + 2
+    while q.worker_count != 1 and time.time() < deadline:
+        time.sleep(0.01)
+    assert q.worker_count == 1
+    assert q.drain(timeout_seconds=2) is True
+
+
+def test_inprocess_queue_does_not_grow_workers_when_handler_reports_failures() -> None:
+    seen: list[int] = []
+
+    def handler(value: int) -> TaskOutcome:
+        time.sleep(0.005)
+        seen.append(value)
+        return TaskOutcome.FAILED
+
+    controller = AimdConcurrencyController(min_workers=1, max_workers=3, cooldown_seconds=0.0)
+    q = InProcessWorkerQueue[int](
+        name="test-aimd-failed",
+        handler=handler,
+        max_requests_per_minute=None,
+        worker_concurrency=3,
+        concurrency_controller=controller,
+    )
+
+    for value in range(20):
+        q.enqueue(value)
+    _wait_for(seen, 20)
+
+    # Same backlog as a healthy run, but every round failed.
+    assert controller.target == 1
+    assert q.drain(timeout_seconds=2) is True
+
+
+def test_inprocess_queue_leaves_cancelled_tasks_out_of_aimd_rounds() -> None:
+    seen: list[int] = []
+
+    def handler(value: int) -> TaskOutcome:
+        seen.append(value)
+        return TaskOutcome.CANCELLED
+
+    controller = AimdConcurrencyController(min_workers=1, max_workers=3, cooldown_seconds=0.0)
+    q = InProcessWorkerQueue[int](
+        name="test-aimd-cancelled",
+        handler=handler,
+        max_requests_per_minute=None,
+        worker_concurrency=3,
+        concurrency_controller=controller,
+    )
+
+    for value in range(20):
+        q.enqueue(value)
+    _wait_for(seen, 20)
+
+    # A backlog of healthy tasks would have grown the pool; superseded ones do not.
+    assert controller.target == 1
+    assert q.drain(timeout_seconds=2) is True
+
+def test_inprocess_queue_reports_only_its_own_throttling_to_its_controller() -> None:
+    controller = AimdConcurrencyController(min_workers=1, max_workers=4, cooldown_seconds=0.0)
+    controller.on_task_finished(seconds=0.01, failed=False, backlog=True)
+    assert controller.target == 2
+    # What bootstrap registers on the shared LLM client for the queue named "test-aimd-own".
+    observer = CallerThrottleObserver(controller, "test-aimd-own")
+    seen: list[int] = []
+
+    def throttled_call(value: int) -> None:
+        observer.on_throttled(ThrottleSignal(throttled=True))
+        seen.append(value)
+
+    queues = {
+        name: InProcessWorkerQueue[int](
+            name=name,
+            handler=throttled_call,
+            max_requests_per_minute=None,
+            worker_concurrency=1,
+        )
+        for name in ("test-aimd-other", "test-aimd-own")
+    }
+
+    queues["test-aimd-other"].enqueue(1)
+    _wait_for(seen, 1)
+    assert controller.target == 2  # another queue was throttled
+
+    queues["test-aimd-own"].enqueue(2)
+    _wait_for(seen, 2)
+    assert controller.target == 1
+    for q in queues.values():
+        assert q.drain(timeout_seconds=2) is True
+
+
+def test_inprocess_queue_rejects_controller_above_worker_concurrency() -> None:
+    with pytest.raises(ValueError):
+        InProcessWorkerQueue[int](
+            name="test-aimd-invalid",
+            handler=lambda _: None,
+            max_requests_per_minute=None,
+            worker_concurrency=2,
+            concurrency_controller=AimdConcurrencyController(min_workers=1, max_workers=4),
+            autostart=False,
+        )
+
+
+def test_inprocess_queue_runs_same_serial_key_in_order_without_blocking_others() -> None:
+    release = threading.Event()
+    seen: list[int] = []
+
+    def handler(value: int) -> None:
+        if value == 10:
+            release.wait(timeout=2)
+        seen.append(value)
+
+    # value // 10 is the key (e.g. one merge request).
+    q = InProcessWorkerQueue[int](
+        name="test-serial",
+        handler=handler,
+        max_requests_per_minute=None,
+        worker_concurrency=2,
+        serial_key=lambda value: value // 10,
+    )
+    for value in (10, 11, 12, 20):
+        q.enqueue(value)
+
+    _wait_for(seen, 1)
+    assert seen == [20]  # key 1 is busy, key 2 still ran on the second worker
+    assert q.pending_count == 2
+
+    release.set()
+    assert q.drain(timeout_seconds=2) is True
+    assert seen == [20, 10, 11, 12]
+
+
+def test_inprocess_queue_counts_parked_serial_tasks_against_capacity() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    seen: list[int] = []
+
+    def handler(value: int) -> None:
+        if value == 10:
+            started.set()
+            release.wait(timeout=2)
+        seen.append(value)
+
+    q = InProcessWorkerQueue[int](
+        name="test-serial-capacity",
+        handler=handler,
+        max_requests_per_minute=None,
+        worker_concurrency=2,
+        serial_key=lambda value: value // 10,
+        max_pending_jobs=2,
+        overflow_policy=OverflowPolicy.DROP_OLDEST,
+    )
+    q.enqueue(10)
+    assert started.wait(timeout=2)
+    q.enqueue(11)
+    q.enqueue(12)
+    time.sleep(0.2)  # let the idle worker pick 11 and 12 and park them
+
+    # 11 and 12 are parked behind 10: the queue is full, and parked tasks are
+    # never dropped to make room.
+    with pytest.raises(QueueFullError):
+        q.enqueue(13)
+
+    release.set()
+    assert q.drain(timeout_seconds=2) is True
+    assert seen == [10, 11, 12]
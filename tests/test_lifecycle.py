@@ -0,0 +1,32 @@
+import os
+import signal
+
+import pytest
+
+from src.app.lifecycle import install_shutdown_handler
+
+
+@pytest.fixture
+def restore_sigusr1():
+    original = signal.getsignal(signal.SIGUSR1)
+    yield
+    signal.signal(signal.SIGUSR1, original)
+
+
+def test_shutdown_handler_runs_once_then_chains_previous_handler(restore_sigusr1) -> None:
+    calls: list[str] = []
+    signal.signal(signal.SIGUSR1, lambda signum, frame: calls.append("previous"))
+
+    assert install_shutdown_handler(lambda: calls.append("shutdown"), signum=signal.SIGUSR1)
+    os.kill(os.getpid(), signal.SIGUSR1)
+    os.kill(os.getpid(), signal.SIGUSR1)
+
+    assert calls == ["shutdown", "previous", "previous"]
+
+
+def test_shutdown_handler_exits_without_previous_handler(restore_sigusr1) -> None:
+    signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+    install_shutdown_handler(lambda: None, signum=signal.SIGUSR1)
+
+    with pytest.raises(SystemExit):
+        os.kill(os.getpid(), signal.SIGUSR1)
@@ -4,6 +4,8 @@ import pytest
 
 from src.infra.clients import llm as llm_client
 from src.infra.clients.llm import LLMClient, LLMClientConfig
+from src.shared.errors import LLMRateLimitedError
+from src.shared.rate_limiter import task_rate_limiter
 
 
 class _DummyResponse:
@@ -101,3 +103,93 @@ def test_create_llm_invalid_provider_raises() -> None:
     cfg = _base_config("unknown-provider")
     with pytest.raises(Exception):
         LLMClient(cfg)
+
+
+class _RateLimitError(Exception):
+    def __init__(self, retry_after: str) -> None:
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after}})()
+
+
+class _ThrottleRecorder:
+    def __init__(self) -> None:
+        self.throttled: list[Any] = []
+        self.succeeded: list[Any] = []
+
+    def on_throttled(self, signal: Any) -> None:
+        self.throttled.append(signal)
+
+    def on_success(self, signal: Any) -> None:
+        self.succeeded.append(signal)
+
+
+def test_generate_review_retries_after_provider_throttling(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[int] = []
+
+    class _ThrottledOnceModel(_DummyChatModel):
+        def invoke(self, messages: list[Any]) -> _DummyResponse:
+            calls.append(1)
+            if len(calls) == 1:
+                raise _RateLimitError("0.01")
+            return _DummyResponse("ok")
+
+    monkeypatch.setattr(llm_client, "ChatOpenAI", _ThrottledOnceModel)
+    client = LLMClient(_base_config("openai"))
+    recorder = _ThrottleRecorder()
+    client.add_throttle_observer(recorder)
+
+    result = client.generate_review_content_with_stats([{"role": "user", "content": "diff"}])
+
+    assert result["content"] == "ok"
+    assert len(calls) == 2
+    assert recorder.throttled[0].retry_after_seconds == 0.01
+    assert len(recorder.succeeded) == 1
+
+
+def test_generate_review_retry_waits_jittered_retry_after_and_queue_slot(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[int] = []
+    delays: list[float] = []
+
+    class _ThrottledOnceModel(_DummyChatModel):
+        def invoke(self, messages: list[Any]) -> _DummyResponse:
+            calls.append(1)
+            if len(calls) == 1:
+                raise _RateLimitError("10")
+            return _DummyResponse("ok")
+
+    class _CountingLimiter:
+        interval_seconds = 0.0
+
+        def __init__(self) -> None:
+            self.acquired = 0
+
+        def acquire(self) -> None:
+            self.acquired += 1
+
+    monkeypatch.setattr(llm_client, "ChatOpenAI", _ThrottledOnceModel)
+    monkeypatch.setattr(llm_client, "sleep", delays.append)
+    limiter = _CountingLimiter()
+
+    with task_rate_limiter(limiter):
+        LLMClient(_base_config("openai")).generate_review_content_with_stats(
+            [{"role": "user", "content": "diff"}]
+        )
+
+    assert len(delays) == 1
+    assert 10.0 <= delays[0] <= 12.0
+    assert limiter.acquired == 1
+
+
+def test_generate_review_gives_up_when_throttling_persists(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _AlwaysThrottledModel(_DummyChatModel):
+        def invoke(self, messages: list[Any]) -> _DummyResponse:
+            raise _RateLimitError("0")
+
+    monkeypatch.setattr(llm_client, "ChatOpenAI", _AlwaysThrottledModel)
+    config = LLMClientConfig(**{**_base_config("openai").__dict__, "rate_limit_retries": 1})
+
+    with pytest.raises(LLMRateLimitedError):
+        LLMClient(config).generate_review_content_with_stats([{"role": "user", "content": "diff"}])
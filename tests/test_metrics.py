@@ -0,0 +1,107 @@
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.app.metrics import start_metrics_server
+from src.infra.queue.inprocess_queue import InProcessWorkerQueue
+from src.shared.metrics import PROMETHEUS_CONTENT_TYPE, MetricsRegistry, REGISTRY
+
+
+def test_registry_renders_prometheus_text_format() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_requests_total", "Requests.", ("result",))
+    histogram = registry.histogram("demo_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+
+    counter.labels("hit").inc()
+    counter.labels("hit").inc(2)
+    histogram.labels("get").observe(0.05)
+    histogram.labels("get").observe(0.5)
+    histogram.labels("get").observe(5.0)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE demo_requests_total counter" in lines
+    assert 'demo_requests_total{result="hit"} 3' in lines
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{op="get",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{op="get",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{op="get",le="+Inf"} 3' in lines
+    assert 'demo_seconds_sum{op="get"} 5.55' in lines
+    assert 'demo_seconds_count{op="get"} 3' in lines
+
+
+def test_counter_sums_updates_from_many_threads() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo.", ("kind",))
+    bound = counter.labels("x")
+
+    def work() -> None:
+        for _ in range(10000):
+            bound.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value("x") == 80000
+
+
+def test_series_keep_values_of_exited_threads() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_short_lived_total", "Demo.", ())
+    histogram = registry.histogram("demo_short_lived_seconds", "Demo.", (), buckets=(1.0,))
+
+    def work() -> None:
+        counter.inc()
+        histogram.labels().observe(0.5)
+
+    # Each thread's cell is folded into the series total once the thread exits.
+    for _ in range(50):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    counter.inc()
+
+    lines = registry.render().splitlines()
+    assert counter.value() == 51
+    assert 'demo_short_lived_seconds_count 50' in lines
+    assert 'demo_short_lived_seconds_sum 25' in lines
+
+
+def test_queue_reports_depth_wait_and_handler_latency() -> None:
+    done = threading.Event()
+    q = InProcessWorkerQueue(
+        name="metrics-demo",
+        handler=lambda task: done.set(),
+        max_requests_per_minute=None,
+        worker_concurrency=1,
+        max_pending_jobs_soft_limit=10,
+    )
+
+    q.enqueue("task")
+    assert done.wait(timeout=3)
+    time.sleep(0.05)
+
+    text = REGISTRY.render()
+    assert 'gitlab_ai_reviewer_queue_pending_tasks{queue="metrics-demo"} 0' in text
+    assert 'gitlab_ai_reviewer_queue_wait_seconds_count{queue="metrics-demo"} 1' in text
+    assert 'gitlab_ai_reviewer_queue_handler_seconds_count{queue="metrics-demo",outcome="success"} 1' in text
+
+
+def test_standalone_metrics_server_serves_registry() -> None:
+    server = start_metrics_server(0, host="127.0.0.1")
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base_url}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == PROMETHEUS_CONTENT_TYPE
+            assert "gitlab_ai_reviewer_queue_wait_seconds" in response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{base_url}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
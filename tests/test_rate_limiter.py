@@ -3,7 +3,23 @@ import time
 
 import pytest
 
-from src.shared.rate_limiter import FixedIntervalRateLimiter
+from src.shared.rate_limiter import (
+    AdaptiveRateLimiter,
+    CompositeRateLimiter,
+    FixedIntervalRateLimiter,
+    KeyedIntervalRateLimiter,
+    SQLiteIntervalRateLimiter,
+    SQLiteKeyedIntervalRateLimiter,
+    SharedRateBudget,
+    TokenBucketRateLimiter,
+)
+from src.shared.throttle import (
+    CallerThrottleObserver,
+    ThrottleSignal,
+    parse_duration_seconds,
+    throttle_caller,
+    throttle_signal_from_headers,
+)
 
 
 def test_fixed_interval_rate_limiter_rejects_non_positive_values() -> None:
@@ -56,3 +72,240 @@ def test_fixed_interval_rate_limiter_enforces_interval_with_multiple_threads() -
 
     for interval in intervals:
         assert interval >= 0.18
+
+
+def test_keyed_interval_rate_limiter_applies_per_key_ceilings_and_overrides() -> None:
+    limiter = KeyedIntervalRateLimiter(default_max_requests_per_minute=60, overrides={"fast": 6000})
+
+    assert limiter.ready_in("slow") == 0.0
+    limiter.reserve("slow")
+    assert limiter.ready_in("slow") > 0.9
+    assert limiter.ready_in("other") == 0.0
+
+    limiter.reserve("fast")
+    assert limiter.ready_in("fast") <= 0.01
+
+
+def test_keyed_interval_rate_limiter_without_default_only_limits_overrides() -> None:
+    limiter = KeyedIntervalRateLimiter(default_max_requests_per_minute=None, overrides={1: 1})
+
+    limiter.reserve(2)
+    limiter.reserve(1)
+    assert limiter.ready_in(2) == 0.0
+    assert limiter.ready_in(1) > 50
+
+
+def test_sqlite_interval_rate_limiter_is_shared_between_instances(tmp_path) -> None:
+    db_path = str(tmp_path / "rate_limit.db")
+    # Two instances stand in for two worker processes using the same budget.
+    limiters = [
+        SQLiteIntervalRateLimiter(db_path=db_path, name="review", max_requests_per_minute=300)
+        for _ in range(2)
+    ]
+
+    timestamps = []
+    for index in range(4):
+        limiters[index % 2].acquire()
+        timestamps.append(time.time())
+
+    intervals = [b - a for a, b in zip(timestamps, timestamps[1:])]
+    for interval in intervals:
+        assert interval >= 0.18
+
+
+def test_sqlite_keyed_interval_rate_limiter_is_shared_between_instances(tmp_path) -> None:
+    db_path = str(tmp_path / "rate_limit.db")
+    first, second = (
+        SQLiteKeyedIntervalRateLimiter(
+            db_path=db_path,
+            name="review-project",
+            default_max_requests_per_minute=1,
+        )
+        for _ in range(2)
+    )
+
+    first.reserve(42)
+    assert second.ready_in(42) > 50
+    assert second.ready_in(7) == 0.0
+
+
+def test_token_bucket_allows_a_burst_then_spaces_requests() -> None:
+    limiter = TokenBucketRateLimiter(max_requests_per_minute=300, burst=3)
+
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_token_bucket_reconciles_estimated_tokens_with_real_usage() -> None:
+    limiter = TokenBucketRateLimiter(max_requests_per_minute=None, max_tokens_per_minute=6000)
+
+    charged = limiter.reserve_tokens(10_000)
+    assert charged == 6000
+    # The call used far less than estimated: the refund is available immediately.
+    limiter.reconcile_tokens(charged, 1000)
+    start = time.monotonic()
+    limiter.reserve_tokens(4000)
+    assert time.monotonic() - start < 0.1
+
+    # Under-estimates put the bucket in debt (1000 left - 1100 extra) which the next call waits out.
+    limiter.reconcile_tokens(100, 1200)
+    start = time.monotonic()
+    limiter.reserve_tokens(5)
+    assert time.monotonic() - start >= 0.9
+
+
+def test_sqlite_interval_rate_limiter_supports_bursts(tmp_path) -> None:
+    limiter = SQLiteIntervalRateLimiter(
+        db_path=str(tmp_path / "rate.db"), name="review", max_requests_per_minute=300, burst=2
+    )
+
+    start = time.monotonic()
+    limiter.acquire()
+    limiter.acquire()
+    assert time.monotonic() - start < 0.1
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_throttle_signal_reads_retry_after_and_ratelimit_headers() -> None:
+    signal = throttle_signal_from_headers(
+        429,
+        {
+            "Retry-After": "7",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "6m0s",
+            "x-ratelimit-remaining-tokens": "1200",
+        },
+    )
+
+    assert signal.throttled
+    assert signal.retry_after_seconds == 7.0
+    assert signal.exhausted_for_seconds == 360.0
+    assert signal.remaining_tokens == 1200
+    assert parse_duration_seconds("250ms") == 0.25
+    assert parse_duration_seconds("soon") is None
+
+
+def test_composite_rate_limiter_waits_for_every_limiter(tmp_path) -> None:
+    local = AdaptiveRateLimiter(max_requests_per_minute=600, burst=2)
+    shared = SQLiteIntervalRateLimiter(db_path=str(tmp_path / "rate.db"), name="review", max_requests_per_minute=300)
+    limiter = CompositeRateLimiter(local, shared)
+    assert limiter.interval_seconds == 0.2
+
+    start = time.monotonic()
+    limiter.acquire()
+    limiter.acquire()
+    # The local burst allows two at once; the shared schedule spaces them anyway.
+    assert time.monotonic() - start >= 0.15
+
+    local.on_throttled(ThrottleSignal(throttled=True, retry_after_seconds=0.3))
+    start = time.monotonic()
+    limiter.acquire()
+    # And the local adaptive back-off still applies on top of the shared schedule.
+    assert time.monotonic() - start >= 0.25
+
+def test_caller_throttle_observer_forwards_only_its_callers_signals() -> None:
+    class Recorder:
+        def __init__(self) -> None:
+            self.signals: list = []
+
+        def on_throttled(self, signal: ThrottleSignal) -> None:
+            self.signals.append(signal)
+
+        def on_success(self, signal: ThrottleSignal) -> None:
+            self.signals.append(signal)
+
+    recorder = Recorder()
+    observer = CallerThrottleObserver(recorder, "review")
+    throttled = ThrottleSignal(throttled=True)
+
+    observer.on_throttled(throttled)
+    with throttle_caller("refactor-suggestion"):
+        observer.on_throttled(throttled)
+    with throttle_caller("review"):
+        observer.on_throttled(throttled)
+        observer.on_success(ThrottleSignal(throttled=False))
+
+    assert [signal.throttled for signal in recorder.signals] == [True, False]
+
+def test_adaptive_rate_limiter_backs_off_and_recovers() -> None:
+    limiter = AdaptiveRateLimiter(max_requests_per_minute=600, burst=5, recovery_fraction=0.25)
+
+    limiter.on_throttled(ThrottleSignal(throttled=True, retry_after_seconds=0.2))
+    assert limiter.current_requests_per_minute == 300
+
+    start = time.monotonic()
+    limiter.acquire()
+    # Paused for Retry-After, and the burst was dropped with the back-off.
+    assert time.monotonic() - start >= 0.15
+
+    for _ in range(3):
+        limiter.on_success(ThrottleSignal(throttled=False))
+    assert limiter.current_requests_per_minute == 600
+
+
+def test_shared_rate_budget_lends_idle_capacity() -> None:
+    budget = SharedRateBudget(max_requests_per_minute=600)
+    review = budget.share("review", min_requests_per_minute=60)
+    budget.share("refactor", min_requests_per_minute=60)
+
+    start = time.monotonic()
+    for _ in range(6):
+        review.acquire()
+    # Alone, review's own share would allow one request per second.
+    assert time.monotonic() - start < 1.5
+
+
+def test_shared_rate_budget_keeps_minimum_share_for_each_queue() -> None:
+    budget = SharedRateBudget(max_requests_per_minute=120)
+    review = budget.share("review", min_requests_per_minute=60)
+    refactor = budget.share("refactor", min_requests_per_minute=60)
+    stop = threading.Event()
+
+    def flood() -> None:
+        while not stop.is_set():
+            review.acquire()
+
+    thread = threading.Thread(target=flood, daemon=True)
+    thread.start()
+    time.sleep(1.2)
+    try:
+        start = time.monotonic()
+        refactor.acquire()
+        assert time.monotonic() - start < 0.2
+    finally:
+        stop.set()
+
+
+def test_shared_rate_budget_validates_shares_and_backs_off() -> None:
+    budget = SharedRateBudget(max_requests_per_minute=10)
+    budget.share("review", min_requests_per_minute=8)
+    with pytest.raises(ValueError):
+        budget.share("refactor", min_requests_per_minute=5)
+    with pytest.raises(ValueError):
+        budget.share("review")
+
+    budget.on_throttled(ThrottleSignal(throttled=True, retry_after_seconds=0.0))
+    assert budget.current_requests_per_minute == 5
+
+
+def test_sqlite_keyed_interval_rate_limiter_reads_many_keys_at_once(tmp_path) -> None:
+    limiter = SQLiteKeyedIntervalRateLimiter(
+        db_path=str(tmp_path / "rate_limit.db"),
+        name="review-project",
+        default_max_requests_per_minute=None,
+        overrides={1: 1, 2: 1},
+    )
+    limiter.reserve(1)
+
+    ready = limiter.ready_in_many([1, 2, 3, None])
+
+    assert ready[1] > 50
+    assert ready[2] == 0.0  # limited, but not reserved yet
+    assert ready[3] == 0.0  # no ceiling
+    assert ready[None] == 0.0
@@ -1,5 +1,7 @@
 from src.domains.review.service import ReviewService
-from src.domains.review.tasks import MergeRequestReviewTask
+from src.domains.review.tasks import MergeRequestReviewTask, PushReviewTask
+from src.shared.cancellation import CancellationToken
+from src.shared.types import TaskOutcome
 
 
 class _FakeGitLabClient:
@@ -26,7 +28,7 @@ class _FakeLLMClient:
         self.model_name = "gpt-5-mini"
         self.called = False
 
-    def generate_review_content_with_stats(self, messages):
+    def generate_review_content_with_stats(self, messages, *, cancel_token=None):
         self.called = True
         if self.should_raise:
             raise RuntimeError("llm-error")
@@ -109,3 +111,77 @@ def test_review_service_writes_cache_on_miss() -> None:
     assert llm.called is True
     assert cache.put_called is True
     assert monitoring.success_calls == 1
+
+
+def test_review_service_abandons_cancelled_merge_request_review() -> None:
+    gitlab = _FakeGitLabClient()
+    llm = _FakeLLMClient()
+    cache = _FakeCacheRepo(cached=None)
+    monitoring = _FakeMonitoring()
+
+    service = ReviewService(
+        gitlab_client=gitlab,
+        llm_client=llm,
+        review_cache_repo=cache,
+        monitoring_client=monitoring,
+        review_system_prompt=None,
+    )
+
+    token = CancellationToken()
+    token.cancel("superseded")
+    outcome = service.run_merge_request_review(
+        MergeRequestReviewTask(project_id=1, merge_request_iid=2, cancel_token=token)
+    )
+
+    assert outcome is TaskOutcome.CANCELLED
+    assert llm.called is False
+    assert gitlab.posted_body is None
+    assert monitoring.error_calls == 0
+
+
+def test_review_service_reviews_push_range_with_compare_diff() -> None:
+    class _CompareGitLabClient(_FakeGitLabClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.compared: tuple[str, str] | None = None
+
+        def get_compare_diff(self, *, project_id: int, from_ref: str, to_ref: str):
+            self.compared = (from_ref, to_ref)
+            return [{"new_path": "b.py", "diff": "+print(2)"}]
+
+        def get_commit_diff(self, *, project_id: int, commit_id: str):
+            raise AssertionError("head-only diff should not be fetched")
+
+    gitlab = _CompareGitLabClient()
+    service = ReviewService(
+        gitlab_client=gitlab,
+        llm_client=_FakeLLMClient(),
+        review_cache_repo=_FakeCacheRepo(cached=None),
+        monitoring_client=_FakeMonitoring(),
+        review_system_prompt=None,
+    )
+
+    service.run_push_review(PushReviewTask(project_id=1, commit_id="head", base_ref="base"))
+
+    assert gitlab.compared == ("base", "head")
+    assert "review-result" in str(gitlab.posted_body)
+
+
+def test_review_service_reports_failed_review_to_the_queue() -> None:
+    gitlab = _FakeGitLabClient()
+    monitoring = _FakeMonitoring()
+
+    service = ReviewService(
+        gitlab_client=gitlab,
+        llm_client=_FakeLLMClient(should_raise=True),
+        review_cache_repo=_FakeCacheRepo(cached=None),
+        monitoring_client=monitoring,
+        review_system_prompt=None,
+    )
+
+    outcome = service.run_task(MergeRequestReviewTask(project_id=1, merge_request_iid=2))
+
+    # The error comment is posted, but the queue still sees a failed task.
+    assert outcome is TaskOutcome.FAILED
+    assert monitoring.error_calls == 1
+    assert "llm-error" in str(gitlab.posted_body)
@@ -0,0 +1,313 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from src.domains.review.tasks import MergeRequestReviewTask, PushReviewTask, review_task_coalesce_key
+from src.infra.queue.codec import DataclassTaskCodec
+from src.infra.queue.inprocess_queue import EnqueueOutcome
+from src.infra.queue.sqlite_queue import SQLiteWorkerQueue, _process_start_time
+from src.shared.cancellation import CancellationToken
+from src.shared.errors import QueueClosedError, QueueFullError
+from src.shared.rate_limiter import KeyedIntervalRateLimiter
+
+
+_CODEC = DataclassTaskCodec(MergeRequestReviewTask, PushReviewTask)
+
+
+def _queue(db_path: str, handler, **kwargs) -> SQLiteWorkerQueue:
+    kwargs.setdefault("max_requests_per_minute", None)
+    kwargs.setdefault("worker_concurrency", 1)
+    return SQLiteWorkerQueue(
+        name="review",
+        handler=handler,
+        db_path=db_path,
+        codec=_CODEC,
+        poll_interval_seconds=0.05,
+        **kwargs,
+    )
+
+
+def _wait_for(seen: list, count: int) -> None:
+    deadline = time.time() + 3
+    while len(seen) < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_codec_round_trips_tasks_and_drops_transient_fields() -> None:
+    task = MergeRequestReviewTask(project_id=1, merge_request_iid=2, cancel_token=CancellationToken())
+
+    decoded = _CODEC.decode(_CODEC.encode(task))
+
+    assert decoded == task
+    assert decoded.cancel_token is None
+    assert _CODEC.has_transient_state(task)
+    assert _CODEC.decode(_CODEC.encode(PushReviewTask(1, "abc", base_ref="def"))).base_ref == "def"
+
+
+def test_sqlite_queue_processes_tasks(tmp_path) -> None:
+    seen: list = []
+    q = _queue(str(tmp_path / "queue.db"), seen.append)
+
+    assert q.enqueue(PushReviewTask(project_id=1, commit_id="a")) is EnqueueOutcome.ACCEPTED
+    q.enqueue(PushReviewTask(project_id=1, commit_id="b"))
+
+    _wait_for(seen, 2)
+    assert [task.commit_id for task in seen] == ["a", "b"]
+    assert q.pending_count == 0
+
+
+def test_sqlite_queue_coalesces_and_enforces_capacity(tmp_path) -> None:
+    release = threading.Event()
+    started = threading.Event()
+    seen: list = []
+
+    def handler(task) -> None:
+        if isinstance(task, PushReviewTask) and task.commit_id == "blocker":
+            started.set()
+            release.wait(timeout=3)
+            return
+        seen.append(task)
+
+    q = _queue(
+        str(tmp_path / "queue.db"),
+        handler,
+        coalesce_key=review_task_coalesce_key,
+        max_pending_jobs=2,
+    )
+    q.enqueue(PushReviewTask(project_id=1, commit_id="blocker"))
+    assert started.wait(timeout=3)
+
+    token = CancellationToken()
+    q.enqueue(MergeRequestReviewTask(project_id=1, merge_request_iid=7))
+    assert (
+        q.enqueue(MergeRequestReviewTask(project_id=1, merge_request_iid=7, summary_only=True, cancel_token=token))
+        is EnqueueOutcome.COALESCED
+    )
+    q.enqueue(PushReviewTask(project_id=1, commit_id="c"))
+    with pytest.raises(QueueFullError):
+        q.enqueue(PushReviewTask(project_id=1, commit_id="d"))
+    assert q.superseded_count == 1
+    assert q.rejected_count == 1
+    release.set()
+
+    _wait_for(seen, 2)
+    assert seen[0] == MergeRequestReviewTask(project_id=1, merge_request_iid=7, summary_only=True)
+    # Tasks enqueued by this process keep their in-memory cancellation token.
+    assert seen[0].cancel_token is token
+    assert seen[1].commit_id == "c"
+
+
+def test_sqlite_queue_recovers_in_flight_tasks_on_restart(tmp_path) -> None:
+    db_path = str(tmp_path / "queue.db")
+    started = threading.Event()
+    never = threading.Event()
+
+    def stuck_handler(task) -> None:
+        started.set()
+        never.wait(timeout=5)
+
+    crashed = _queue(db_path, stuck_handler)
+    crashed.enqueue(PushReviewTask(project_id=1, commit_id="in-flight"))
+    crashed.enqueue(PushReviewTask(project_id=1, commit_id="pending"))
+    assert started.wait(timeout=3)
+
+    seen: list = []
+    _queue(db_path, seen.append)
+
+    _wait_for(seen, 2)
+    never.set()
+    assert sorted(task.commit_id for task in seen) == ["in-flight", "pending"]
+
+
+def test_sqlite_queue_leaves_tasks_of_live_processes_alone(tmp_path) -> None:
+    db_path = str(tmp_path / "queue.db")
+    seen: list = []
+    _queue(db_path, seen.append).enqueue(PushReviewTask(project_id=1, commit_id="warmup"))
+    _wait_for(seen, 1)
+
+    finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    dead_pid = int(finished.stdout.strip())
+    conn = sqlite3.connect(db_path)
+    for commit_id, owner in (("live", f"{os.getppid()}:x"), ("orphan", f"{dead_pid}:y")):
+        conn.execute(
+            """
+            INSERT INTO queue_task (queue, payload, state, enqueued_at, lease_until, attempts, owner)
+            VALUES ('review', ?, 'running', ?, ?, 1, ?)
+            """,
+            (_CODEC.encode(PushReviewTask(project_id=1, commit_id=commit_id)), time.time(), time.time() + 600, owner),
+        )
+    conn.commit()
+    conn.close()
+
+    # The first queue keeps polling too, so either instance may pick the orphan up.
+    _queue(db_path, seen.append)
+
+    _wait_for(seen, 2)
+    time.sleep(0.1)
+    assert [task.commit_id for task in seen] == ["warmup", "orphan"]
+
+
+
+def test_sqlite_queue_recovers_tasks_of_reused_pids(tmp_path) -> None:
+    parent_started = _process_start_time(os.getppid())
+    if not parent_started:
+        pytest.skip("process start times need /proc")
+    db_path = str(tmp_path / "queue.db")
+    seen: list = []
+    _queue(db_path, seen.append).enqueue(PushReviewTask(project_id=1, commit_id="warmup"))
+    _wait_for(seen, 1)
+
+    # A live pid, but not the process that claimed the task (it started at another time).
+    owner = f"{os.getppid()}:{int(parent_started) + 1}:x"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        INSERT INTO queue_task (queue, payload, state, enqueued_at, lease_until, attempts, owner)
+        VALUES ('review', ?, 'running', ?, ?, 1, ?)
+        """,
+        (_CODEC.encode(PushReviewTask(project_id=1, commit_id="reused")), time.time(), time.time() + 600, owner),
+    )
+    conn.commit()
+    conn.close()
+
+    _queue(db_path, seen.append)
+
+    _wait_for(seen, 2)
+    assert [task.commit_id for task in seen] == ["warmup", "reused"]
+
+def test_sqlite_queue_stop_hands_unfinished_tasks_back(tmp_path) -> None:
+    db_path = str(tmp_path / "queue.db")
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_handler(task) -> None:
+        started.set()
+        release.wait(timeout=3)
+
+    q = _queue(db_path, slow_handler)
+    q.enqueue(PushReviewTask(project_id=1, commit_id="slow"))
+    assert started.wait(timeout=3)
+
+    assert q.stop(timeout_seconds=0.05) is False
+    with pytest.raises(QueueClosedError):
+        q.enqueue(PushReviewTask(project_id=1, commit_id="late"))
+    assert q.pending_count == 1
+    release.set()
+
+
+def test_sqlite_queue_takes_rate_slot_only_for_claimed_tasks(tmp_path) -> None:
+    class CountingLimiter:
+        def __init__(self) -> None:
+            self.acquired = 0
+
+        def acquire(self) -> None:
+            self.acquired += 1
+
+    limiter = CountingLimiter()
+    seen: list = []
+    q = _queue(
+        str(tmp_path / "queue.db"),
+        seen.append,
+        fairness_key=lambda task: task.project_id,
+        flow_rate_limiter=KeyedIntervalRateLimiter(default_max_requests_per_minute=1),
+        rate_limiter=limiter,
+    )
+
+    q.enqueue(PushReviewTask(project_id=1, commit_id="a"))
+    q.enqueue(PushReviewTask(project_id=1, commit_id="b"))
+    _wait_for(seen, 1)
+    time.sleep(0.3)
+
+    # "b" is pending but its project is over its ceiling, so no slot is spent on it.
+    assert [task.commit_id for task in seen] == ["a"]
+    assert limiter.acquired == 1
+    q.stop()
+
+
+def test_sqlite_queue_renews_lease_of_running_tasks(tmp_path) -> None:
+    db_path = str(tmp_path / "queue.db")
+    seen: list = []
+
+    def slow_handler(task) -> None:
+        seen.append(task)
+        time.sleep(0.6)
+
+    q = _queue(db_path, slow_handler, worker_concurrency=2, visibility_timeout_seconds=0.2)
+    q.enqueue(PushReviewTask(project_id=1, commit_id="slow"))
+    time.sleep(0.9)
+
+    # The handler outlived its first lease, but the idle worker never took it over.
+    assert [task.commit_id for task in seen] == ["slow"]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM queue_task").fetchone()[0] == 0
+    q.stop()
+
+
+def test_sqlite_queue_coalesces_into_claimed_task_waiting_for_rate_slot(tmp_path) -> None:
+    class GateLimiter:
+        interval_seconds = 0.0
+
+        def __init__(self) -> None:
+            self.waiting = threading.Event()
+            self.open = threading.Event()
+
+        def acquire(self) -> None:
+            self.waiting.set()
+            self.open.wait(timeout=3)
+
+    limiter = GateLimiter()
+    seen: list = []
+    q = _queue(
+        str(tmp_path / "queue.db"),
+        seen.append,
+        coalesce_key=review_task_coalesce_key,
+        rate_limiter=limiter,
+    )
+
+    q.enqueue(MergeRequestReviewTask(project_id=1, merge_request_iid=7))
+    assert limiter.waiting.wait(timeout=3)
+    # The worker has claimed the first task but is still waiting for its slot.
+    newer = MergeRequestReviewTask(project_id=1, merge_request_iid=7, summary_only=True)
+    assert q.enqueue(newer) is EnqueueOutcome.COALESCED
+    limiter.open.set()
+
+    _wait_for(seen, 1)
+    time.sleep(0.1)
+    assert seen == [newer]
+    assert q.pending_count == 0
+    q.stop()
+
+
+def test_sqlite_queue_runs_same_serial_key_in_order(tmp_path) -> None:
+    release = threading.Event()
+    seen: list = []
+
+    def handler(task) -> None:
+        seen.append(task.commit_id)
+        if task.commit_id == "a1":
+            release.wait(timeout=3)
+
+    q = _queue(
+        str(tmp_path / "queue.db"),
+        handler,
+        worker_concurrency=2,
+        serial_key=lambda task: task.project_id,
+    )
+    q.enqueue(PushReviewTask(project_id=1, commit_id="a1"))
+    q.enqueue(PushReviewTask(project_id=1, commit_id="a2"))
+    q.enqueue(PushReviewTask(project_id=2, commit_id="b"))
+
+    _wait_for(seen, 2)
+    time.sleep(0.2)
+    # The idle worker skips "a2" while "a1" of the same key runs.
+    assert sorted(seen) == ["a1", "b"]
+    release.set()
+
+    _wait_for(seen, 3)
+    assert seen[2] == "a2"
+    q.stop()
@@ -0,0 +1,50 @@
+import threading
+
+from src.infra.queue.inprocess_queue import InProcessWorkerQueue
+from src.infra.queue.metrics import TASK_STAGE_SECONDS
+from src.shared.timing import current_timings, span, task_timings
+
+
+def test_span_is_a_no_op_outside_a_task() -> None:
+    with span("anything"):
+        pass
+
+    assert current_timings() is None
+
+
+def test_spans_accumulate_per_stage() -> None:
+    with task_timings() as timings:
+        with span("gitlab"):
+            pass
+        with span("gitlab"):
+            pass
+        with span("llm"):
+            pass
+
+    assert set(timings.as_dict()) == {"gitlab", "llm"}
+    assert "total=" in timings.summary()
+    assert current_timings() is None
+
+
+def test_queue_records_a_breakdown_per_task() -> None:
+    breakdowns: list = []
+    done = threading.Event()
+
+    def handler(task) -> None:
+        with span("llm"):
+            pass
+        breakdowns.append(dict(current_timings().as_dict()))
+        done.set()
+
+    q = InProcessWorkerQueue(
+        name="timing-demo",
+        handler=handler,
+        max_requests_per_minute=600,
+        worker_concurrency=1,
+    )
+    q.enqueue("task")
+
+    assert done.wait(timeout=3)
+    assert set(breakdowns[0]) == {"rate_limiter_wait", "queue_wait", "llm"}
+    q.drain(timeout_seconds=1)
+    assert TASK_STAGE_SECONDS.count("timing-demo", "llm") == 1
@@ -0,0 +1,67 @@
+from src.infra.repositories.webhook_event_repo import WebhookEventRepository
+
+
+def test_claim_returns_previous_answer_for_duplicates() -> None:
+    repo = WebhookEventRepository(ttl_seconds=60, max_entries=10)
+
+    assert repo.claim("evt-1") is None
+    assert repo.claim("evt-1") is not None  # in-flight duplicate
+    repo.complete("evt-1", ("OK", 200))
+
+    assert repo.claim("evt-1") == ("OK", 200)
+    assert repo.claim("evt-2") is None
+
+
+def test_server_errors_are_not_remembered() -> None:
+    repo = WebhookEventRepository(ttl_seconds=60, max_entries=10)
+
+    assert repo.claim("evt-1") is None
+    repo.complete("evt-1", ("Queue full", 503))
+
+    assert repo.claim("evt-1") is None
+
+
+def test_max_entries_evicts_oldest() -> None:
+    repo = WebhookEventRepository(ttl_seconds=60, max_entries=2)
+
+    for event_id in ("a", "b", "c"):
+        assert repo.claim(event_id) is None
+        repo.complete(event_id, ("OK", 200))
+
+    assert repo.claim("a") is None
+    assert repo.claim("c") == ("OK", 200)
+
+
+def test_persisted_answers_survive_restart(tmp_path) -> None:
+    db_path = str(tmp_path / "webhook_events.db")
+    repo = WebhookEventRepository(ttl_seconds=60, max_entries=10, db_path=db_path)
+    assert repo.claim("evt-1") is None
+    repo.complete("evt-1", ("OK", 200))
+
+    restarted = WebhookEventRepository(ttl_seconds=60, max_entries=10, db_path=db_path)
+    assert restarted.claim("evt-1") == ("OK", 200)
+
+
+def test_answers_keep_their_headers(tmp_path) -> None:
+    db_path = str(tmp_path / "webhook_events.db")
+    repo = WebhookEventRepository(ttl_seconds=60, max_entries=10, db_path=db_path)
+    response = ("Queued", 202, {"X-Review-Admission": "degraded"})
+    assert repo.claim("evt-1") is None
+    repo.complete("evt-1", response)
+
+    assert repo.claim("evt-1") == response
+    restarted = WebhookEventRepository(ttl_seconds=60, max_entries=10, db_path=db_path)
+    assert restarted.claim("evt-1") == response
+
+
+def test_max_entries_keeps_in_flight_deliveries() -> None:
+    repo = WebhookEventRepository(ttl_seconds=60, max_entries=2)
+
+    assert repo.claim("slow") is None
+    for event_id in ("a", "b", "c"):
+        assert repo.claim(event_id) is None
+        repo.complete(event_id, ("OK", 200))
+
+    # Answered entries were evicted instead; the slow delivery is still claimed.
+    assert repo.claim("slow") is not None
+    assert repo.claim("a") is None
@@ -0,0 +1,248 @@
+import pytest
+
+from src.app.config import AppSettings
+from src.app.orchestrator import ADMISSION_HEADER, NULL_COMMIT_SHA, WebhookOrchestrator
+from src.domains.progress_comment.service import ProgressCommentService
+from src.domains.progress_comment.tasks import MergeRequestProgressCommentTask
+from src.domains.review.tasks import MergeRequestReviewTask, PushReviewTask
+from src.infra.queue.inprocess_queue import EnqueueOutcome
+from src.shared.errors import QueueClosedError, QueueFullError
+
+
+_MIN_ENV = {
+    "GITLAB_ACCESS_TOKEN": "token",
+    "GITLAB_URL": "https://gitlab.example.com",
+    "GITLAB_WEBHOOK_SECRET_TOKEN": "secret",
+    "LLM_PROVIDER": "openai",
+    "OPENAI_API_KEY": "openai-key",
+    "ENABLE_REFACTOR_SUGGESTION_REVIEW": "false",
+}
+
+
+class _FakeGitLabClient:
+    def __init__(self) -> None:
+        self.mr_comments: list[str] = []
+
+    def post_merge_request_comment(self, *, project_id: int, merge_request_iid: int, body: str):
+        self.mr_comments.append(body)
+
+    def post_commit_comment(self, *, project_id: int, commit_id: str, note: str):
+        pass
+
+
+class _FakeQueue:
+    def __init__(self) -> None:
+        self.tasks: list[object] = []
+
+    def enqueue(self, task) -> EnqueueOutcome:
+        self.tasks.append(task)
+        return EnqueueOutcome.ACCEPTED
+
+
+def _settings(monkeypatch: pytest.MonkeyPatch) -> AppSettings:
+    for key, value in _MIN_ENV.items():
+        monkeypatch.setenv(key, value)
+    return AppSettings.from_env()
+
+
+def _mr_payload() -> dict:
+    return {
+        "object_kind": "merge_request",
+        "project": {"id": 1},
+        "object_attributes": {"action": "update", "iid": 2},
+    }
+
+
+def test_orchestrator_posts_progress_inline_without_ack_queue(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    gitlab = _FakeGitLabClient()
+    review_queue = _FakeQueue()
+    orchestrator = WebhookOrchestrator(
+        settings=_settings(monkeypatch),
+        progress_comment_service=ProgressCommentService(gitlab_client=gitlab),
+        progress_comment_queue=None,
+        review_queue=review_queue,
+        refactor_suggestion_queue=None,
+        refactor_suggestion_state_repo=None,
+    )
+
+    assert orchestrator.handle_merge_request_event(_mr_payload())[:2] == ("OK", 200)
+    assert len(gitlab.mr_comments) == 1
+    assert review_queue.tasks == [MergeRequestReviewTask(project_id=1, merge_request_iid=2)]
+
+
+def test_orchestrator_defers_progress_comment_to_ack_queue(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    gitlab = _FakeGitLabClient()
+    progress_queue = _FakeQueue()
+    review_queue = _FakeQueue()
+    orchestrator = WebhookOrchestrator(
+        settings=_settings(monkeypatch),
+        progress_comment_service=ProgressCommentService(gitlab_client=gitlab),
+        progress_comment_queue=progress_queue,
+        review_queue=review_queue,
+        refactor_suggestion_queue=None,
+        refactor_suggestion_state_repo=None,
+    )
+
+    orchestrator.handle_merge_request_event(_mr_payload())
+
+    assert gitlab.mr_comments == []
+    assert len(progress_queue.tasks) == 1
+    assert isinstance(progress_queue.tasks[0], MergeRequestProgressCommentTask)
+    assert len(review_queue.tasks) == 1
+
+
+def _orchestrator_with_review_queue(
+    monkeypatch: pytest.MonkeyPatch,
+) -> tuple[WebhookOrchestrator, _FakeQueue]:
+    review_queue = _FakeQueue()
+    orchestrator = WebhookOrchestrator(
+        settings=_settings(monkeypatch),
+        progress_comment_service=ProgressCommentService(gitlab_client=_FakeGitLabClient()),
+        progress_comment_queue=_FakeQueue(),
+        review_queue=review_queue,
+        refactor_suggestion_queue=None,
+        refactor_suggestion_state_repo=None,
+    )
+    return orchestrator, review_queue
+
+
+def test_orchestrator_reviews_only_the_pushed_head_by_default(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    orchestrator, review_queue = _orchestrator_with_review_queue(monkeypatch)
+
+    orchestrator.handle_push_event(
+        {"project_id": 1, "ref": "refs/heads/feature", "before": "a" * 40, "after": "b" * 40}
+    )
+
+    assert review_queue.tasks == [PushReviewTask(project_id=1, commit_id="b" * 40)]
+
+
+def test_orchestrator_reviews_push_range_from_before_sha(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("PUSH_REVIEW_RANGE", "true")
+    orchestrator, review_queue = _orchestrator_with_review_queue(monkeypatch)
+
+    orchestrator.handle_push_event(
+        {"project_id": 1, "ref": "refs/heads/feature", "before": "a" * 40, "after": "b" * 40}
+    )
+
+    assert review_queue.tasks == [
+        PushReviewTask(project_id=1, commit_id="b" * 40, base_ref="a" * 40)
+    ]
+
+
+def test_orchestrator_compares_new_branch_against_default_branch(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("PUSH_REVIEW_RANGE", "true")
+    orchestrator, review_queue = _orchestrator_with_review_queue(monkeypatch)
+
+    orchestrator.handle_push_event(
+        {
+            "project_id": 1,
+            "ref": "refs/heads/feature",
+            "before": NULL_COMMIT_SHA,
+            "after": "b" * 40,
+            "project": {"default_branch": "main"},
+        }
+    )
+
+    assert review_queue.tasks == [PushReviewTask(project_id=1, commit_id="b" * 40, base_ref="main")]
+
+
+def test_orchestrator_ignores_branch_deletion_push(monkeypatch: pytest.MonkeyPatch) -> None:
+    orchestrator, review_queue = _orchestrator_with_review_queue(monkeypatch)
+
+    body, status = orchestrator.handle_push_event(
+        {"project_id": 1, "ref": "refs/heads/feature", "before": "a" * 40, "after": NULL_COMMIT_SHA}
+    )
+
+    assert status == 200
+    assert review_queue.tasks == []
+
+
+def test_orchestrator_rejects_when_review_queue_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _FullQueue(_FakeQueue):
+        def enqueue(self, task) -> EnqueueOutcome:
+            raise QueueFullError("full", retry_after_seconds=42)
+
+    gitlab = _FakeGitLabClient()
+    progress_queue = _FakeQueue()
+    orchestrator = WebhookOrchestrator(
+        settings=_settings(monkeypatch),
+        progress_comment_service=ProgressCommentService(gitlab_client=gitlab),
+        progress_comment_queue=progress_queue,
+        review_queue=_FullQueue(),
+        refactor_suggestion_queue=None,
+        refactor_suggestion_state_repo=None,
+    )
+
+    body, status, headers = orchestrator.handle_merge_request_event(_mr_payload())
+
+    assert status == 503
+    assert headers["Retry-After"] == "42"
+    assert headers[ADMISSION_HEADER] == "rejected"
+    assert progress_queue.tasks == []
+
+
+def test_orchestrator_keeps_running_review_when_new_event_is_rejected(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class _FillingQueue(_FakeQueue):
+        full = False
+
+        def enqueue(self, task) -> EnqueueOutcome:
+            if self.full:
+                raise QueueFullError("full", retry_after_seconds=1)
+            return super().enqueue(task)
+
+    monkeypatch.setenv("REVIEW_CANCEL_SUPERSEDED", "true")
+    review_queue = _FillingQueue()
+    orchestrator = WebhookOrchestrator(
+        settings=_settings(monkeypatch),
+        progress_comment_service=ProgressCommentService(gitlab_client=_FakeGitLabClient()),
+        progress_comment_queue=_FakeQueue(),
+        review_queue=review_queue,
+        refactor_suggestion_queue=None,
+        refactor_suggestion_state_repo=None,
+    )
+
+    orchestrator.handle_merge_request_event(_mr_payload())
+    running = review_queue.tasks[0].cancel_token
+    review_queue.full = True
+    orchestrator.handle_merge_request_event(_mr_payload())
+    assert not running.is_cancelled
+
+    review_queue.full = False
+    orchestrator.handle_merge_request_event(_mr_payload())
+    assert running.is_cancelled
+
+
+def test_orchestrator_logs_debounced_push_rejected_on_release(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    class _ClosedQueue(_FakeQueue):
+        def enqueue(self, task) -> EnqueueOutcome:
+            raise QueueClosedError("closing", retry_after_seconds=1)
+
+    monkeypatch.setenv("PUSH_REVIEW_DEBOUNCE_SECONDS", "60")
+    orchestrator = WebhookOrchestrator(
+        settings=_settings(monkeypatch),
+        progress_comment_service=ProgressCommentService(gitlab_client=_FakeGitLabClient()),
+        progress_comment_queue=_FakeQueue(),
+        review_queue=_ClosedQueue(),
+        refactor_suggestion_queue=None,
+        refactor_suggestion_state_repo=None,
+    )
+    orchestrator.handle_push_event(
+        {"project_id": 1, "after": "a" * 40, "before": NULL_COMMIT_SHA, "ref": "refs/heads/main"}
+    )
+
+    assert orchestrator.flush_debounced_pushes() == 1
+    assert "Dropped debounced push review" in caplog.text
@@ -2,6 +2,8 @@ from flask import Flask
 
 from src.app.config import AppSettings
 from src.app.webhook import register_webhook_routes
+from src.infra.repositories.webhook_event_repo import WebhookEventRepository
+from src.shared.types import OverflowPolicy
 
 
 class _DummyOrchestrator:
@@ -25,15 +27,51 @@ def _settings() -> AppSettings:
         gitlab_url="https://gitlab.example.com",
         gitlab_webhook_secret_token="secret",
         gitlab_request_timeout_seconds=10.0,
+        gitlab_http_pool_size=10,
+        gitlab_max_retries=3,
+        gitlab_retry_backoff_seconds=0.5,
+        gitlab_response_cache_mb=32,
         enable_merge_request_review=True,
         enable_push_review=True,
         enable_refactor_suggestion_review=True,
+        webhook_async_ack=False,
+        webhook_ack_worker_concurrency=2,
+        webhook_dedup_enabled=True,
+        webhook_dedup_ttl_seconds=3600.0,
+        webhook_dedup_max_entries=10000,
+        webhook_dedup_db_path=None,
+        queue_backend="memory",
+        queue_db_path="data/queue.db",
+        queue_visibility_timeout_seconds=900.0,
+        rate_limit_db_path=None,
+        rate_limit_burst=1,
+        queue_consumers="inprocess",
+        worker_shards=1,
+        shutdown_drain_timeout_seconds=25.0,
+        metrics_enabled=True,
+        worker_metrics_port=None,
         review_max_requests_per_minute=2,
         review_worker_concurrency=1,
+        review_worker_concurrency_min=None,
+        review_serialize_per_key=True,
         review_max_pending_jobs=100,
+        review_coalesce_merge_requests=True,
+        review_queue_capacity=1000,
+        review_queue_overflow_policy=OverflowPolicy.REJECT,
+        review_queue_reject_status_code=503,
+        review_cancel_superseded=True,
+        review_fair_scheduling=True,
+        review_merge_request_priority=10,
+        review_push_priority=0,
+        review_priority_aging_seconds=120.0,
+        review_project_max_requests_per_minute=None,
+        review_project_max_requests_per_minute_overrides={},
+        push_review_range=True,
+        push_review_debounce_seconds=0.0,
         refactor_suggestion_max_requests_per_minute=1,
         refactor_suggestion_worker_concurrency=1,
         refactor_suggestion_max_pending_jobs=50,
+        refactor_suggestion_queue_capacity=500,
         refactor_suggestion_max_files=20,
         refactor_suggestion_max_file_chars=12000,
         refactor_suggestion_max_total_chars=60000,
@@ -41,6 +79,10 @@ def _settings() -> AppSettings:
         llm_model="gpt-5-mini",
         llm_timeout_seconds=300.0,
         llm_max_retries=0,
+        llm_max_tokens_per_minute=None,
+        llm_rate_limit_retries=3,
+        llm_adaptive_rate_limit=True,
+        llm_max_requests_per_minute=None,
         openai_api_key="key",
         google_api_key=None,
         ollama_base_url="http://localhost:11434",
@@ -88,3 +130,94 @@ def test_webhook_routes_push() -> None:
     )
     assert resp.status_code == 200
     assert orchestrator.push_called is True
+
+
+def test_webhook_answers_duplicate_delivery_without_orchestrator() -> None:
+    app = Flask(__name__)
+    orchestrator = _DummyOrchestrator()
+    register_webhook_routes(
+        app,
+        settings=_settings(),
+        orchestrator=orchestrator,
+        event_repo=WebhookEventRepository(ttl_seconds=60, max_entries=10),
+    )
+    client = app.test_client()
+    headers = {"X-Gitlab-Token": "secret", "X-Gitlab-Event-UUID": "evt-1"}
+
+    first = client.post("/webhook", headers=headers, json={"object_kind": "push"})
+    orchestrator.push_called = False
+    second = client.post("/webhook", headers=headers, json={"object_kind": "push"})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.get_data(as_text=True) == "PUSH"
+    assert orchestrator.push_called is False
+
+
+def test_webhook_dedups_on_idempotency_key_before_event_uuid() -> None:
+    app = Flask(__name__)
+    orchestrator = _DummyOrchestrator()
+    register_webhook_routes(
+        app,
+        settings=_settings(),
+        orchestrator=orchestrator,
+        event_repo=WebhookEventRepository(ttl_seconds=60, max_entries=10),
+    )
+    client = app.test_client()
+
+    client.post(
+        "/webhook",
+        headers={"X-Gitlab-Token": "secret", "Idempotency-Key": "key-1", "X-Gitlab-Event-UUID": "evt-1"},
+        json={"object_kind": "push"},
+    )
+    orchestrator.push_called = False
+    # A retry of the same delivery keeps its Idempotency-Key.
+    client.post(
+        "/webhook",
+        headers={"X-Gitlab-Token": "secret", "Idempotency-Key": "key-1", "X-Gitlab-Event-UUID": "evt-2"},
+        json={"object_kind": "push"},
+    )
+
+    assert orchestrator.push_called is False
+
+
+def test_webhook_acknowledges_ignored_hooks_without_parsing_body() -> None:
+    client, orchestrator = _client()
+    resp = client.post(
+        "/webhook",
+        headers={"X-Gitlab-Token": "secret", "X-Gitlab-Event": "Pipeline Hook"},
+        data=b"{not json",
+    )
+    assert resp.status_code == 200
+    assert orchestrator.push_called is False
+    assert orchestrator.merge_called is False
+
+
+def test_webhook_routes_push_by_header_with_slim_payload() -> None:
+    received = {}
+
+    class _RecordingOrchestrator(_DummyOrchestrator):
+        def handle_push_event(self, payload):
+            received.update(payload)
+            return super().handle_push_event(payload)
+
+    app = Flask(__name__)
+    orchestrator = _RecordingOrchestrator()
+    register_webhook_routes(app, settings=_settings(), orchestrator=orchestrator)
+    resp = app.test_client().post(
+        "/webhook",
+        headers={"X-Gitlab-Token": "secret", "X-Gitlab-Event": "Push Hook"},
+        json={
+            "object_kind": "push",
+            "project_id": 1,
+            "before": "a",
+            "after": "b",
+            "ref": "refs/heads/main",
+            "commits": [{"id": "b", "message": "x" * 1000}],
+        },
+    )
+
+    assert resp.status_code == 200
+    assert orchestrator.push_called is True
+    assert received["after"] == "b"
+    assert "commits" not in received
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from src.app.worker import supervise_shards
+from src.domains.review.tasks import PushReviewTask, review_task_project_key
+from src.infra.queue.codec import DataclassTaskCodec
+from src.infra.queue.sharding import BUCKET_COUNT, ConsistentHashRing, ShardAssignment, shard_bucket
+from src.infra.queue.sqlite_queue import SQLiteWorkerQueue
+
+
+def test_shard_assignments_partition_buckets() -> None:
+    shards = [ShardAssignment(index=index, count=3) for index in range(3)]
+
+    owned = [bucket for shard in shards for bucket in shard.buckets]
+
+    assert sorted(owned) == list(range(BUCKET_COUNT))
+    assert all(shard.buckets for shard in shards)
+
+
+def test_consistent_hash_ring_moves_few_buckets_when_growing() -> None:
+    before, after = ConsistentHashRing(3), ConsistentHashRing(4)
+
+    moved = sum(
+        1 for bucket in range(BUCKET_COUNT) if before.shard_for_bucket(bucket) != after.shard_for_bucket(bucket)
+    )
+
+    assert moved < BUCKET_COUNT * 0.4
+
+
+def test_sqlite_queue_consumers_only_claim_their_shard(tmp_path) -> None:
+    db_path = str(tmp_path / "queue.db")
+    codec = DataclassTaskCodec(PushReviewTask)
+    common = dict(
+        name="review",
+        max_requests_per_minute=None,
+        worker_concurrency=1,
+        db_path=db_path,
+        codec=codec,
+        poll_interval_seconds=0.05,
+        shard_key=review_task_project_key,
+    )
+    producer = SQLiteWorkerQueue(handler=lambda task: None, consume=False, **common)
+    seen: dict[int, list[int]] = {0: [], 1: []}
+    for index in (0, 1):
+        SQLiteWorkerQueue(
+            handler=lambda task, index=index: seen[index].append(task.project_id),
+            shard=ShardAssignment(index=index, count=2),
+            **common,
+        )
+
+    project_ids = list(range(1, 21))
+    for project_id in project_ids:
+        producer.enqueue(PushReviewTask(project_id=project_id, commit_id="c"))
+
+    deadline = time.time() + 3
+    while len(seen[0]) + len(seen[1]) < len(project_ids) and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert sorted(seen[0] + seen[1]) == project_ids
+    for index in (0, 1):
+        owned = set(ShardAssignment(index=index, count=2).buckets)
+        assert all(shard_bucket(project_id) in owned for project_id in seen[index])
+
+
+class _FakeShardProcess:
+    def __init__(self, exitcode=None) -> None:
+        self.exitcode = exitcode
+
+
+def testsupervise_shards_restarts_crashed_shards_only() -> None:
+    processes = [_FakeShardProcess(exitcode=-9), _FakeShardProcess(exitcode=0)]
+    started: list[int] = []
+
+    def start_shard(index: int) -> _FakeShardProcess:
+        started.append(index)
+        # The replacement runs until it is shut down on purpose.
+        return _FakeShardProcess(exitcode=0)
+
+    supervise_shards(processes, start_shard, threading.Event(), interval_seconds=0.01)
+
+    assert started == [0]
+    assert all(process.exitcode == 0 for process in processes)
+
+
+def testsupervise_shards_does_not_restart_during_shutdown() -> None:
+    processes = [_FakeShardProcess(exitcode=1)]
+    stopping = threading.Event()
+    stopping.set()
+
+    supervise_shards(processes, lambda index: pytest.fail("restarted during shutdown"), stopping)
+
+    assert processes[0].exitcode == 1